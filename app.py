@@ -2,76 +2,134 @@
 # IMPORTS
 # =====================================================
 
+import os
+import time
+
+# Cold-start clock, reported by GET /operations
+_STARTED = time.perf_counter()
+
 from flask import Flask
+from flask import Response
 from flask import render_template
 from flask import request
+from flask import send_file
 from flask import jsonify
 
 
 # =====================================================
-# BASIC MATRIX OPERATIONS
+# OPERATION REGISTRY
 # =====================================================
+#
+# Operations live in utils/operations.py and their math modules are
+# imported on first use, see utils/registry.py
 
-from utils.basic_ops import add_matrices
-from utils.basic_ops import subtract_matrices
-from utils.basic_ops import multiply_matrices
-from utils.basic_ops import transpose_matrix
+from utils.registry import execute
+from utils.registry import get_operation
+from utils.registry import import_report
+from utils.registry import operations
+from utils.registry import prepare
+from utils.registry import preload
+from utils.registry import validate
 
 
 # =====================================================
-# SCALAR & PROPERTY OPERATIONS
+# COMPUTE BACKEND / BATCH
 # =====================================================
 
-from utils.scalar_ops import scalar_multiply
-from utils.scalar_ops import identity_matrix
-from utils.scalar_ops import zero_matrix
-from utils.scalar_ops import matrices_equal
+from utils.backend import get_default_backend
+from utils.backend import resolve_backend
+from utils.cache import factorization_cache
+from utils.batch import run_batch
+from utils.jobs import JobError
+from utils.jobs import JobManager
+from utils.json_stream import iter_json
+from utils.json_stream import parse_json_body
+from utils.json_stream import result_size
+from utils.wire import BINARY_TYPES
+from utils.wire import encode_response
+from utils.wire import payload_from_request
+from utils.wire import read_matrix
+from utils.wire import NPY
+from utils.store import is_matrix_id
+from utils.store import matrix_store
+from utils.matrix import Matrix
+from utils.matrix import to_list
 
 
 # =====================================================
-# LINEAR ALGEBRA OPERATIONS
+# METRICS
 # =====================================================
 
-from utils.algebra_ops import determinant
-from utils.algebra_ops import inverse_2x2
-from utils.algebra_ops import rank
-from utils.algebra_ops import trace
-from utils.algebra_ops import adjoint_2x2
+from utils.metrics import input_elements
+from utils.metrics import metrics
+from utils.metrics import server_timing
+from utils.profiling import ProfileStore
+from utils.profiling import ProfilerBusy
+from utils.profiling import profile_call
+from utils.profiling import sampling_profiler
 
 
 # =====================================================
-# ADVANCED / DECOMPOSITION OPERATIONS
+# RESPONSE CACHE
 # =====================================================
 
-from utils.advanced_ops import lu_decomposition
-from utils.advanced_ops import cholesky_decomposition
-from utils.advanced_ops import eigenvalues_2x2
+from utils.response_cache import request_key
+from utils.response_cache import response_cache
 
 
 # =====================================================
-# STATISTICS OPERATIONS
+# FLASK APP INITIALIZATION
 # =====================================================
 
-from utils.stats_ops import covariance
-from utils.stats_ops import correlation
+app = Flask(__name__)
+app.config["MATRIX_BACKEND"] = get_default_backend()
 
+app.config["BATCH_MAX_ITEMS"] = 500
+app.config["BATCH_MAX_WORKERS"] = 4
 
-# =====================================================
-# UTILITIES OPERATIONS
-# =====================================================
+# Payloads estimated above JOB_SYNC_MAX_COST scalar operations (about a
+# tenth of a second of pure Python) run as jobs on the process pool
+app.config["JOB_SYNC_MAX_COST"] = 1_000_000
+app.config["JOB_MAX_WORKERS"] = int(os.environ.get("MATRIXLAB_JOB_WORKERS", 2))
+app.config["JOB_MAX_PENDING"] = 32
+app.config["JOB_RESULT_TTL"] = 600
 
-from utils.utilities_ops import is_square
-from utils.utilities_ops import dimensions
-from utils.utilities_ops import is_identity
-from utils.utilities_ops import is_zero
-from utils.utilities_ops import is_symmetric
+# Bodies of at least STREAM_PARSE_MIN_BYTES are parsed incrementally and
+# results of at least STREAM_MIN_ELEMENTS are streamed ("stream": true
+# forces it)
+app.config["STREAM_PARSE_MIN_BYTES"] = 1024 * 1024
+app.config["STREAM_MIN_ELEMENTS"] = 250_000
 
+# CSV statistics read the upload in blocks of STATS_CHUNK_BYTES; with
+# STATS_MAX_WORKERS > 0 the blocks are parsed on that many processes
+app.config["STATS_CHUNK_BYTES"] = 4 * 1024 * 1024
+app.config["STATS_MAX_WORKERS"] = int(os.environ.get("MATRIXLAB_STATS_WORKERS", 0))
 
-# =====================================================
-# FLASK APP INITIALIZATION
-# =====================================================
+# Per-request cProfile runs ("X-Profile: 1" or ?profile=1) only when
+# PROFILING_ENABLED; with PROFILING_TOKEN set, the flag must carry it
+app.config["PROFILING_ENABLED"] = os.environ.get("MATRIXLAB_PROFILING", "0") == "1"
+app.config["PROFILING_TOKEN"] = os.environ.get("MATRIXLAB_PROFILING_TOKEN") or None
+app.config["PROFILE_TOP"] = 25
 
-app = Flask(__name__)
+job_manager = JobManager(
+    max_workers=app.config["JOB_MAX_WORKERS"],
+    max_pending=app.config["JOB_MAX_PENDING"],
+    ttl=app.config["JOB_RESULT_TTL"]
+)
+
+# MATRIXLAB_PRELOAD=1 imports every operation module at startup instead of
+# on first use (pre-forking servers then share them between workers)
+if os.environ.get("MATRIXLAB_PRELOAD", "0") == "1":
+    preload()
+
+profile_store = ProfileStore()
+
+# MATRIXLAB_SAMPLING=1 samples request threads from startup, see
+# utils/profiling.py for the rate and dump settings
+if os.environ.get("MATRIXLAB_SAMPLING", "0") == "1":
+    sampling_profiler.start()
+
+STARTUP_MS = (time.perf_counter() - _STARTED) * 1000
 
 
 # =====================================================
@@ -89,634 +147,619 @@ def index():
 
 @app.route('/calculate', methods=['POST'])
 def calculate():
+    started = time.perf_counter()
+    length = request.content_length
+    try:
+        if request.mimetype in BINARY_TYPES or request.mimetype == "multipart/form-data":
+            data = payload_from_request(request)
+        elif request.is_json and length is not None and length >= app.config["STREAM_PARSE_MIN_BYTES"]:
+            data = parse_json_body(request.stream)
+        else:
+            data = request.get_json()
+    except ValueError as e:
+        metrics.observe("unknown", "error", {"decode": time.perf_counter() - started})
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        })
+
+    return _run(data, time.perf_counter() - started)
+
+
+def _run(data, decode=0.0):
+    # decode: seconds the caller spent reading the body
+    started = time.perf_counter()
+    key = _response_key(data)
+    cached = response_cache.get(key) if key is not None else None
+
+    if cached is not None:
+        status = "success"
+        computed = time.perf_counter()
+        response = Response(cached.body, content_type=cached.mimetype, headers=cached.headers)
+        response.headers["X-Cache"] = "hit"
+    else:
+        if _profiling_requested():
+            result, backend = _execute_profiled(data)
+        else:
+            result, backend = _execute(data)
+        status = result.get("status", "error")
+        computed = time.perf_counter()
+
+        response = _respond(result, data.get("stream"))
+        if backend is not None:
+            response.headers["X-Matrix-Backend"] = backend
+
+        if isinstance(result.get("profile"), dict) and "id" in result["profile"]:
+            response.headers["X-Profile-Id"] = result["profile"]["id"]
+
+        # Errors are cheap to recompute and streamed bodies too large to keep
+        if key is not None and status == "success" and not response.is_streamed:
+            headers = [(name, value) for name, value in response.headers if name not in ("Content-Type", "Content-Length")]
+            cached = response_cache.put(key, response.get_data(), response.content_type, headers)
+            if cached is not None:
+                response.headers["X-Cache"] = "miss"
+
+    if cached is not None:
+        response.set_etag(cached.etag)
+        if request.if_none_match.contains_weak(cached.etag):
+            response_cache.record_not_modified()
+            response = _not_modified(response)
+
+    timings = {"decode": decode, "compute": computed - started, "serialize": time.perf_counter() - computed}
+    response.headers["Server-Timing"] = server_timing(timings)
+
+    def observe(serialize=0.0):
+        timings["serialize"] += serialize
+        metrics.observe(metrics.operation_label(data), status, timings, input_elements(data))
+
+    if response.is_streamed:
+        # The body is encoded as it is sent, after the headers: the metric
+        # includes that time, the Server-Timing header cannot
+        response.response = _timed_stream(response.response, observe)
+    else:
+        observe()
+    return response
+
+
+def _response_key(data):
+    """
+    The response cache key for a payload, or None when it must not be
+    cached: the cache is off (globally, or per request with "cache":
+    false), the request is profiled, the result is saved to the store,
+    or an operand is a stored matrix (which can be deleted under the
+    cached response)
+    """
+    if not response_cache.enabled or data.get("cache") is False:
+        return None
+    if data.get("saveResult") or _profiling_requested():
+        return None
+    matrices = data.get("matrices")
+    operands = [data.get("matrixA"), data.get("matrixB")]
+    operands += list(matrices.values()) if isinstance(matrices, dict) else matrices if isinstance(matrices, list) else []
+    if any(is_matrix_id(operand) for operand in operands):
+        return None
+
+    accept = request.accept_mimetypes.best_match(("application/json",) + BINARY_TYPES, default="application/json")
+    return request_key(data, data.get("backend") or app.config["MATRIX_BACKEND"], accept)
+
+
+def _not_modified(response):
+    # 304 keeps the validators and Vary but drops the body
+    not_modified = Response(status=304)
+    for name in ("ETag", "Vary", "X-Matrix-Backend", "X-Cache"):
+        if name in response.headers:
+            not_modified.headers[name] = response.headers[name]
+    return not_modified
+
+
+def _timed_stream(chunks, observe):
+    started = time.perf_counter()
+    try:
+        yield from chunks
+    finally:
+        observe(time.perf_counter() - started)
+
+
+def _profiling_requested():
+    # An X-Profile header or ?profile= flag of "1", or the token when
+    # one is configured
+    if not app.config["PROFILING_ENABLED"]:
+        return False
+    flag = request.headers.get("X-Profile") or request.args.get("profile")
+    token = app.config["PROFILING_TOKEN"]
+    return bool(flag) and (flag == token if token else flag.lower() in ("1", "true"))
+
+
+def _execute_profiled(data):
+    """
+    _execute under cProfile; the report is stored and added to the
+    response under "profile" (binary responses only get its id)
+    """
+    try:
+        (result, backend), report = profile_call(lambda: _execute(data), app.config["PROFILE_TOP"])
+    except ProfilerBusy as e:
+        result, backend = _execute(data)
+        return dict(result, profile={"error": str(e)}), backend
+
+    entry = profile_store.put(report, operation=data.get("operation"), path=request.path)
+    return dict(result, profile=entry), backend
+
+
+def _respond(result, stream=None):
+    # JSON unless the client asks for .npy or raw float64; results that are
+    # not a single numeric matrix stay JSON either way
+    accept = request.accept_mimetypes.best_match(("application/json",) + BINARY_TYPES, default="application/json")
+    encoded = encode_response(result, accept) if accept in BINARY_TYPES else None
+
+    if stream is None:
+        stream = result.get("status") == "success" and result_size(result.get("result")) >= app.config["STREAM_MIN_ELEMENTS"]
+
+    if encoded is not None:
+        body, headers = encoded
+        response = Response(body, mimetype=accept, headers=headers)
+    elif stream:
+        # Chunked: the envelope goes out first, then the result row by row
+        response = Response(iter_json(result), mimetype="application/json")
+    else:
+        if isinstance(result.get("result"), Matrix):
+            result = dict(result, result=to_list(result["result"]))
+        response = jsonify(result)
+
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+def _execute(data):
+    """
+    Runs one /calculate payload, returns (response dict, backend name)
+    """
+
+    # Per-request "backend" wins over the configured default
+    try:
+        backend = resolve_backend(data.get("backend") or app.config["MATRIX_BACKEND"])
+    except ValueError as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }, None
+
+    return execute(data, backend), backend
+
+
+# =====================================================
+# SOLVE ROUTE
+# =====================================================
+
+@app.route('/solve', methods=['POST'])
+def solve():
+    # Accepts {"A": [[...]], "B": [[...]] or [...]} as well as matrixA / matrixB
+    started = time.perf_counter()
+    data = dict(request.get_json())
+    data["operation"] = "solve"
+    data.setdefault("matrixA", data.get("A"))
+    data.setdefault("matrixB", data.get("B", data.get("b")))
 
+    # A bare vector b is solved as a single right-hand-side column
+    b = data["matrixB"]
+    if isinstance(b, list) and b and not isinstance(b[0], list):
+        data["matrixB"] = [[value] for value in b]
+
+    return _run(data, time.perf_counter() - started)
+
+
+# =====================================================
+# EXPRESSION ROUTE
+# =====================================================
+
+@app.route('/expression', methods=['POST'])
+def expression():
+    # {"expression": "2*(A+B) - C", "matrices": {"A": ..., "B": ..., "C": ...}}
+    started = time.perf_counter()
+    data = dict(request.get_json())
+    data["operation"] = "expression"
+    return _run(data, time.perf_counter() - started)
+
+
+# =====================================================
+# BATCH ROUTE
+# =====================================================
+
+@app.route('/calculate/batch', methods=['POST'])
+def calculate_batch():
     data = request.get_json()
+    items = data.get("operations")
 
-    operation = data.get("operation")
-    matrixA = data.get("matrixA")
-    matrixB = data.get("matrixB")
-    stepByStep = data.get("stepByStep", False)
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            "status": "error",
+            "message": "A non-empty 'operations' list is required"
+        })
 
+    if len(items) > app.config["BATCH_MAX_ITEMS"]:
+        return jsonify({
+            "status": "error",
+            "message": f"A batch may hold at most {app.config['BATCH_MAX_ITEMS']} operations"
+        })
 
-    # =================================================
-    # BASIC OPERATIONS
-    # =================================================
+    # Batch-level settings apply to every item that does not override them
+    defaults = {key: data[key] for key in ("backend", "cache", "stepByStep") if key in data}
+
+    outcomes = run_batch(
+        items,
+        lambda payload: _execute(payload)[0],
+        inputs=data.get("matrices") or {},
+        defaults=defaults,
+        max_workers=app.config["BATCH_MAX_WORKERS"]
+    )
+
+    failed = sum(1 for outcome in outcomes if outcome.get("status") != "success")
+    if failed == 0:
+        status = "success"
+    elif failed == len(outcomes):
+        status = "error"
+    else:
+        status = "partial"
 
-    # ---------- ADDITION ----------
-    if operation == "add":
+    return jsonify({
+        "status": status,
+        "succeeded": len(outcomes) - failed,
+        "failed": failed,
+        "results": outcomes
+    })
 
-        if matrixA is None or matrixB is None:
-            return jsonify({
-                "status": "error",
-                "message": "Both matrices are required for addition"
-            })
 
-        result = add_matrices(matrixA, matrixB)
-        
-        response = {
-            "status": "success",
-            "operation": "Matrix Addition",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check Dimensions", "description": f"Both matrices must have the same dimensions for addition."},
-                {"title": "Add Elements", "description": "Add each element in Matrix A to the corresponding element in Matrix B."},
-                {"title": "Complete", "description": "Result matrix created by adding corresponding elements."}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- SUBTRACTION ----------
-    elif operation == "subtract":
-
-        if matrixA is None or matrixB is None:
-            return jsonify({
-                "status": "error",
-                "message": "Both matrices are required for subtraction"
-            })
-
-        result = subtract_matrices(matrixA, matrixB)
-        
-        response = {
-            "status": "success",
-            "operation": "Matrix Subtraction",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check Dimensions", "description": f"Both matrices must have the same dimensions for subtraction."},
-                {"title": "Subtract Elements", "description": "Subtract each element in Matrix B from the corresponding element in Matrix A."},
-                {"title": "Complete", "description": "Result matrix created by subtracting corresponding elements."}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- MULTIPLICATION ----------
-    elif operation == "multiply":
-
-        if matrixA is None or matrixB is None:
-            return jsonify({
-                "status": "error",
-                "message": "Both matrices are required for multiplication"
-            })
-
-        result = multiply_matrices(matrixA, matrixB)
-        
-        response = {
-            "status": "success",
-            "operation": "Matrix Multiplication",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check Dimensions", "description": f"Number of columns in A must equal number of rows in B."},
-                {"title": "Calculate Dot Products", "description": "For each element (i,j), multiply row i of A with column j of B and sum."},
-                {"title": "Complete", "description": "Result matrix created through matrix multiplication."}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- TRANSPOSE ----------
-    elif operation == "transpose":
-
-        if matrixA is None:
-            return jsonify({
-                "status": "error",
-                "message": "Matrix A is required for transpose"
-            })
-
-        result = transpose_matrix(matrixA)
-        
-        response = {
-            "status": "success",
-            "operation": "Matrix Transpose",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Transpose", "description": "Swap rows and columns of the matrix."},
-                {"title": "Complete", "description": "Element at (i,j) is now at (j,i)."}
-            ]
+# =====================================================
+# JOB ROUTES
+# =====================================================
 
-        return jsonify(response)
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    # Same payload as /calculate; "async": true skips the fast path
+    data = request.get_json()
+    operation = get_operation(data.get("operation"))
+
+    # Stored and sparse matrices are loaded here only to price the job;
+    # the worker loads them itself
+    try:
+        resolved = prepare(data)
+    except ValueError:
+        operation = None
+
+    # Unknown operations, invalid input and cheap work answer straight away
+    cost = operation.estimate_cost(resolved) if operation is not None else 0
+    if (operation is None or validate(operation, resolved) is not None
+            or (cost <= app.config["JOB_SYNC_MAX_COST"] and not data.get("async"))):
+        result, backend = _execute(data)
+        result["mode"] = "sync"
+        return jsonify(result)
+
+    try:
+        backend = resolve_backend(data.get("backend") or app.config["MATRIX_BACKEND"])
+        job = job_manager.submit(data, backend, cost)
+    except JobError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 503
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        })
+
+    return jsonify({
+        "status": "accepted",
+        "mode": "async",
+        "job": job_manager.describe(job),
+        "location": f"/jobs/{job.id}"
+    }), 202
 
 
-    # =================================================
-    # SCALAR & PROPERTIES
-    # =================================================
+@app.route('/jobs', methods=['GET'])
+def job_stats():
+    return jsonify({
+        "status": "success",
+        "jobs": job_manager.stats()
+    })
 
-    # ---------- SCALAR MULTIPLICATION ----------
-    elif operation == "scalar_multiply":
 
-        scalar = data.get("scalar")
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Job '{job_id}' not found"
+        }), 404
 
-        if scalar is None:
-            return jsonify({
-                "status": "error",
-                "message": "Scalar value is required"
-            })
+    return jsonify({
+        "status": "success",
+        "job": job_manager.describe(job)
+    })
 
-        result = scalar_multiply(matrixA, scalar)
-        
-        response = {
-            "status": "success",
-            "operation": "Scalar Multiplication",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Scalar Multiplication", "description": f"Multiply every element by {scalar}."},
-                {"title": "Complete", "description": f"All elements multiplied by {scalar}."}
-            ]
 
-        return jsonify(response)
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Job '{job_id}' not found"
+        }), 404
+
+    return jsonify({
+        "status": "success",
+        "job": job_manager.describe(job)
+    })
 
 
-    # ---------- IDENTITY MATRIX ----------
-    elif operation == "identity":
+# =====================================================
+# MATRIX STORE ROUTES
+# =====================================================
 
-        size = data.get("size")
+@app.route('/matrices', methods=['POST'])
+def upload_matrix():
+    # {"matrix": [[...]]}, or a .npy / raw float64 body like /calculate
+    try:
+        if request.mimetype in BINARY_TYPES:
+            matrix = read_matrix(request.get_data(cache=False), request.mimetype, request.headers.get("X-Matrix-Shape"))
+        elif request.content_length and request.content_length >= app.config["STREAM_PARSE_MIN_BYTES"]:
+            matrix = parse_json_body(request.stream, matrix_keys=("matrix",)).get("matrix")
+        else:
+            matrix = (request.get_json() or {}).get("matrix")
+
+        if matrix is None:
+            raise ValueError("A 'matrix' is required")
+        stored = matrix_store.put(matrix)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Error storing matrix: {str(e)}"
+        })
 
-        if size is None or size <= 0:
-            return jsonify({
-                "status": "error",
-                "message": "Valid size is required for identity matrix"
-            })
+    return jsonify({
+        "status": "success",
+        **stored
+    }), 201
 
-        result = identity_matrix(size)
-        
-        response = {
-            "status": "success",
-            "operation": "Identity Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Identity Matrix", "description": f"Creating {size}×{size} identity matrix."},
-                {"title": "Diagonal", "description": "Set diagonal elements to 1, others to 0."}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- ZERO MATRIX ----------
-    elif operation == "zero":
-
-        rows = data.get("rows")
-        cols = data.get("cols")
-
-        if rows is None or cols is None:
-            return jsonify({
-                "status": "error",
-                "message": "Rows and columns are required for zero matrix"
-            })
-
-        result = zero_matrix(rows, cols)
-        
-        response = {
-            "status": "success",
-            "operation": "Zero Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Zero Matrix", "description": f"Creating {rows}×{cols} zero matrix."},
-                {"title": "All Zeros", "description": "Every element set to 0."}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- MATRIX EQUALITY ----------
-    elif operation == "equality":
-
-        is_equal = matrices_equal(matrixA, matrixB)
-        result = [["Equal"]] if is_equal else [["Not Equal"]]
-        
-        response = {
-            "status": "success",
-            "operation": "Matrix Equality Check",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check Dimensions", "description": "Verify both matrices have same dimensions."},
-                {"title": "Compare Elements", "description": "Compare each corresponding element."},
-                {"title": "Result", "description": f"Matrices are {'equal' if is_equal else 'not equal'}."}
-            ]
-
-        return jsonify(response)
-
-
-    # =================================================
-    # LINEAR ALGEBRA
-    # =================================================
-
-    # ---------- DETERMINANT ----------
-    elif operation == "determinant":
-
-        value = determinant(matrixA)
-        
-        response = {
-            "status": "success",
-            "operation": "Determinant",
-            "result": [[value]]
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Determinant", "description": "Calculate determinant using cofactor expansion or formula."},
-                {"title": "Result", "description": f"det(A) = {value}"}
-            ]
 
-        return jsonify(response)
+@app.route('/matrices', methods=['GET'])
+def store_stats():
+    return jsonify({
+        "status": "success",
+        "store": matrix_store.stats()
+    })
 
 
-    # ---------- INVERSE ----------
-    elif operation == "inverse":
+@app.route('/matrices/<matrix_id>', methods=['GET'])
+def download_matrix(matrix_id):
+    stored = matrix_store.describe(matrix_id)
+    if stored is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Matrix '{matrix_id}' not found"
+        }), 404
 
-        result = inverse_2x2(matrixA)
-        
-        response = {
-            "status": "success",
-            "operation": "Inverse Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Calculate Determinant", "description": "Find det(A). If 0, matrix is not invertible."},
-                {"title": "Adjoint Matrix", "description": "Calculate adjoint matrix."},
-                {"title": "Divide", "description": "Inverse = (1/det) × adjoint"}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- RANK ----------
-    elif operation == "rank":
-
-        try:
-            value = rank(matrixA)
-            if value is None:
-                value = 0
-            value = int(value)
-        except Exception as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Error calculating rank: {str(e)}"
-            })
-        
-        response = {
-            "status": "success",
-            "operation": "Matrix Rank",
-            "result": [[value]]
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Row Reduction", "description": "Convert to row echelon form."},
-                {"title": "Count", "description": "Count non-zero rows."},
-                {"title": "Result", "description": f"Rank = {value}"}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- TRACE ----------
-    elif operation == "trace":
-
-        value = trace(matrixA)
-        
-        response = {
-            "status": "success",
-            "operation": "Trace",
-            "result": [[value]]
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Trace", "description": "Sum of diagonal elements."},
-                {"title": "Result", "description": f"tr(A) = {value}"}
-            ]
+    # The stored file already is a .npy
+    if request.accept_mimetypes.best_match(("application/json", NPY)) == NPY:
+        return send_file(matrix_store.path(matrix_id), mimetype=NPY)
 
-        return jsonify(response)
+    return _respond({
+        "status": "success",
+        **stored,
+        "result": matrix_store.get(matrix_id)
+    })
 
 
-    # ---------- ADJOINT ----------
-    elif operation == "adjoint":
+@app.route('/matrices/<matrix_id>', methods=['DELETE'])
+def delete_matrix(matrix_id):
+    if not matrix_store.delete(matrix_id):
+        return jsonify({
+            "status": "error",
+            "message": f"Matrix '{matrix_id}' not found"
+        }), 404
 
-        result = adjoint_2x2(matrixA)
-        
-        response = {
-            "status": "success",
-            "operation": "Adjoint Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Cofactors", "description": "Find cofactor for each element."},
-                {"title": "Transpose", "description": "Transpose the cofactor matrix."}
-            ]
-
-        return jsonify(response)
-
-
-    # =================================================
-    # DECOMPOSITIONS
-    # =================================================
-
-    # ---------- LU DECOMPOSITION ----------
-    elif operation == "lu":
-
-        L, U = lu_decomposition(matrixA)
-        
-        response = {
-            "status": "success",
-            "operation": "LU Decomposition",
-            "result": {
-                "L": L,
-                "U": U
-            }
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "LU Decomposition", "description": "Decompose A into L (lower) and U (upper)."},
-                {"title": "Verify", "description": "L × U = A"}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- CHOLESKY ----------
-    elif operation == "cholesky":
-
-        try:
-            L = cholesky_decomposition(matrixA)
-            
-            response = {
-                "status": "success",
-                "operation": "Cholesky Decomposition",
-                "result": {
-                    "L": L
-                }
-            }
-            
-            if stepByStep:
-                response["steps"] = [
-                    {"title": "Cholesky", "description": "Find L such that A = L × Lᵀ."},
-                    {"title": "Requirements", "description": "Matrix must be symmetric and positive definite."}
-                ]
-
-            return jsonify(response)
-            
-        except Exception as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Cholesky failed. Matrix must be symmetric and positive definite. Error: {str(e)}"
-            })
-
-
-    # ---------- EIGENVALUES ----------
-    elif operation == "eigen":
-
-        try:
-            # Check if matrix is 2x2
-            if len(matrixA) != 2 or len(matrixA[0]) != 2:
-                return jsonify({
-                    "status": "error",
-                    "message": "Eigenvalues calculation is only supported for 2×2 matrices"
-                })
-            
-            values = eigenvalues_2x2(matrixA)
-            
-            response = {
-                "status": "success",
-                "operation": "Eigenvalues",
-                "result": [
-                    [float(values[0])],
-                    [float(values[1])]
-                ]
-            }
-            
-            if stepByStep:
-                response["steps"] = [
-                    {"title": "Characteristic Equation", "description": "Solve det(A - λI) = 0."},
-                    {"title": "Eigenvalues", "description": f"λ₁ = {values[0]}, λ₂ = {values[1]}"}
-                ]
-
-            return jsonify(response)
-            
-        except Exception as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Error calculating eigenvalues: {str(e)}"
-            })
-
-
-    # =================================================
-    # DATA SCIENCE
-    # =================================================
-
-    # ---------- COVARIANCE ----------
-    elif operation == "covariance":
-
-        try:
-            if matrixA is None or matrixB is None:
-                return jsonify({
-                    "status": "error",
-                    "message": "Both matrices are required for covariance"
-                })
-            
-            value = covariance(matrixA, matrixB)
-            
-            response = {
-                "status": "success",
-                "operation": "Covariance",
-                "result": float(value)
-            }
-            
-            if stepByStep:
-                response["steps"] = [
-                    {"title": "Flatten", "description": "Convert matrices to vectors."},
-                    {"title": "Calculate", "description": "Cov(X,Y) = Σ[(x - μₓ)(y - μᵧ)] / (n-1)"},
-                    {"title": "Result", "description": f"Covariance = {value:.6f}"}
-                ]
-
-            return jsonify(response)
-            
-        except Exception as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Error calculating covariance: {str(e)}"
-            })
-
-
-    # ---------- CORRELATION ----------
-    elif operation == "correlation":
-
-        try:
-            if matrixA is None or matrixB is None:
-                return jsonify({
-                    "status": "error",
-                    "message": "Both matrices are required for correlation"
-                })
-            
-            value = correlation(matrixA, matrixB)
-            
-            response = {
-                "status": "success",
-                "operation": "Correlation",
-                "result": float(value)
-            }
-            
-            if stepByStep:
-                response["steps"] = [
-                    {"title": "Calculate Covariance", "description": "Find covariance first."},
-                    {"title": "Standard Deviations", "description": "Calculate σₓ and σᵧ."},
-                    {"title": "Result", "description": f"Correlation = {value:.6f}"}
-                ]
-
-            return jsonify(response)
-            
-        except Exception as e:
-            return jsonify({
-                "status": "error",
-                "message": f"Error calculating correlation: {str(e)}"
-            })
-
-
-    # =================================================
-    # UTILITIES
-    # =================================================
-
-    # ---------- IS SQUARE ----------
-    elif operation == "is_square":
-
-        check = is_square(matrixA)
-        result = ["Yes"] if check else ["No"]
-        
-        response = {
-            "status": "success",
-            "operation": "Check Square Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check", "description": "rows == columns?"},
-                {"title": "Result", "description": f"{'Square' if check else 'Not square'}"}
-            ]
+    return jsonify({
+        "status": "success",
+        "deleted": matrix_id
+    })
 
-        return jsonify(response)
 
+# =====================================================
+# DATASET STATISTICS ROUTE
+# =====================================================
 
-    # ---------- DIMENSIONS ----------
-    elif operation == "dimensions":
+_HEADER_FLAGS = {"true": True, "1": True, "false": False, "0": False, "auto": None}
+
+
+@app.route('/statistics', methods=['POST'])
+def dataset_statistics():
+    # A CSV body (optionally gzip), or a multipart "file" field; the
+    # options come as query parameters since the body is the data.
+    # Imported here so utils.stats_ops loads on first use like the other
+    # operation modules
+    from utils.ingest import csv_statistics
+
+    args = request.args
+    try:
+        header = _HEADER_FLAGS[args.get("header", "auto").lower()]
+        delimiter = args.get("delimiter", ",").replace("\\t", "\t")
+        if len(delimiter) != 1:
+            raise ValueError("The delimiter must be a single character")
+        ddof = int(args.get("ddof", 0))
+        if ddof < 0:
+            raise ValueError("ddof must not be negative")
+        workers = min(int(args.get("workers", app.config["STATS_MAX_WORKERS"])), app.config["STATS_MAX_WORKERS"])
+
+        if request.mimetype == "multipart/form-data":
+            upload = request.files.get("file")
+            if upload is None:
+                raise ValueError("A 'file' field is required")
+            stream = upload.stream
+            compressed = True if upload.filename and upload.filename.endswith(".gz") else None
+        else:
+            stream = request.stream
+            compressed = True if request.headers.get("Content-Encoding") == "gzip" or request.mimetype == "application/gzip" else None
+
+        stats = csv_statistics(
+            stream, delimiter=delimiter, header=header, compressed=compressed, ddof=ddof,
+            workers=max(0, workers), chunk_bytes=app.config["STATS_CHUNK_BYTES"]
+        )
+    except KeyError:
+        return jsonify({
+            "status": "error",
+            "message": "header must be true, false or auto"
+        })
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Error reading CSV: {str(e)}"
+        })
 
-        r, c = dimensions(matrixA)
-        
-        response = {
-            "status": "success",
-            "operation": "Matrix Dimensions",
-            "result": [f"{r} × {c}"]
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Count", "description": f"{r} rows, {c} columns"}
-            ]
+    return jsonify({
+        "status": "success",
+        **stats
+    })
 
-        return jsonify(response)
 
+# =====================================================
+# CACHE STATISTICS ROUTE
+# =====================================================
 
-    # ---------- IS IDENTITY ----------
-    elif operation == "is_identity":
+@app.route('/cache', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        "status": "success",
+        "factorization": factorization_cache.stats(),
+        "response": response_cache.stats()
+    })
 
-        check = is_identity(matrixA)
-        result = ["Yes"] if check else ["No"]
-        
-        response = {
-            "status": "success",
-            "operation": "Check Identity Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check", "description": "Diagonal = 1, others = 0?"},
-                {"title": "Result", "description": f"{'Identity' if check else 'Not identity'}"}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- IS ZERO ----------
-    elif operation == "is_zero":
-
-        check = is_zero(matrixA)
-        result = ["Yes"] if check else ["No"]
-        
-        response = {
-            "status": "success",
-            "operation": "Check Zero Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check", "description": "All elements = 0?"},
-                {"title": "Result", "description": f"{'Zero matrix' if check else 'Not zero matrix'}"}
-            ]
-
-        return jsonify(response)
-
-
-    # ---------- IS SYMMETRIC ----------
-    elif operation == "is_symmetric":
-
-        check = is_symmetric(matrixA)
-        result = ["Yes"] if check else ["No"]
-        
-        response = {
-            "status": "success",
-            "operation": "Check Symmetric Matrix",
-            "result": result
-        }
-        
-        if stepByStep:
-            response["steps"] = [
-                {"title": "Check", "description": "A = Aᵀ?"},
-                {"title": "Result", "description": f"{'Symmetric' if check else 'Not symmetric'}"}
-            ]
 
-        return jsonify(response)
+# =====================================================
+# METRICS ROUTE
+# =====================================================
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    # Prometheus text exposition format
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
-    # =================================================
-    # FALLBACK
-    # =================================================
 
-    else:
+# =====================================================
+# PROFILING ROUTES
+# =====================================================
+
+def _profiling_disabled():
+    return jsonify({
+        "status": "error",
+        "message": "Profiling is disabled (MATRIXLAB_PROFILING=1 enables it)"
+    }), 404
+
+
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    if not app.config["PROFILING_ENABLED"]:
+        return _profiling_disabled()
+
+    return jsonify({
+        "status": "success",
+        "profiles": profile_store.summary(),
+        "sampling": {"running": sampling_profiler.running, "path": sampling_profiler.path}
+    })
+
+
+@app.route('/profiles/sampling', methods=['GET'])
+def sampling_report():
+    if not app.config["PROFILING_ENABLED"] and not sampling_profiler.running:
+        return _profiling_disabled()
+
+    top = request.args.get("top", type=int)
+    return jsonify({
+        "status": "success",
+        "sampling": sampling_profiler.report(top)
+    })
+
+
+@app.route('/profiles/sampling', methods=['POST'])
+def control_sampling():
+    # {"action": "start" | "stop" | "reset" | "dump"}, carrying the same
+    # X-Profile flag or token as a profiled request
+    if not app.config["PROFILING_ENABLED"]:
+        return _profiling_disabled()
+    if not _profiling_requested():
+        return jsonify({
+            "status": "error",
+            "message": "An X-Profile header or profile flag is required"
+        }), 403
+
+    action = (request.get_json(silent=True) or {}).get("action")
+    try:
+        if action == "start":
+            sampling_profiler.start()
+        elif action == "stop":
+            sampling_profiler.stop()
+        elif action == "reset":
+            sampling_profiler.reset()
+        elif action == "dump":
+            if not sampling_profiler.path:
+                raise ValueError("No dump path configured (MATRIXLAB_SAMPLING_PATH)")
+            sampling_profiler.dump()
+        else:
+            raise ValueError("action must be start, stop, reset or dump")
+    except (OSError, ValueError) as e:
         return jsonify({
             "status": "error",
-            "message": f"Operation '{operation}' not implemented or not recognized"
+            "message": str(e)
         })
 
+    return jsonify({
+        "status": "success",
+        "sampling": {"running": sampling_profiler.running, "path": sampling_profiler.path}
+    })
+
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    if not app.config["PROFILING_ENABLED"]:
+        return _profiling_disabled()
+
+    entry = profile_store.get(profile_id)
+    if entry is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Profile '{profile_id}' not found"
+        }), 404
+
+    return jsonify({
+        "status": "success",
+        "profile": entry
+    })
+
+
+# =====================================================
+# OPERATIONS ROUTE
+# =====================================================
+
+@app.route('/operations', methods=['GET'])
+def list_operations():
+    # Registered operations plus where startup and first-use import time went
+    return jsonify({
+        "status": "success",
+        "operations": [
+            {
+                "name": operation.name,
+                "label": operation.label,
+                "inputs": list(operation.inputs) + list(operation.schema),
+                "loaded": operation.loaded
+            }
+            for operation in operations()
+        ],
+        "startup": {
+            "app_ms": round(STARTUP_MS, 3),
+            "imports_ms": import_report()
+        }
+    })
+
 
 # =====================================================
 # RUN APPLICATION
@@ -0,0 +1 @@
+# Micro-benchmarks for every operation and kernel in utils/, see run.py
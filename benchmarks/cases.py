@@ -0,0 +1,219 @@
+# ============================================
+# BENCHMARK CASES
+# ============================================
+#
+# Inputs and the list of (name, structure, size) cases. Every registered
+# operation is a case, run through run_operation exactly like /calculate;
+# KERNELS adds functions that have no operation of their own (the
+# multiplication kernels, lu_factor, the profile, wire and JSON encoders,
+# sparse products and CSV ingestion).
+
+import io
+import random
+from functools import lru_cache
+
+from utils.registry import get_operation
+from utils.registry import operations
+
+
+SIZES = (2, 8, 64, 256, 1024)
+STRUCTURES = ("dense", "sparse", "symmetric", "triangular")
+
+# Share of nonzeros in the "sparse" structure
+SPARSE_DENSITY = 0.05
+
+
+# --------------------------------------------
+# INPUTS
+# --------------------------------------------
+
+def make_matrix(structure, rows, cols=None, seed=0):
+    """
+    A deterministic rows x cols matrix of the given structure; square ones
+    get n on the diagonal so every structure is well conditioned (and the
+    symmetric one positive definite, for Cholesky)
+    """
+    # A fresh copy of a memoized build: generating 1024 x 1024 random
+    # values takes far longer than most of the cases that use them
+    return [list(row) for row in _build(structure, rows, rows if cols is None else cols, seed)]
+
+
+@lru_cache(maxsize=16)
+def _build(structure, rows, cols, seed):
+    rng = random.Random(f"{structure}-{rows}-{cols}-{seed}")
+
+    if structure == "sparse":
+        A = [[rng.uniform(-1, 1) if rng.random() < SPARSE_DENSITY else 0.0 for _ in range(cols)] for _ in range(rows)]
+    else:
+        A = [[rng.uniform(-1, 1) for _ in range(cols)] for _ in range(rows)]
+
+    if structure == "symmetric":
+        A = [[(A[i][j] + A[j][i]) / 2 if j < rows and i < cols else A[i][j] for j in range(cols)] for i in range(rows)]
+    elif structure == "triangular":
+        A = [[v if j >= i else 0.0 for j, v in enumerate(row)] for i, row in enumerate(A)]
+
+    for i in range(min(rows, cols)):
+        A[i][i] += rows
+    return A
+
+
+def _placeholder(structure, rows, cols=None, seed=0):
+    # Right shape, no content: enough for cost estimates
+    return [[0.0] * (rows if cols is None else cols)] * rows
+
+
+def payload(name, structure, n, make_matrix=make_matrix):
+    """
+    The /calculate payload for one operation case
+    """
+    A = make_matrix(structure, n)
+    data = {"operation": name, "matrixA": A}
+
+    if name in ("add", "subtract", "multiply", "equality"):
+        data["matrixB"] = make_matrix(structure, n, seed=1)
+    elif name in ("solve", "least_squares"):
+        data["matrixB"] = make_matrix("dense", n, 1, seed=1)
+    elif name in ("covariance", "correlation"):
+        data["matrixA"] = make_matrix("dense", n, 1, seed=2)
+        data["matrixB"] = make_matrix("dense", n, 1, seed=3)
+    elif name == "chain_multiply":
+        data["matrices"] = [A, make_matrix(structure, n, seed=1), make_matrix(structure, n, seed=2)]
+    elif name == "expression":
+        data["expression"] = "2*(A + B) * A - B"
+        data["matrices"] = {"A": A, "B": make_matrix(structure, n, seed=1)}
+    elif name == "scalar_multiply":
+        data["scalar"] = 2.5
+    elif name == "identity":
+        data["size"] = n
+    elif name == "zero":
+        data["rows"] = data["cols"] = n
+    return data
+
+
+def _applies(name, structure, n):
+    # Structure-free operations run once per size, on "dense"
+    if name in ("identity", "zero", "covariance", "correlation"):
+        return structure == "dense"
+    if name == "adjoint":
+        return n == 2
+    if name == "cholesky":
+        return structure == "symmetric"
+    return True
+
+
+# --------------------------------------------
+# KERNELS WITHOUT AN OPERATION
+# --------------------------------------------
+
+def _multiply(method):
+    def setup(structure, n):
+        from utils.basic_ops import multiply_matrices
+        A, B = make_matrix(structure, n), make_matrix(structure, n, seed=1)
+        return lambda: multiply_matrices(A, B, method)
+    return setup
+
+
+def _lu_factor(structure, n):
+    from utils.advanced_ops import lu_factor
+    A = make_matrix(structure, n)
+    return lambda: lu_factor(A)
+
+
+def _profile(structure, n):
+    from utils.utilities_ops import profile_matrix
+    A = make_matrix(structure, n)
+    return lambda: profile_matrix(A)
+
+
+def _npy_round_trip(structure, n):
+    from utils.wire import read_npy, write_npy
+    A = make_matrix(structure, n)
+    return lambda: read_npy(write_npy(A))
+
+
+def _json_stream(structure, n):
+    from utils.json_stream import iter_json
+    response = {"status": "success", "result": make_matrix(structure, n)}
+    return lambda: "".join(iter_json(response))
+
+
+def _sparse_multiply(structure, n):
+    from utils.sparse_ops import SparseMatrix, multiply_sparse
+    A = SparseMatrix.from_dense(make_matrix(structure, n))
+    B = SparseMatrix.from_dense(make_matrix(structure, n, seed=1))
+    return lambda: multiply_sparse(A, B)
+
+
+def _csv_statistics(structure, n):
+    from utils.ingest import csv_statistics
+    rows = make_matrix(structure, 16 * n, 8)
+    body = "\n".join(",".join(repr(v) for v in row) for row in rows).encode()
+    return lambda: csv_statistics(io.BytesIO(body))
+
+
+KERNELS = {
+    "kernel:multiply_naive": _multiply("naive"),
+    "kernel:multiply_blocked": _multiply("blocked"),
+    "kernel:multiply_strassen": _multiply("strassen"),
+    "kernel:lu_factor": _lu_factor,
+    "kernel:profile_matrix": _profile,
+    "kernel:npy_round_trip": _npy_round_trip,
+    "kernel:json_stream": _json_stream,
+    "kernel:sparse_multiply": _sparse_multiply,
+    "kernel:csv_statistics": _csv_statistics,
+}
+
+# Work estimates for the kernels, in the registry's scalar-operation units
+_KERNEL_COST = {
+    "kernel:multiply_naive": lambda n: n ** 3,
+    "kernel:multiply_blocked": lambda n: n ** 3,
+    "kernel:multiply_strassen": lambda n: n ** 3,
+    "kernel:lu_factor": lambda n: n ** 3,
+    "kernel:sparse_multiply": lambda n: n ** 3 * SPARSE_DENSITY,
+    "kernel:csv_statistics": lambda n: 16 * n * 64 * 20,
+}
+
+
+# --------------------------------------------
+# CASE LIST
+# --------------------------------------------
+
+def case_names():
+    return [operation.name for operation in operations()] + list(KERNELS)
+
+
+def estimate_cost(name, structure, n):
+    if name in KERNELS:
+        return _KERNEL_COST.get(name, lambda n: n * n)(n)
+    operation = get_operation(name)
+    return operation.estimate_cost(payload(name, structure, n, _placeholder))
+
+
+def build_cases(names=None, structures=STRUCTURES, sizes=SIZES):
+    """
+    Yields (key, name, structure, n) for every applicable combination;
+    key is "name/structure/n", the baseline's index
+    Smallest sizes first, and every case of one size and structure
+    together so they share the memoized inputs
+    """
+    for n in sorted(sizes):
+        for structure in structures:
+            for name in names or case_names():
+                if name in KERNELS:
+                    if name.startswith("kernel:multiply_") and structure != "dense":
+                        continue
+                elif not _applies(name, structure, n):
+                    continue
+                yield f"{name}/{structure}/{n}", name, structure, n
+
+
+def setup(name, structure, n):
+    """
+    A zero-argument callable running one case, built outside the timing
+    """
+    if name in KERNELS:
+        return KERNELS[name](structure, n)
+
+    from utils.registry import run_operation
+    data = payload(name, structure, n)
+    return lambda: run_operation(data)
@@ -0,0 +1,281 @@
+# ============================================
+# BENCHMARK RUNNER
+# ============================================
+#
+#     python -m benchmarks                   run, compare with the baseline
+#     python -m benchmarks --save            run, store as the new baseline
+#     python -m benchmarks --ops multiply,lu --sizes 64,256 --threshold 0.1
+#
+# Each case is timed with perf_counter (timeit, best of a few samples)
+# and run once more under tracemalloc for its peak memory. A case
+# regresses when it is both THRESHOLD slower (or bigger) than the
+# baseline and above a small absolute noise floor; any regression makes
+# the run exit with status 1.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+from benchmarks.cases import SIZES
+from benchmarks.cases import STRUCTURES
+from benchmarks.cases import build_cases
+from benchmarks.cases import case_names
+from benchmarks.cases import estimate_cost
+from benchmarks.cases import setup
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Each timing sample runs the case for at least SAMPLE_SECONDS; the best
+# of REPEATS samples is kept (noise only ever adds time)
+SAMPLE_SECONDS = 0.05
+REPEATS = 3
+
+# Relative slow-down (0.25 = 25%) that counts as a regression
+THRESHOLD = 0.25
+
+# Differences below these never count, however large relatively
+MIN_SECONDS = 50e-6
+MIN_BYTES = 64 * 1024
+
+# Cases estimated above this many scalar operations are skipped (about
+# a second of pure Python); raise it to include the large sizes
+MAX_COST = 10_000_000
+
+
+# --------------------------------------------
+# MEASUREMENT
+# --------------------------------------------
+
+def _failed(value):
+    return isinstance(value, dict) and value.get("status") == "error"
+
+
+def measure(func, memory=True):
+    """
+    Returns {"seconds", "runs", "peak_bytes"} for one callable, or
+    {"error"} when it fails
+    """
+    try:
+        value = func()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    if _failed(value):
+        return {"error": value["message"]}
+
+    # Enough calls per sample to fill SAMPLE_SECONDS, best of REPEATS
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        total = timer.timeit(number)
+        if total >= SAMPLE_SECONDS:
+            break
+        number = max(number * 2, int(number * SAMPLE_SECONDS / max(total, 1e-9) * 1.2))
+    samples = [total] + timer.repeat(repeat=REPEATS - 1 if total < 1 else 1, number=number)
+    result = {"seconds": min(samples) / number, "runs": number * len(samples)}
+
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run(names=None, structures=STRUCTURES, sizes=SIZES, backend="python",
+        max_cost=MAX_COST, memory=True, report=None):
+    """
+    Runs every applicable case under the given backend, with the
+    factorization cache off so repeats measure the real work
+    Returns {key: measurement}
+    """
+    from utils.backend import use_backend
+    from utils.cache import factorization_cache
+
+    results = {}
+    for key, name, structure, n in build_cases(names, structures, sizes):
+        if estimate_cost(name, structure, n) > max_cost:
+            results[key] = {"skipped": "estimated cost above --max-cost"}
+        else:
+            func = setup(name, structure, n)
+            with use_backend(backend), factorization_cache.disabled():
+                results[key] = measure(func, memory)
+        if report is not None:
+            report(key, results[key])
+    return results
+
+
+# --------------------------------------------
+# BASELINE
+# --------------------------------------------
+
+def metadata(backend):
+    return {
+        "backend": backend,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, backend, merge=True):
+    """
+    Writes the measured cases; with merge, cases this run did not cover
+    keep their stored values
+    """
+    baseline = load_baseline(path) if merge else None
+    stored = dict(baseline["results"]) if baseline else {}
+    stored.update({key: value for key, value in results.items() if "seconds" in value})
+
+    with open(path, "w") as f:
+        json.dump({"meta": metadata(backend), "results": dict(sorted(stored.items()))}, f, indent=1)
+        f.write("\n")
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Returns (regressions, improvements, new cases) against the baseline
+    Regressions and improvements are (key, metric, old, new, change)
+    """
+    regressions, improvements, new = [], [], []
+    stored = baseline["results"]
+
+    for key, current in results.items():
+        if "seconds" not in current:
+            continue
+        old = stored.get(key)
+        if old is None:
+            new.append(key)
+            continue
+
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_bytes", MIN_BYTES)):
+            if metric not in old or metric not in current:
+                continue
+            before, after = old[metric], current[metric]
+            if abs(after - before) < floor or before <= 0:
+                continue
+            change = after / before - 1
+            if change > threshold:
+                regressions.append((key, metric, before, after, change))
+            elif change < -threshold:
+                improvements.append((key, metric, before, after, change))
+
+    return regressions, improvements, new
+
+
+# --------------------------------------------
+# REPORTING
+# --------------------------------------------
+
+def _format(metric, value):
+    if metric == "peak_bytes":
+        return f"{value / 1024:.1f} KiB"
+    if value < 1e-3:
+        return f"{value * 1e6:.1f} µs"
+    if value < 1:
+        return f"{value * 1e3:.2f} ms"
+    return f"{value:.2f} s"
+
+
+def _line(key, result):
+    if "error" in result:
+        return f"  {key:<44} error: {result['error']}"
+    if "skipped" in result:
+        return f"  {key:<44} skipped"
+    memory = f"  peak {_format('peak_bytes', result['peak_bytes'])}" if "peak_bytes" in result else ""
+    return f"  {key:<44} {_format('seconds', result['seconds']):>12}{memory}"
+
+
+def _diff_table(title, rows):
+    lines = [title]
+    for key, metric, before, after, change in rows:
+        lines.append(
+            f"  {key:<44} {metric:<10} {_format(metric, before):>12} -> {_format(metric, after):>12}  ({change:+.0%})"
+        )
+    return "\n".join(lines)
+
+
+# --------------------------------------------
+# COMMAND LINE
+# --------------------------------------------
+
+def _list(text, cast=str):
+    return [cast(part) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="MatrixLab micro-benchmarks")
+    parser.add_argument("--ops", type=_list, help=f"comma-separated cases (default: all {len(case_names())})")
+    parser.add_argument("--structures", type=_list, default=list(STRUCTURES), help="dense,sparse,symmetric,triangular")
+    parser.add_argument("--sizes", type=lambda text: _list(text, int), default=list(SIZES), help="n for the n x n inputs")
+    parser.add_argument("--backend", default="python", help="compute backend to measure (default: python)")
+    parser.add_argument("--max-cost", type=float, default=MAX_COST, help="skip cases estimated above this many scalar ops")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="relative change that counts as a regression")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline instead of comparing")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--list", action="store_true", help="list the case names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(case_names()))
+        return 0
+
+    unknown = set(args.ops or []) - set(case_names())
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    results = run(
+        args.ops, args.structures, args.sizes, args.backend, args.max_cost,
+        memory=not args.no_memory, report=lambda key, result: print(_line(key, result), flush=True)
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": metadata(args.backend), "results": results}, f, indent=1)
+
+    if args.save:
+        save_baseline(args.baseline, results, args.backend)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one")
+        return 0
+    if baseline["meta"].get("backend") != args.backend:
+        print(f"\nBaseline was recorded with the {baseline['meta'].get('backend')} backend, not {args.backend}")
+        return 2
+
+    regressions, improvements, new = compare(results, baseline, args.threshold)
+    print(f"\nCompared with {args.baseline} (recorded {baseline['meta'].get('created')}, threshold {args.threshold:.0%})")
+    if improvements:
+        print(_diff_table(f"\n{len(improvements)} improvement(s):", improvements))
+    if new:
+        print(f"\n{len(new)} case(s) not in the baseline: {', '.join(new)}")
+    if regressions:
+        print(_diff_table(f"\n{len(regressions)} regression(s):", regressions))
+        return 1
+
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,7 +36,11 @@ const operationsByCategory = {
     ],
     algebra: [
         { value: "determinant", text: "Determinant", info: "Calculate the determinant of a square matrix" },
-        { value: "inverse", text: "Inverse Matrix", info: "Find the inverse of a 2×2 matrix (if it exists)" },
+        { value: "log_determinant", text: "Log Determinant", info: "Sign and natural log of |det(A)|, safe for large matrices" },
+        { value: "inverse", text: "Inverse Matrix", info: "Find the inverse of a square matrix (if it exists)" },
+        { value: "solve", text: "Solve AX = B", info: "Solve the linear system AX = B (each column of B is a right-hand side)" },
+        { value: "least_squares", text: "Least Squares", info: "Minimise ‖AX − B‖ for a tall, wide or rank-deficient A" },
+        { value: "pseudo_inverse", text: "Pseudoinverse", info: "Moore–Penrose pseudoinverse A⁺ from the SVD" },
         { value: "rank", text: "Rank", info: "Determine the rank (number of linearly independent rows)" },
         { value: "trace", text: "Trace", info: "Sum of all diagonal elements of a square matrix" },
         { value: "adjoint", text: "Adjoint Matrix", info: "Calculate the adjoint (adjugate) of a 2×2 matrix" }
@@ -44,18 +48,23 @@ const operationsByCategory = {
     decompositions: [
         { value: "lu", text: "LU Decomposition", info: "Decompose into Lower and Upper triangular matrices" },
         { value: "cholesky", text: "Cholesky Decomposition", info: "For symmetric positive definite matrices only" },
-        { value: "eigen", text: "Eigenvalues", info: "Find eigenvalues of a 2×2 matrix" }
+        { value: "qr", text: "QR Decomposition", info: "Orthogonal Q and upper triangular R (Householder reflections)" },
+        { value: "svd", text: "Singular Value Decomposition", info: "A = U × diag(S) × Vᵀ for any m×n matrix" },
+        { value: "eigen", text: "Eigenvalues", info: "Find eigenvalues of an n×n matrix" }
     ],
     data: [
         { value: "covariance", text: "Covariance", info: "Measure of how two variables change together" },
-        { value: "correlation", text: "Correlation", info: "Normalized measure of linear relationship" }
+        { value: "correlation", text: "Correlation", info: "Normalized measure of linear relationship" },
+        { value: "covariance_matrix", text: "Covariance Matrix", info: "Covariance of every column pair (rows are observations)" },
+        { value: "correlation_matrix", text: "Correlation Matrix", info: "Correlation of every column pair (rows are observations)" }
     ],
     utilities: [
         { value: "is_square", text: "Is Square", info: "Check if matrix has equal rows and columns" },
         { value: "dimensions", text: "Dimensions", info: "Get the size of the matrix (rows × columns)" },
         { value: "is_identity", text: "Is Identity", info: "Check if matrix is an identity matrix" },
         { value: "is_zero", text: "Is Zero", info: "Check if all elements are zero" },
-        { value: "is_symmetric", text: "Is Symmetric", info: "Check if matrix equals its transpose" }
+        { value: "is_symmetric", text: "Is Symmetric", info: "Check if matrix equals its transpose" },
+        { value: "profile", text: "Structure", info: "Classify as zero, identity, diagonal, triangular, banded or general in one pass" }
     ]
 };
 
@@ -165,7 +174,7 @@ function updateMatrixVisibility(operation) {
     
     // Operations that require Matrix B
     const requiresMatrixB = [
-        'add', 'subtract', 'multiply', 'equality', 'covariance', 'correlation'
+        'add', 'subtract', 'multiply', 'equality', 'covariance', 'correlation', 'solve', 'least_squares'
     ];
     
     // Hide or show Matrix A
@@ -416,7 +425,7 @@ async function calculateOperation() {
         
         // Operations that need Matrix B
         const requiresMatrixB = [
-            'add', 'subtract', 'multiply', 'equality', 'covariance', 'correlation'
+            'add', 'subtract', 'multiply', 'equality', 'covariance', 'correlation', 'solve', 'least_squares'
         ];
         
         if (requiresMatrixB.includes(operation)) {
@@ -527,6 +536,13 @@ function displayResult(data) {
         } else if (typeof data.result === 'object' && data.result.L && !data.result.U) {
             // Cholesky Decomposition
             html += `<div><h4 style="color: var(--steel-600); text-align: center; margin-bottom: 1rem; font-weight: 700;">Lower Triangular Matrix (L)</h4>${renderMatrix(data.result.L)}</div>`;
+        } else if (typeof data.result === 'object' && !Array.isArray(data.result)) {
+            // Other factorizations (QR, SVD): one matrix per factor
+            html += '<div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 2rem;">';
+            for (const [name, factor] of Object.entries(data.result)) {
+                html += `<div><h4 style="color: var(--steel-600); text-align: center; margin-bottom: 1rem; font-weight: 700;">${name}</h4>${renderMatrix(factor)}</div>`;
+            }
+            html += '</div>';
         } else if (Array.isArray(data.result)) {
             if (data.result.length === 1 && data.result[0].length === 1) {
                 // Single numeric value
@@ -534,9 +550,21 @@ function displayResult(data) {
             } else if (data.result.length === 1 && typeof data.result[0] === 'string') {
                 // String result (Yes/No, dimensions, etc.)
                 html += `<div class="scalar-result" style="font-size: 2rem;">${data.result[0]}</div>`;
-            } else if (data.result.length === 2 && data.result[0].length === 1 && data.result[1].length === 1) {
-                // Two eigenvalues
-                html += `<div class="scalar-result" style="font-size: 1.5rem;">λ₁ = ${formatNumber(data.result[0][0])}<br>λ₂ = ${formatNumber(data.result[1][0])}</div>`;
+            } else if (data.operation === 'Log Determinant') {
+                // [sign, log|det|]; log|det| is null for a singular matrix
+                const [sign, logAbs] = data.result[0];
+                const text = logAbs === null ? '−∞ (singular)' : formatNumber(logAbs);
+                html += `<div class="scalar-result" style="font-size: 1.5rem;">sign = ${formatNumber(sign)}<br>log|det| = ${text}</div>`;
+            } else if (data.operation === 'Eigenvalues') {
+                // One eigenvalue per row: [λ] or [re, im]
+                const values = data.result.map((row, i) => {
+                    let text = formatNumber(row[0]);
+                    if (row.length === 2 && row[1] !== 0) {
+                        text += ` ${row[1] < 0 ? '−' : '+'} ${formatNumber(Math.abs(row[1]))}i`;
+                    }
+                    return `λ${i + 1} = ${text}`;
+                });
+                html += `<div class="scalar-result" style="font-size: 1.5rem;">${values.join('<br>')}</div>`;
             } else {
                 // Matrix result
                 html += renderMatrix(data.result);
@@ -0,0 +1,351 @@
+# ============================================
+# BACKEND AGREEMENT
+# ============================================
+#
+# Every registered operation runs on the python and numpy backends with
+# the same payloads, and the two responses must agree: same status, same
+# result structure and value count, numbers within RTOL / ATOL. Integers
+# and floats compare as numbers (python keeps integer results where numpy
+# returns floats), and the backends may report different "method"s.
+# Factors that are unique only up to signs (QR, SVD, eigenvectors) are
+# compared through what they determine: their products and residuals.
+
+import math
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app import _execute
+from utils.registry import load_definitions
+from utils.registry import operations
+
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+# Extras that name the algorithm that ran, which backends choose freely
+IGNORED_KEYS = ("method",)
+
+
+def _random(rows, cols, seed, symmetric=False):
+    rng = random.Random(seed)
+    M = [[rng.uniform(-1, 1) for _ in range(cols)] for _ in range(rows)]
+    if symmetric:
+        M = [[(M[i][j] + M[j][i]) / 2 for j in range(cols)] for i in range(rows)]
+    return M
+
+
+def _diagonal(values):
+    return [[v if i == j else 0 for j in range(len(values))] for i, v in enumerate(values)]
+
+
+SPD = [[4, 1, 2], [1, 3, 0], [2, 0, 5]]
+GENERAL = [[1, 2, 3], [4, 5, 6], [7, 8, 10]]
+TALL = [[1, 2], [3, 4], [5, 6]]
+SINGULAR = [[1, 2], [2, 4]]
+ROTATION = [[0, -1], [1, 0]]
+NON_FINITE = [[math.inf, 2], [3, 4]]
+
+DENSE = _random(7, 7, 1)
+SYMMETRIC = _random(8, 8, 2, symmetric=True)
+WIDE = _random(4, 6, 3)
+
+
+# --------------------------------------------
+# PAYLOADS
+# --------------------------------------------
+
+# Payloads that must succeed on both backends, per operation
+CASES = {
+    "add": [{"matrixA": GENERAL, "matrixB": SPD}, {"matrixA": DENSE, "matrixB": DENSE}],
+    "subtract": [{"matrixA": GENERAL, "matrixB": SPD}, {"matrixA": WIDE, "matrixB": WIDE}],
+    "multiply": [
+        {"matrixA": TALL, "matrixB": [[1, 0, 2], [0, 1, 3]]},
+        {"matrixA": WIDE, "matrixB": DENSE[:6]},
+        # Structured operands against non-finite ones: 0 · inf is nan
+        {"matrixA": [[0, 0], [0, 0]], "matrixB": NON_FINITE},
+        {"matrixA": _diagonal([1, 1]), "matrixB": NON_FINITE},
+        {"matrixA": NON_FINITE, "matrixB": _diagonal([2, 3])},
+    ],
+    "chain_multiply": [{"matrices": [TALL, [[1, 2, 3], [4, 5, 6]], GENERAL]}, {"matrices": [WIDE, DENSE[:6], DENSE]}],
+    "expression": [
+        {"expression": "2*(A+B) - A'", "matrices": {"A": GENERAL, "B": SPD}},
+        {"expression": "(A - B')@A / 4", "matrices": {"A": DENSE, "B": DENSE}},
+    ],
+    "transpose": [{"matrixA": TALL}, {"matrixA": WIDE}],
+    "scalar_multiply": [{"matrixA": TALL, "scalar": 2.5}, {"matrixA": DENSE, "scalar": -3}],
+    "identity": [{"size": 1}, {"size": 4}],
+    "zero": [{"rows": 2, "cols": 3}],
+    "equality": [{"matrixA": GENERAL, "matrixB": GENERAL}, {"matrixA": GENERAL, "matrixB": SPD}],
+    "determinant": [{"matrixA": GENERAL}, {"matrixA": SINGULAR}, {"matrixA": [[1, 2], [3, 4]]}, {"matrixA": DENSE}],
+    "log_determinant": [{"matrixA": GENERAL}, {"matrixA": SINGULAR}, {"matrixA": DENSE}],
+    "inverse": [{"matrixA": GENERAL}, {"matrixA": SPD}, {"matrixA": DENSE}, {"matrixA": _diagonal([2, 0.5, 4])}],
+    "solve": [
+        {"matrixA": SPD, "matrixB": [1, 2, 3]},
+        {"matrixA": GENERAL, "matrixB": [[1, 0], [0, 1], [1, 1]]},
+        {"matrixA": DENSE, "matrixB": _random(7, 3, 4)},
+        {"matrixA": _diagonal([2, 4]), "matrixB": [1, 2]},
+    ],
+    "rank": [{"matrixA": GENERAL}, {"matrixA": SINGULAR}, {"matrixA": TALL}, {"matrixA": WIDE}],
+    "trace": [{"matrixA": GENERAL}, {"matrixA": DENSE}],
+    "adjoint": [{"matrixA": [[1, 2], [3, 4]]}],
+    "lu": [{"matrixA": GENERAL}, {"matrixA": SPD}],
+    "cholesky": [{"matrixA": SPD}],
+    "qr": [{"matrixA": TALL}, {"matrixA": TALL, "mode": "complete"}, {"matrixA": DENSE}, {"matrixA": WIDE}],
+    "svd": [{"matrixA": TALL}, {"matrixA": WIDE}, {"matrixA": DENSE}],
+    "pseudo_inverse": [{"matrixA": TALL}, {"matrixA": SINGULAR}, {"matrixA": WIDE}],
+    "least_squares": [{"matrixA": TALL, "matrixB": [1, 2, 2]}, {"matrixA": _random(9, 4, 5), "matrixB": _random(9, 2, 6)}],
+    "eigen": [
+        {"matrixA": SPD},
+        {"matrixA": GENERAL},
+        {"matrixA": ROTATION},
+        {"matrixA": SPD, "vectors": True},
+        {"matrixA": DENSE, "vectors": True},
+        {"matrixA": SYMMETRIC, "k": 3},
+        {"matrixA": DENSE, "k": 2},
+        {"matrixA": _diagonal([1, 1, 1]), "k": 2},
+        {"matrixA": _diagonal([2, 1, 1, 1]), "k": 3},
+        {"matrixA": _diagonal([2, 1, 1, 1]), "k": 3, "vectors": True},
+    ],
+    "covariance": [{"matrixA": [[1, 2, 3, 4]], "matrixB": [[2, 4, 5, 9]]}, {"matrixA": [[1, 2, 3, 4]], "matrixB": [[2, 4, 5, 9]], "ddof": 1}],
+    "correlation": [{"matrixA": [[1, 2, 3, 4]], "matrixB": [[2, 4, 5, 9]]}],
+    "covariance_matrix": [{"matrixA": DENSE}, {"matrixA": TALL, "ddof": 1}],
+    "correlation_matrix": [{"matrixA": TALL}, {"matrixA": DENSE}],
+    "is_square": [{"matrixA": TALL}, {"matrixA": GENERAL}],
+    "dimensions": [{"matrixA": WIDE}],
+    "is_identity": [{"matrixA": _diagonal([1, 1])}, {"matrixA": SPD}],
+    "is_zero": [{"matrixA": [[0, 0]]}, {"matrixA": TALL}],
+    "is_symmetric": [{"matrixA": SPD}, {"matrixA": GENERAL}],
+    "profile": [{"matrixA": SPD}, {"matrixA": DENSE}],
+}
+
+# Payloads that must fail on both backends (messages may differ)
+ERRORS = {
+    "add": [
+        {"matrixA": GENERAL, "matrixB": TALL},
+        # A "backend" that is not a name is an unknown backend, not a crash
+        {"matrixA": GENERAL, "matrixB": SPD, "backend": ["numpy"]},
+        {"matrixA": GENERAL, "matrixB": SPD, "backend": {"name": "python"}},
+    ],
+    "subtract": [{"matrixA": TALL, "matrixB": GENERAL}],
+    "multiply": [{"matrixA": TALL, "matrixB": TALL}],
+    "chain_multiply": [{"matrices": [TALL, TALL]}],
+    "expression": [{"expression": "A + B", "matrices": {"A": TALL, "B": GENERAL}}, {"expression": "A / 0", "matrices": {"A": TALL}}],
+    "transpose": [{"matrixA": [[1, 2], [3]]}],
+    "scalar_multiply": [{"matrixA": TALL, "scalar": "2"}],
+    "identity": [{"size": 0}],
+    "zero": [{"rows": 2}],
+    "equality": [{"matrixA": TALL}],
+    "determinant": [{"matrixA": TALL}],
+    "log_determinant": [{"matrixA": TALL}],
+    "inverse": [{"matrixA": SINGULAR}, {"matrixA": TALL}, {"matrixA": [[1, 1], [1, 1 + 1e-13]]}],
+    "solve": [{"matrixA": SINGULAR, "matrixB": [1, 2]}, {"matrixA": GENERAL, "matrixB": [1, 2]}, {"matrixA": TALL, "matrixB": [1, 2, 3]}],
+    "rank": [{"matrixA": []}],
+    "trace": [{"matrixA": TALL}],
+    "adjoint": [{"matrixA": GENERAL}],
+    "lu": [{"matrixA": TALL}],
+    "cholesky": [{"matrixA": GENERAL}, {"matrixA": [[1, 2], [2, 1]]}],
+    "qr": [{"matrixA": TALL, "mode": "full"}],
+    "svd": [{"matrixA": [[1, "x"]]}],
+    "pseudo_inverse": [{"matrixA": [[1], [2, 3]]}],
+    "least_squares": [{"matrixA": TALL, "matrixB": [1, 2]}],
+    "eigen": [{"matrixA": TALL}, {"matrixA": TALL, "k": 1}],
+    "covariance": [{"matrixA": [[1, 2, 3]], "matrixB": [[1, 2]]}, {"matrixA": [[1]], "matrixB": [[2]], "ddof": 1}],
+    "correlation": [{"matrixA": [[1, 1, 1]], "matrixB": [[1, 2, 3]]}],
+    "covariance_matrix": [{"matrixA": [[1, 2]], "ddof": 1}],
+    "correlation_matrix": [{"matrixA": [[1, 2], [1, 3]]}],
+    "is_square": [{}],
+    "dimensions": [{}],
+    "is_identity": [{}],
+    "is_zero": [{}],
+    "is_symmetric": [{}],
+    "profile": [{}],
+}
+
+
+def _run(name, payload, backend):
+    # Through the app's _execute, as /calculate runs it: a payload's own
+    # "backend" overrides the one under test
+    data = dict(payload, operation=name, cache=False)
+    data.setdefault("backend", backend)
+    response, _ = _execute(data)
+    response.pop("steps", None)
+    return response
+
+
+def _params(table):
+    return [
+        pytest.param(name, payload, id=f"{name}-{index}")
+        for name, payloads in table.items()
+        for index, payload in enumerate(payloads)
+    ]
+
+
+# --------------------------------------------
+# COMPARISON
+# --------------------------------------------
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def assert_close(expected, actual, path="response"):
+    """
+    Same structure and value count, numbers within tolerance (nan matches
+    nan); int and float are interchangeable, bool and str must match exactly
+    """
+    if _is_number(expected) or _is_number(actual):
+        assert _is_number(expected) and _is_number(actual), f"{path}: {expected!r} vs {actual!r}"
+        if math.isnan(expected) or math.isnan(actual):
+            assert math.isnan(expected) and math.isnan(actual), f"{path}: {expected!r} vs {actual!r}"
+        elif math.isinf(expected) or math.isinf(actual):
+            assert expected == actual, f"{path}: {expected!r} vs {actual!r}"
+        else:
+            assert math.isclose(expected, actual, rel_tol=RTOL, abs_tol=ATOL), f"{path}: {expected!r} vs {actual!r}"
+    elif isinstance(expected, dict):
+        assert isinstance(actual, dict), f"{path}: {type(expected).__name__} vs {type(actual).__name__}"
+        keys = set(expected) - set(IGNORED_KEYS)
+        assert keys == set(actual) - set(IGNORED_KEYS), f"{path}: keys {sorted(expected)} vs {sorted(actual)}"
+        for key in keys:
+            assert_close(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, (list, tuple)):
+        assert isinstance(actual, (list, tuple)), f"{path}: {type(expected).__name__} vs {type(actual).__name__}"
+        assert len(expected) == len(actual), f"{path}: {len(expected)} values vs {len(actual)}"
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            assert_close(a, b, f"{path}[{i}]")
+    else:
+        assert type(expected) is type(actual) and expected == actual, f"{path}: {expected!r} vs {actual!r}"
+
+
+def _matmul(A, B):
+    return [[sum(a * b for a, b in zip(row, col)) for col in zip(*B)] for row in A]
+
+
+def _shape(M):
+    return len(M), len(M[0]) if M else 0
+
+
+def _complex_matrix(M):
+    if isinstance(M, dict):
+        return [[complex(re, im) for re, im in zip(r, i)] for r, i in zip(M["real"], M["imag"])]
+    return M
+
+
+def _assert_product(factors, A, path):
+    product = factors[0]
+    for factor in factors[1:]:
+        product = _matmul(product, factor)
+    for i, (row, expected) in enumerate(zip(product, A)):
+        for j, (value, target) in enumerate(zip(row, expected)):
+            assert abs(value - target) <= 1e-9 * (1 + abs(target)), f"{path}[{i}][{j}]: {value!r} vs {target!r}"
+
+
+def _compare_qr(payload, expected, actual):
+    # Q and R are unique up to the signs of Q's columns / R's rows
+    A = payload["matrixA"]
+    for response in (expected, actual):
+        Q, R = response["result"]["Q"], response["result"]["R"]
+        _assert_product([Q, R], A, "Q·R")
+        assert all(abs(R[i][j]) <= 1e-12 for i in range(len(R)) for j in range(min(i, len(R[0])))), "R is not upper triangular"
+    Q, R = expected["result"]["Q"], expected["result"]["R"]
+    assert _shape(Q) == _shape(actual["result"]["Q"]) and _shape(R) == _shape(actual["result"]["R"])
+    assert_close(
+        [abs(R[i][i]) for i in range(min(_shape(R)))],
+        [abs(actual["result"]["R"][i][i]) for i in range(min(_shape(R)))],
+        "|diag(R)|"
+    )
+
+
+def _compare_svd(payload, expected, actual):
+    # Singular values are unique; U and Vt only up to paired column signs
+    assert_close(expected["result"]["S"], actual["result"]["S"], "S")
+    for response in (expected, actual):
+        U, S, Vt = (response["result"][key] for key in ("U", "S", "Vt"))
+        _assert_product([U, _diagonal(S[0]), Vt], payload["matrixA"], "U·S·Vt")
+    for key in ("U", "Vt"):
+        assert _shape(expected["result"][key]) == _shape(actual["result"][key]), key
+
+
+def _compare_eigen(payload, expected, actual):
+    # Values must agree; each backend's vectors must satisfy A·v = λ·v
+    # (they are unique only up to a scale of modulus one)
+    strip = lambda response: {key: value for key, value in response.items() if key != "eigenvectors"}
+    assert_close(strip(expected), strip(actual))
+    if "eigenvectors" not in expected:
+        assert "eigenvectors" not in actual
+        return
+
+    A = payload["matrixA"]
+    for response in (expected, actual):
+        Z = _complex_matrix(response["eigenvectors"])
+        values = [complex(*row) if len(row) == 2 else row[0] for row in response["result"]]
+        assert _shape(Z) == (len(A), len(values))
+        for j, value in enumerate(values):
+            v = [row[j] for row in Z]
+            Av = [sum(a * x for a, x in zip(row, v)) for row in A]
+            residual = max(abs(y - value * x) for y, x in zip(Av, v))
+            assert residual <= 1e-8 * (1 + abs(value)), f"A·v{j} - λ{j}·v{j} = {residual!r}"
+
+
+COMPARATORS = {
+    "qr": _compare_qr,
+    "svd": _compare_svd,
+    "eigen": _compare_eigen,
+}
+
+
+# --------------------------------------------
+# TESTS
+# --------------------------------------------
+
+def test_every_operation_is_covered():
+    load_definitions()
+    registered = {operation.name for operation in operations()}
+    assert registered == set(CASES), f"CASES: missing {registered - set(CASES)}, unknown {set(CASES) - registered}"
+    assert registered == set(ERRORS), f"ERRORS: missing {registered - set(ERRORS)}, unknown {set(ERRORS) - registered}"
+
+
+@pytest.mark.parametrize("name, payload", _params(CASES))
+@pytest.mark.filterwarnings("ignore:invalid value encountered:RuntimeWarning")
+def test_backends_agree(name, payload):
+    expected = _run(name, payload, "python")
+    actual = _run(name, payload, "numpy")
+
+    assert expected["status"] == "success", expected.get("message")
+    assert actual["status"] == "success", actual.get("message")
+    COMPARATORS.get(name, lambda payload, expected, actual: assert_close(expected, actual))(payload, expected, actual)
+
+
+@pytest.mark.parametrize("name, payload", _params(ERRORS))
+def test_backends_fail_alike(name, payload):
+    for backend in ("python", "numpy"):
+        response = _run(name, payload, backend)
+        assert response["status"] == "error", f"{backend}: {response}"
+        assert isinstance(response["message"], str) and response["message"]
+
+
+@pytest.mark.parametrize("A, B", [
+    ([[0, 0], [0, 0]], [[1, 2], [3, 4]]),
+    (_diagonal([1, 1]), [[1, 2], [3, 4]]),
+    (_diagonal([1.0, 1.0]), [[1, 2], [3, 4]]),
+    ([[1, 2, 0], [0, 1, 2], [0, 0, 1]], [[1, 0, 0], [2, 1, 0], [0, 3, 1]]),
+])
+def test_structured_products_keep_element_type(A, B):
+    # The shortcuts must return what the dense product would, types included
+    result = _run("multiply", {"matrixA": A, "matrixB": B}, "python")["result"]
+    expected = _matmul(A, B)
+    assert result == expected
+    assert [list(map(type, row)) for row in result] == [list(map(type, row)) for row in expected]
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_ill_conditioned_inverse_warns(backend):
+    # cond₁ ≈ 3.5e13: above ILL_CONDITIONED, yet every pivot is well above
+    # the singularity tolerance, so both backends invert it with a warning
+    hilbert = [[1 / (i + j + 1) for j in range(10)] for i in range(10)]
+    response = _run("inverse", {"matrixA": hilbert}, backend)
+    assert response["status"] == "success", response.get("message")
+    assert response["condition_number"] > 1e13
+    assert "ill-conditioned" in response["warning"]
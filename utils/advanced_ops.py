@@ -2,11 +2,269 @@
 # ADVANCED / DECOMPOSITION OPERATIONS
 # ============================================
 
+import math
+from operator import mul
+
+from utils.backend import dispatch
+from utils.cache import factorization_cache
+from utils.utilities_ops import is_symmetric
+from utils.utilities_ops import profile_matrix
+
+
+# Pivots smaller than this (relative to the largest |a_ij|) count as zero
+PIVOT_TOLERANCE = 1e-12
+
+# Machine epsilon for float64
+EPS = 2.220446049250313e-16
+
+
+def _lu_in_place(LU):
+    """
+    Gaussian elimination with partial pivoting on a list-of-lists copy
+    Leaves U in the upper triangle and the L multipliers below it
+    Returns the row permutation and its sign (+1 / -1)
+    """
+    n = len(LU)
+    perm = list(range(n))
+    sign = 1
+
+    for k in range(n):
+        pivot_index = max(range(k, n), key=lambda i: abs(LU[i][k]))
+        if pivot_index != k:
+            LU[k], LU[pivot_index] = LU[pivot_index], LU[k]
+            perm[k], perm[pivot_index] = perm[pivot_index], perm[k]
+            sign = -sign
+
+        pivot_row = LU[k]
+        pivot = pivot_row[k]
+        if pivot == 0:
+            continue
+
+        tail = pivot_row[k + 1:]
+        for i in range(k + 1, n):
+            row = LU[i]
+            factor = row[k] / pivot
+            row[k] = factor
+            if factor:
+                row[k + 1:] = [a - factor * b for a, b in zip(row[k + 1:], tail)]
+
+    return perm, sign
+
+
+class Factorization:
+    """
+    LU factorization with partial pivoting, PA = LU
+    Factor once, then reuse for determinant, solves and the inverse
+    """
+
+    __slots__ = ("LU", "perm", "sign", "n", "norm_1", "max_abs", "tolerance")
+
+    def __init__(self, LU, perm, sign, norm_1, max_abs, tolerance=PIVOT_TOLERANCE):
+        self.LU = LU
+        self.perm = perm
+        self.sign = sign
+        self.n = len(LU)
+        self.norm_1 = norm_1
+        self.max_abs = max_abs
+        self.tolerance = tolerance
+
+    # ---------- FACTORS ----------
+
+    @property
+    def L(self):
+        return [
+            [self.LU[i][j] if j < i else (1.0 if j == i else 0.0) for j in range(self.n)]
+            for i in range(self.n)
+        ]
+
+    @property
+    def U(self):
+        return [
+            [self.LU[i][j] if j >= i else 0.0 for j in range(self.n)]
+            for i in range(self.n)
+        ]
+
+    @property
+    def P(self):
+        return [[1 if j == p else 0 for j in range(self.n)] for p in self.perm]
+
+    # ---------- PROPERTIES ----------
+
+    @property
+    def singular(self):
+        threshold = self.tolerance * self.max_abs
+        return any(abs(self.LU[i][i]) <= threshold for i in range(self.n))
+
+    def determinant(self):
+        value = float(self.sign)
+        for i in range(self.n):
+            value *= self.LU[i][i]
+        return value if value != 0 else 0.0
+
+    def log_determinant(self):
+        sign = float(self.sign)
+        log_abs = 0.0
+        for i in range(self.n):
+            value = self.LU[i][i]
+            if value == 0:
+                return 0.0, -math.inf
+            if value < 0:
+                sign = -sign
+            log_abs += math.log(abs(value))
+        return sign, log_abs
+
+    # ---------- SOLVES ----------
+
+    def solve(self, B):
+        """
+        Solves AX = B for an n-vector or an n x k matrix of right-hand sides
+        Costs O(n^2) per right-hand side
+        """
+        self._check_singular()
+
+        if len(B) != self.n:
+            raise ValueError("Right-hand side must have as many rows as the matrix")
+
+        vector = not hasattr(B[0], "__len__")
+        rows = [[B[p]] if vector else list(B[p]) for p in self.perm]
+
+        LU = self.LU
+        n = self.n
+
+        # Forward substitution with unit lower triangular L
+        for i in range(n):
+            row_L = LU[i]
+            x = rows[i]
+            for j in range(i):
+                factor = row_L[j]
+                if factor:
+                    x = [a - factor * b for a, b in zip(x, rows[j])]
+            rows[i] = x
+
+        # Back substitution with U
+        for i in range(n - 1, -1, -1):
+            row_U = LU[i]
+            x = rows[i]
+            for j in range(i + 1, n):
+                factor = row_U[j]
+                if factor:
+                    x = [a - factor * b for a, b in zip(x, rows[j])]
+            pivot = row_U[i]
+            rows[i] = [a / pivot for a in x]
+
+        return [row[0] for row in rows] if vector else rows
+
+    def solve_transpose(self, b):
+        """
+        Solves A^T x = b for a single vector (used by the condition estimate)
+        """
+        self._check_singular()
+
+        LU = self.LU
+        n = self.n
+        y = list(b)
+
+        # U^T y = b
+        for i in range(n):
+            total = y[i]
+            for j in range(i):
+                total -= LU[j][i] * y[j]
+            y[i] = total / LU[i][i]
+
+        # L^T z = y
+        for i in range(n - 1, -1, -1):
+            total = y[i]
+            for j in range(i + 1, n):
+                total -= LU[j][i] * y[j]
+            y[i] = total
+
+        x = [0.0] * n
+        for k, p in enumerate(self.perm):
+            x[p] = y[k]
+        return x
+
+    def inverse(self):
+        identity = [[1.0 if i == j else 0.0 for j in range(self.n)] for i in range(self.n)]
+        return self.solve(identity)
+
+    def condition_estimate(self):
+        """
+        Estimates the 1-norm condition number ||A||_1 * ||A^-1||_1
+        with Hager's method: a few O(n^2) solves instead of forming A^-1
+        """
+        if self.singular:
+            return math.inf
+
+        n = self.n
+        x = [1.0 / n] * n
+        estimate = 0.0
+
+        for _ in range(5):
+            y = self.solve(x)
+            estimate = sum(abs(v) for v in y)
+
+            z = self.solve_transpose([1.0 if v >= 0 else -1.0 for v in y])
+            j = max(range(n), key=lambda i: abs(z[i]))
+            if abs(z[j]) <= sum(a * b for a, b in zip(z, x)):
+                break
+
+            x = [0.0] * n
+            x[j] = 1.0
+
+        return self.norm_1 * estimate
+
+    def _check_singular(self):
+        if self.singular:
+            raise ValueError(
+                "Matrix is singular to working precision "
+                f"(pivot below {self.tolerance:g} x max|a_ij|)"
+            )
+
+
+@dispatch
+def lu_factor(A, tolerance=PIVOT_TOLERANCE):
+    """
+    Factors a square matrix as PA = LU with partial pivoting
+    Returns a reusable Factorization
+    """
+    n = len(A)
+    if n == 0 or n != len(A[0]):
+        raise ValueError("Matrix must be square")
+
+    # Factorization is never mutated after construction, so it is shared
+    return factorization_cache.lookup("lu_factor", A, lambda: _lu_factor(A, tolerance), tolerance)
+
+
+def _lu_factor(A, tolerance):
+    n = len(A)
+    LU = [[float(v) for v in row] for row in A]
+    norm_1 = max(sum(abs(row[j]) for row in LU) for j in range(n))
+    max_abs = max(max(map(abs, row)) for row in LU)
+
+    # A triangular matrix already is its own factorization: O(n^2), no pivoting
+    profile = profile_matrix(A)
+    if profile.upper or (profile.lower and all(LU[i][i] for i in range(n))):
+        if not profile.upper:
+            # Lower: A = (A D^-1) D with D its diagonal, so L = A D^-1, U = D
+            for i, row in enumerate(LU):
+                row[:i] = [v / LU[j][j] for j, v in enumerate(row[:i])]
+        return Factorization(LU, list(range(n)), 1, norm_1, max_abs, tolerance)
+
+    perm, sign = _lu_in_place(LU)
+    return Factorization(LU, perm, sign, norm_1, max_abs, tolerance)
+
+
+@dispatch
 def lu_decomposition(A):
     """
     Performs LU Decomposition of matrix A
     Returns L and U matrices
     """
+    L, U = factorization_cache.lookup("lu", A, lambda: _doolittle(A))
+    return [row[:] for row in L], [row[:] for row in U]
+
+
+def _doolittle(A):
     n = len(A)
 
     L = [[0 for _ in range(n)] for _ in range(n)]
@@ -30,12 +288,18 @@ def lu_decomposition(A):
     return L, U
 
 
+@dispatch
 def cholesky_decomposition(A):
     """
     Performs Cholesky Decomposition
     Matrix must be symmetric and positive definite
     Returns lower triangular matrix L
     """
+    L = factorization_cache.lookup("cholesky", A, lambda: _cholesky(A))
+    return [row[:] for row in L]
+
+
+def _cholesky(A):
     n = len(A)
     L = [[0.0 for _ in range(n)] for _ in range(n)]
 
@@ -46,16 +310,476 @@ def cholesky_decomposition(A):
                 sum_val += L[i][k] * L[j][k]
 
             if i == j:
-                L[i][j] = (A[i][i] - sum_val) ** 0.5
+                pivot = A[i][i] - sum_val
+                if pivot <= 0:
+                    raise ValueError("Matrix is not positive definite")
+                L[i][j] = pivot ** 0.5
             else:
                 L[i][j] = (A[i][j] - sum_val) / L[j][j]
 
     return L
 
 
+@dispatch
+def cholesky_solve(L, B):
+    """
+    Solves (L L^T) X = B given the Cholesky factor L
+    B is an n-vector or an n x k matrix of right-hand sides
+    """
+    n = len(L)
+    if len(B) != n:
+        raise ValueError("Right-hand side must have as many rows as the matrix")
+
+    vector = not hasattr(B[0], "__len__")
+    rows = [[b] if vector else list(b) for b in B]
+
+    # L y = B
+    for i in range(n):
+        row_L = L[i]
+        y = rows[i]
+        for j in range(i):
+            factor = row_L[j]
+            if factor:
+                y = [a - factor * b for a, b in zip(y, rows[j])]
+        pivot = row_L[i]
+        rows[i] = [a / pivot for a in y]
+
+    # L^T x = y
+    for i in range(n - 1, -1, -1):
+        x = rows[i]
+        for j in range(i + 1, n):
+            factor = L[j][i]
+            if factor:
+                x = [a - factor * b for a, b in zip(x, rows[j])]
+        pivot = L[i][i]
+        rows[i] = [a / pivot for a in x]
+
+    return [row[0] for row in rows] if vector else rows
+
+
+# ---------- HOUSEHOLDER QR ----------
+#
+# The QR and SVD kernels work on a list of columns: every reflector and
+# rotation then updates whole columns with one list comprehension each,
+# instead of touching one element per row.
+
+def _columns(A):
+    return [[float(v) for v in col] for col in zip(*A)]
+
+
+def _rows(columns):
+    return [list(row) for row in zip(*columns)]
+
+
+def _householder(x):
+    """
+    Reflector I - beta v v^T that maps x onto alpha e1
+    Returns (v, beta, alpha); beta is 0 when x is already zero below x[0]
+    """
+    norm = math.sqrt(sum(map(mul, x, x)))
+    if norm == 0.0:
+        return x[:], 0.0, 0.0
+
+    alpha = -norm if x[0] >= 0 else norm
+    v = x[:]
+    v[0] -= alpha
+    vv = sum(map(mul, v, v))
+    if vv == 0.0:
+        return v, 0.0, x[0]
+    return v, 2.0 / vv, alpha
+
+
+def _reflect(column, v, beta, start):
+    # column[start:] -= beta (v . column[start:]) v
+    tail = column[start:]
+    s = beta * sum(map(mul, v, tail))
+    if s:
+        column[start:] = [t - s * w for t, w in zip(tail, v)]
+
+
+def _householder_qr(columns, m, n):
+    """
+    Reduces the columns in place to R; returns the reflectors [(v, beta)]
+    """
+    reflectors = []
+    for k in range(min(m - 1, n)):
+        v, beta, alpha = _householder(columns[k][k:])
+        reflectors.append((v, beta))
+        if beta:
+            columns[k][k:] = [alpha] + [0.0] * (m - k - 1)
+            for j in range(k + 1, n):
+                _reflect(columns[j], v, beta, k)
+    return reflectors
+
+
+def _accumulate(reflectors, m, count, offset=0):
+    """
+    First count columns of H_0 H_1 ... applied to the identity; reflector k
+    acts on rows offset + k onwards
+    """
+    columns = [[0.0] * m for _ in range(count)]
+    for j in range(count):
+        columns[j][j] = 1.0
+
+    for k in range(len(reflectors) - 1, -1, -1):
+        v, beta = reflectors[k]
+        if beta:
+            start = offset + k
+            # Columns left of start are still unit vectors the reflector misses
+            for j in range(min(start, count), count):
+                _reflect(columns[j], v, beta, start)
+    return columns
+
+
+@dispatch
+def qr_decomposition(A, mode="reduced"):
+    """
+    Householder QR, A = QR
+    mode "reduced" (economy): Q is m x k and R is k x n, k = min(m, n)
+    mode "complete": Q is m x m and R is m x n
+    Returns (Q, R)
+    """
+    if mode not in ("reduced", "complete"):
+        raise ValueError(f"Unknown QR mode '{mode}', expected 'reduced' or 'complete'")
+
+    Q, R = factorization_cache.lookup("qr", A, lambda: _qr(A, mode), mode)
+    return [row[:] for row in Q], [row[:] for row in R]
+
+
+def _qr(A, mode):
+    m, n = len(A), len(A[0])
+    columns = _columns(A)
+    reflectors = _householder_qr(columns, m, n)
+
+    k = min(m, n) if mode == "reduced" else m
+    R = [[columns[j][i] if j >= i else 0.0 for j in range(n)] for i in range(k)]
+    Q = _rows(_accumulate(reflectors, m, k))
+    return Q, R
+
+
+# ---------- SVD ----------
+
+def _bidiagonalize(columns, m, n):
+    """
+    Golub-Kahan: Householder reflectors from the left and right reduce the
+    columns (m >= n) to upper bidiagonal form
+    Returns (d, e, left reflectors, right reflectors)
+    """
+    d = [0.0] * n
+    e = [0.0] * max(n - 1, 0)
+    left, right = [], []
+
+    for k in range(n):
+        # Left: zero column k below the diagonal
+        v, beta, alpha = _householder(columns[k][k:])
+        left.append((v, beta))
+        if beta:
+            d[k] = alpha
+            for j in range(k + 1, n):
+                _reflect(columns[j], v, beta, k)
+        else:
+            d[k] = columns[k][k]
+
+        if k >= n - 1:
+            continue
+        if k == n - 2:
+            e[k] = columns[k + 1][k]
+            continue
+
+        # Right: zero row k beyond the superdiagonal, as w = A v and
+        # A -= beta w v^T over the trailing columns
+        v, beta, alpha = _householder([columns[j][k] for j in range(k + 1, n)])
+        right.append((v, beta))
+        e[k] = alpha if beta else columns[k + 1][k]
+        if beta:
+            w = [0.0] * (m - k - 1)
+            for vj, j in zip(v, range(k + 1, n)):
+                if vj:
+                    w = [a + vj * b for a, b in zip(w, columns[j][k + 1:])]
+            for vj, j in zip(v, range(k + 1, n)):
+                s = beta * vj
+                if s:
+                    column = columns[j]
+                    column[k + 1:] = [a - s * b for a, b in zip(column[k + 1:], w)]
+
+    return d, e, left, right
+
+
+def _rotate(vectors, i, j, c, s):
+    if vectors is not None:
+        a, b = vectors[i], vectors[j]
+        vectors[i] = [c * x + s * y for x, y in zip(a, b)]
+        vectors[j] = [c * y - s * x for x, y in zip(a, b)]
+
+
+def _bidiagonal_svd(d, e, U, V, max_sweeps=75):
+    """
+    Implicit-shift QR on the bidiagonal (d, e) until e vanishes (Golub-Kahan
+    SVD steps with a Wilkinson shift); rotations are applied to the column
+    lists U and V when given
+    """
+    n = len(d)
+    norm = max([abs(x) for x in d] + [abs(x) for x in e] + [0.0])
+    iterations = 0
+
+    while True:
+        for i in range(n - 1):
+            if abs(e[i]) <= EPS * (abs(d[i]) + abs(d[i + 1])):
+                e[i] = 0.0
+
+        # Trailing unreduced block [low, high]
+        high = n - 1
+        while high > 0 and e[high - 1] == 0.0:
+            high -= 1
+        if high == 0:
+            return
+        low = high - 1
+        while low > 0 and e[low - 1] != 0.0:
+            low -= 1
+
+        iterations += 1
+        if iterations > max_sweeps * n:
+            raise ValueError("SVD did not converge")
+
+        # A zero on the diagonal splits the block: rotate its e away first
+        zero = next((i for i in range(low, high + 1) if abs(d[i]) <= EPS * norm), None)
+        if zero is not None:
+            d[zero] = 0.0
+            if zero < high:
+                # Chase e[zero] along row zero with left rotations
+                bulge, e[zero] = e[zero], 0.0
+                for j in range(zero + 1, high + 1):
+                    r = math.hypot(d[j], bulge)
+                    c, s = d[j] / r, bulge / r
+                    d[j] = r
+                    _rotate(U, j, zero, c, s)
+                    if j < high:
+                        bulge, e[j] = -s * e[j], c * e[j]
+            else:
+                # Chase e[high - 1] up column high with right rotations
+                bulge, e[high - 1] = e[high - 1], 0.0
+                for j in range(high - 1, low - 1, -1):
+                    r = math.hypot(d[j], bulge)
+                    c, s = d[j] / r, bulge / r
+                    d[j] = r
+                    _rotate(V, j, high, c, s)
+                    if j > low:
+                        bulge, e[j - 1] = -s * e[j - 1], c * e[j - 1]
+            continue
+
+        # Wilkinson shift from the trailing 2x2 of B^T B
+        t11 = d[high - 1] ** 2 + (e[high - 2] ** 2 if high - 1 > low else 0.0)
+        t12 = d[high - 1] * e[high - 1]
+        t22 = d[high] ** 2 + e[high - 1] ** 2
+        delta = (t11 - t22) / 2
+        denominator = delta + math.copysign(math.hypot(delta, t12), delta)
+        shift = t22 - (t12 * t12 / denominator if denominator else 0.0)
+
+        y = d[low] * d[low] - shift
+        z = d[low] * e[low]
+        for k in range(low, high):
+            # Right rotation on columns k, k + 1
+            r = math.hypot(y, z)
+            c, s = (y / r, z / r) if r else (1.0, 0.0)
+            if k > low:
+                e[k - 1] = r
+            f, g = d[k], e[k]
+            d[k], e[k] = c * f + s * g, c * g - s * f
+            bulge = s * d[k + 1]
+            d[k + 1] *= c
+            _rotate(V, k, k + 1, c, s)
+
+            # Left rotation on rows k, k + 1 removes the bulge below d[k]
+            r = math.hypot(d[k], bulge)
+            c, s = (d[k] / r, bulge / r) if r else (1.0, 0.0)
+            d[k] = r
+            f, g = e[k], d[k + 1]
+            e[k], d[k + 1] = c * f + s * g, c * g - s * f
+            _rotate(U, k, k + 1, c, s)
+            if k < high - 1:
+                y, z = e[k], s * e[k + 1]
+                e[k + 1] *= c
+
+
+def _svd(A, compute_uv=True):
+    m, n = len(A), len(A[0])
+    if m < n:
+        # A^T = V S U^T
+        U, S, Vt = _svd(_columns(A), compute_uv)
+        if not compute_uv:
+            return None, S, None
+        return _rows(Vt), S, _rows(U)
+
+    columns = _columns(A)
+    d, e, left, right = _bidiagonalize(columns, m, n)
+
+    U = V = None
+    if compute_uv:
+        U = _accumulate(left, m, n)
+        V = _accumulate(right, n, n, offset=1)
+
+    _bidiagonal_svd(d, e, U, V)
+
+    # Non-negative singular values in descending order
+    order = sorted(range(n), key=lambda i: -abs(d[i]))
+    S = [abs(d[i]) for i in order]
+    if not compute_uv:
+        return None, S, None
+
+    for i in range(n):
+        if d[i] < 0:
+            V[i] = [-x for x in V[i]]
+    U = _rows([U[i] for i in order])
+    Vt = [V[i] for i in order]
+    return U, S, Vt
+
+
+@dispatch
+def svd(A):
+    """
+    Economy singular value decomposition A = U diag(S) Vt, k = min(m, n)
+    Returns (U m x k, S descending list of k values, Vt k x n)
+    """
+    U, S, Vt = factorization_cache.lookup("svd", A, lambda: _svd(A))
+    return [row[:] for row in U], S[:], [row[:] for row in Vt]
+
+
+@dispatch
+def singular_values(A):
+    """
+    Singular values only, in descending order (no U or V accumulation)
+    """
+    return factorization_cache.lookup("singular_values", A, lambda: _svd(A, compute_uv=False)[1])[:]
+
+
+def rank_tolerance(S, shape, tolerance=None):
+    """
+    Singular values at or below this count as zero: the given tolerance, or
+    max(m, n) * EPS * largest singular value (NumPy's default)
+    """
+    if tolerance is not None:
+        return tolerance
+    return max(shape) * EPS * (S[0] if S else 0.0)
+
+
+@dispatch
+def pseudo_inverse(A, tolerance=None):
+    """
+    Moore-Penrose pseudoinverse V diag(1/s) U^T from the SVD, dropping
+    singular values at or below the rank tolerance
+    Returns an n x m matrix
+    """
+    m, n = len(A), len(A[0])
+    U, S, Vt = svd(A)
+    cutoff = rank_tolerance(S, (m, n), tolerance)
+
+    result = [[0.0] * m for _ in range(n)]
+    for k, s in enumerate(S):
+        if s <= cutoff:
+            break
+        u = [row[k] for row in U]
+        for i in range(n):
+            factor = Vt[k][i] / s
+            if factor:
+                result[i] = [a + factor * b for a, b in zip(result[i], u)]
+    return result
+
+
+@dispatch
+def least_squares(A, B, tolerance=None):
+    """
+    Minimises ||AX - B|| for an m x n matrix A and an m-vector or m x k B
+    Householder QR when A has full column rank, otherwise the minimum-norm
+    solution from the SVD
+    Returns (X, {"method", "rank", "residual"})
+    """
+    m, n = len(A), len(A[0])
+    if len(B) != m:
+        raise ValueError("Right-hand side must have as many rows as the matrix")
+
+    vector = not hasattr(B[0], "__len__")
+    rows = [[float(b)] if vector else [float(v) for v in b] for b in B]
+
+    X, method, rank_A = _least_squares_qr(A, rows, m, n) if m >= n else (None, None, None)
+    if X is None:
+        X, rank_A = _least_squares_svd(A, rows, m, n, tolerance)
+        method = "svd"
+
+    # ||AX - B||, Frobenius over all right-hand sides
+    residual = 0.0
+    for row_A, row_B in zip(A, rows):
+        fitted = [0.0] * len(row_B)
+        for a, x in zip(row_A, X):
+            if a:
+                fitted = [f + a * v for f, v in zip(fitted, x)]
+        residual += sum((f - b) ** 2 for f, b in zip(fitted, row_B))
+
+    info = {"method": method, "rank": rank_A, "residual": math.sqrt(residual)}
+    return ([row[0] for row in X] if vector else X), info
+
+
+def _least_squares_qr(A, rows, m, n):
+    # Returns (None, None, None) when R shows A is rank deficient
+    columns = [[float(v) for v in col] for col in zip(*A)]
+    reflectors = _householder_qr(columns, m, n)
+
+    diagonal = [abs(columns[i][i]) for i in range(n)]
+    if min(diagonal) <= max(m, n) * EPS * max(diagonal):
+        return None, None, None
+
+    # Q^T B, one reflector at a time, on the columns of B
+    B_columns = [list(col) for col in zip(*rows)]
+    for k, (v, beta) in enumerate(reflectors):
+        if beta:
+            for column in B_columns:
+                _reflect(column, v, beta, k)
+    C = [list(row) for row in zip(*B_columns)][:n]
+
+    # Back substitution with R
+    X = [None] * n
+    for i in range(n - 1, -1, -1):
+        x = C[i]
+        for j in range(i + 1, n):
+            factor = columns[j][i]
+            if factor:
+                x = [a - factor * b for a, b in zip(x, X[j])]
+        pivot = columns[i][i]
+        X[i] = [a / pivot for a in x]
+
+    return X, "qr", n
+
+
+def _least_squares_svd(A, rows, m, n, tolerance):
+    U, S, Vt = svd(A)
+    cutoff = rank_tolerance(S, (m, n), tolerance)
+    k = len(rows[0])
+
+    # X = V diag(1/s) U^T B over the singular values kept
+    X = [[0.0] * k for _ in range(n)]
+    rank_A = 0
+    for index, s in enumerate(S):
+        if s <= cutoff:
+            break
+        rank_A += 1
+        coefficients = [0.0] * k
+        for row_U, row_B in zip(U, rows):
+            u = row_U[index]
+            if u:
+                coefficients = [c + u * b for c, b in zip(coefficients, row_B)]
+        coefficients = [c / s for c in coefficients]
+        for i in range(n):
+            v = Vt[index][i]
+            if v:
+                X[i] = [x + v * c for x, c in zip(X[i], coefficients)]
+
+    return X, rank_A
+
+
+@dispatch
 def eigenvalues_2x2(A):
     """
     Computes eigenvalues of a 2x2 matrix
+    A negative discriminant gives a complex conjugate pair (+i part first)
     """
     a = A[0][0]
     b = A[0][1]
@@ -65,9 +789,525 @@ def eigenvalues_2x2(A):
     trace = a + d
     determinant = (a * d) - (b * c)
 
-    discriminant = (trace ** 2 - 4 * determinant) ** 0.5
+    discriminant = trace ** 2 - 4 * determinant
+    if discriminant < 0:
+        root = complex(0, math.sqrt(-discriminant))
+    else:
+        root = math.sqrt(discriminant)
 
-    lambda1 = (trace + discriminant) / 2
-    lambda2 = (trace - discriminant) / 2
+    lambda1 = (trace + root) / 2
+    lambda2 = (trace - root) / 2
 
     return lambda1, lambda2
+
+
+# ---------- N x N EIGENVALUES ----------
+
+def _tridiagonalize(columns, n):
+    """
+    Householder reduction of a symmetric matrix (as columns) to tridiagonal
+    Q^T A Q; returns (d, e, reflectors acting on rows k + 1 onwards)
+    """
+    reflectors = []
+    for k in range(n - 2):
+        v, beta, alpha = _householder(columns[k][k + 1:])
+        reflectors.append((v, beta))
+        if not beta:
+            continue
+        columns[k][k + 1:] = [alpha] + [0.0] * (n - k - 2)
+        columns[k + 1][k] = alpha
+
+        # A22 -= v w^T + w v^T with p = beta A22 v, w = p - (beta p.v / 2) v
+        start = k + 1
+        p = [0.0] * (n - start)
+        for vj, j in zip(v, range(start, n)):
+            if vj:
+                p = [a + vj * b for a, b in zip(p, columns[j][start:])]
+        p = [beta * x for x in p]
+        half = beta * sum(map(mul, p, v)) / 2
+        w = [a - half * b for a, b in zip(p, v)]
+        for vj, wj, j in zip(v, w, range(start, n)):
+            column = columns[j]
+            column[start:] = [a - vj * x - wj * y for a, x, y in zip(column[start:], w, v)]
+
+    d = [columns[i][i] for i in range(n)]
+    e = [columns[i + 1][i] for i in range(n - 1)]
+    return d, e, reflectors
+
+
+def _tridiagonal_qr(d, e, Z, max_sweeps=50):
+    """
+    Implicit symmetric QR with a Wilkinson shift on the tridiagonal (d, e);
+    rotations are folded into the column lists Z when given
+    """
+    n = len(d)
+    iterations = 0
+
+    while True:
+        for i in range(n - 1):
+            if abs(e[i]) <= EPS * (abs(d[i]) + abs(d[i + 1])):
+                e[i] = 0.0
+
+        high = n - 1
+        while high > 0 and e[high - 1] == 0.0:
+            high -= 1
+        if high == 0:
+            return
+        low = high - 1
+        while low > 0 and e[low - 1] != 0.0:
+            low -= 1
+
+        iterations += 1
+        if iterations > max_sweeps * n:
+            raise ValueError("Eigenvalue iteration did not converge")
+
+        delta = (d[high - 1] - d[high]) / 2
+        denominator = delta + math.copysign(math.hypot(delta, e[high - 1]), delta)
+        shift = d[high] - (e[high - 1] ** 2 / denominator if denominator else 0.0)
+
+        x, z = d[low] - shift, e[low]
+        for k in range(low, high):
+            r = math.hypot(x, z)
+            c, s = (x / r, z / r) if r else (1.0, 0.0)
+            if k > low:
+                e[k - 1] = r
+            a, b, dd = d[k], e[k], d[k + 1]
+            d[k] = c * c * a + 2 * c * s * b + s * s * dd
+            d[k + 1] = s * s * a - 2 * c * s * b + c * c * dd
+            e[k] = c * s * (dd - a) + (c * c - s * s) * b
+            _rotate(Z, k, k + 1, c, s)
+            if k < high - 1:
+                x, z = e[k], s * e[k + 1]
+                e[k + 1] *= c
+
+
+def _symmetric_eigen(A, vectors):
+    """
+    Eigenvalues (descending) and, optionally, orthonormal eigenvectors as
+    columns of a list of rows
+    """
+    n = len(A)
+    columns = _columns(A)
+    d, e, reflectors = _tridiagonalize(columns, n)
+
+    Z = _accumulate(reflectors, n, n, offset=1) if vectors else None
+    _tridiagonal_qr(d, e, Z)
+
+    order = sorted(range(n), key=lambda i: -d[i])
+    values = [d[i] for i in order]
+    return values, (_rows([Z[i] for i in order]) if vectors else None)
+
+
+def _hessenberg(columns, n):
+    """
+    Householder reduction to upper Hessenberg form Q^T A Q, in place on the
+    columns; returns the reflectors (acting on rows k + 1 onwards)
+    """
+    reflectors = []
+    for k in range(n - 2):
+        v, beta, alpha = _householder(columns[k][k + 1:])
+        reflectors.append((v, beta))
+        if not beta:
+            continue
+
+        # Left: H A on rows k + 1 onwards
+        columns[k][k + 1:] = [alpha] + [0.0] * (n - k - 2)
+        for j in range(k + 1, n):
+            _reflect(columns[j], v, beta, k + 1)
+
+        # Right: A H, as w = A v and A -= beta w v^T over columns k + 1 onwards
+        w = [0.0] * n
+        for vj, j in zip(v, range(k + 1, n)):
+            if vj:
+                w = [a + vj * b for a, b in zip(w, columns[j])]
+        for vj, j in zip(v, range(k + 1, n)):
+            factor = beta * vj
+            if factor:
+                columns[j] = [a - factor * b for a, b in zip(columns[j], w)]
+
+    return reflectors
+
+
+def _hessenberg_qr(a):
+    """
+    Francis double-shift QR on an upper Hessenberg matrix (list of rows,
+    overwritten), after EISPACK's hqr
+    Returns the eigenvalues as floats or complex numbers
+    """
+    n = len(a)
+    values = [0.0] * n
+    norm = sum(abs(a[i][j]) for i in range(n) for j in range(max(i - 1, 0), n))
+    shift = 0.0
+    nn = n - 1
+
+    while nn >= 0:
+        its = 0
+        while True:
+            # Look for a single small subdiagonal element
+            l = nn
+            while l >= 1:
+                s = abs(a[l - 1][l - 1]) + abs(a[l][l]) or norm
+                if abs(a[l][l - 1]) + s == s:
+                    a[l][l - 1] = 0.0
+                    break
+                l -= 1
+
+            x = a[nn][nn]
+            if l == nn:
+                # One root found
+                values[nn] = x + shift
+                nn -= 1
+                break
+
+            y = a[nn - 1][nn - 1]
+            w = a[nn][nn - 1] * a[nn - 1][nn]
+            if l == nn - 1:
+                # Two roots found: real pair or complex conjugates
+                p = 0.5 * (y - x)
+                q = p * p + w
+                z = math.sqrt(abs(q))
+                x += shift
+                if q >= 0.0:
+                    z = p + math.copysign(z, p)
+                    values[nn - 1] = values[nn] = x + z
+                    if z:
+                        values[nn] = x - w / z
+                else:
+                    values[nn - 1] = complex(x + p, z)
+                    values[nn] = complex(x + p, -z)
+                nn -= 2
+                break
+
+            if its == 60:
+                raise ValueError("Eigenvalue iteration did not converge")
+            if its in (10, 20, 40):
+                # Exceptional shift
+                shift += x
+                for i in range(nn + 1):
+                    a[i][i] -= x
+                s = abs(a[nn][nn - 1]) + abs(a[nn - 1][nn - 2])
+                x = y = 0.75 * s
+                w = -0.4375 * s * s
+            its += 1
+
+            # Double shift; look for two consecutive small subdiagonals
+            m = nn - 2
+            while True:
+                z = a[m][m]
+                r, s = x - z, y - z
+                p = (r * s - w) / a[m + 1][m] + a[m][m + 1]
+                q = a[m + 1][m + 1] - z - r - s
+                r = a[m + 2][m + 1]
+                s = abs(p) + abs(q) + abs(r)
+                p, q, r = p / s, q / s, r / s
+                if m == l:
+                    break
+                u = abs(a[m][m - 1]) * (abs(q) + abs(r))
+                v = abs(p) * (abs(a[m - 1][m - 1]) + abs(z) + abs(a[m + 1][m + 1]))
+                if u + v == v:
+                    break
+                m -= 1
+
+            for i in range(m + 2, nn + 1):
+                a[i][i - 2] = 0.0
+                if i != m + 2:
+                    a[i][i - 3] = 0.0
+
+            # Double QR step on rows l..nn and columns m..nn
+            for k in range(m, nn):
+                if k != m:
+                    p, q = a[k][k - 1], a[k + 1][k - 1]
+                    r = a[k + 2][k - 1] if k != nn - 1 else 0.0
+                    x = abs(p) + abs(q) + abs(r)
+                    if x:
+                        p, q, r = p / x, q / x, r / x
+                s = math.copysign(math.sqrt(p * p + q * q + r * r), p)
+                if not s:
+                    continue
+                if k == m:
+                    if l != m:
+                        a[k][k - 1] = -a[k][k - 1]
+                else:
+                    a[k][k - 1] = -s * x
+                p += s
+                x, y, z = p / s, q / s, r / s
+                q, r = q / p, r / p
+
+                row_k, row_k1 = a[k], a[k + 1]
+                if k != nn - 1:
+                    row_k2 = a[k + 2]
+                    for j in range(k, nn + 1):
+                        p = row_k[j] + q * row_k1[j] + r * row_k2[j]
+                        row_k2[j] -= p * z
+                        row_k1[j] -= p * y
+                        row_k[j] -= p * x
+                else:
+                    for j in range(k, nn + 1):
+                        p = row_k[j] + q * row_k1[j]
+                        row_k1[j] -= p * y
+                        row_k[j] -= p * x
+
+                for i in range(l, min(nn, k + 3) + 1):
+                    row = a[i]
+                    p = x * row[k] + y * row[k + 1]
+                    if k != nn - 1:
+                        p += z * row[k + 2]
+                        row[k + 2] -= p * r
+                    row[k + 1] -= p * q
+                    row[k] -= p
+
+    return values
+
+
+def _inverse_iteration(H, value, norm, seed):
+    """
+    Eigenvector of the Hessenberg matrix H for an eigenvalue, by two
+    steps of inverse iteration with H - value I factored once (O(n^2))
+    """
+    n = len(H)
+    # Nudge the shift off the exact eigenvalue so the factor is not singular
+    shift = value + norm * EPS * (1 + 1j if isinstance(value, complex) else 1)
+    tiny = norm * EPS or EPS
+
+    M = [row[:] for row in H]
+    for i in range(n):
+        M[i][i] -= shift
+
+    # Gaussian elimination with partial pivoting between neighbouring rows
+    steps = []
+    for k in range(n - 1):
+        swap = abs(M[k + 1][k]) > abs(M[k][k])
+        if swap:
+            M[k], M[k + 1] = M[k + 1], M[k]
+        pivot = M[k][k] or tiny
+        M[k][k] = pivot
+        factor = M[k + 1][k] / pivot
+        if factor:
+            M[k + 1][k:] = [a - factor * b for a, b in zip(M[k + 1][k:], M[k][k:])]
+        steps.append((swap, factor))
+    if not M[n - 1][n - 1]:
+        M[n - 1][n - 1] = tiny
+
+    x = [1.0 + 0.1 * ((i * 7 + seed * 13) % 11) for i in range(n)]
+    for _ in range(2):
+        for k, (swap, factor) in enumerate(steps):
+            if swap:
+                x[k], x[k + 1] = x[k + 1], x[k]
+            x[k + 1] -= factor * x[k]
+        for i in range(n - 1, -1, -1):
+            row = M[i]
+            total = x[i] - sum(map(mul, row[i + 1:], x[i + 1:]))
+            x[i] = total / row[i]
+        scale = max(abs(v) for v in x) or 1.0
+        x = [v / scale for v in x]
+    return x
+
+
+def _normalize(x):
+    # Unit 2-norm, with the largest component made real and positive
+    largest = max(x, key=abs)
+    phase = abs(largest) / largest if largest else 1.0
+    x = [v * phase for v in x]
+    norm = math.sqrt(sum(abs(v) ** 2 for v in x)) or 1.0
+    x = [v / norm for v in x]
+    return [v.real if isinstance(v, complex) and v.imag == 0 else v for v in x]
+
+
+def _general_eigen(A, vectors):
+    """
+    Eigenvalues (real part descending, +i before -i) and, optionally,
+    unit eigenvectors as columns of a list of rows
+    """
+    n = len(A)
+    columns = _columns(A)
+    reflectors = _hessenberg(columns, n)
+    H = _rows(columns)
+    norm = sum(abs(v) for row in H for v in row)
+
+    values = _hessenberg_qr([row[:] for row in H])
+    values = [v.real if isinstance(v, complex) and v.imag == 0 else v for v in values]
+    order = sorted(range(n), key=lambda i: (-_real(values[i]), -_imag(values[i])))
+    values = [values[i] for i in order]
+    if not vectors:
+        return values, None
+
+    found = []
+    for index, value in enumerate(values):
+        if isinstance(value, complex) and value.imag < 0 and index and values[index - 1] == value.conjugate():
+            # Conjugate pair: conjugate vector
+            found.append([v.conjugate() for v in found[-1]])
+            continue
+        x = _inverse_iteration(H, value, norm, index)
+        # Back to A's basis: Q x with Q = H_0 H_1 ...
+        for k in range(len(reflectors) - 1, -1, -1):
+            v, beta = reflectors[k]
+            if beta:
+                tail = x[k + 1:]
+                s = beta * sum(map(mul, v, tail))
+                x[k + 1:] = [t - s * w for t, w in zip(tail, v)]
+        found.append(_normalize(x))
+
+    return values, [list(row) for row in zip(*found)]
+
+
+def _real(value):
+    return value.real if isinstance(value, complex) else value
+
+
+def _imag(value):
+    return value.imag if isinstance(value, complex) else 0.0
+
+
+@dispatch
+def eigen(A, vectors=False):
+    """
+    All eigenvalues of a square matrix, and its eigenvectors on request
+    Symmetric matrices: Householder tridiagonalization and implicit QR
+    (real values, descending, orthonormal vectors). Others: Hessenberg
+    reduction and Francis double-shift QR, vectors by inverse iteration
+    Returns (values, vectors as columns or None, method)
+    """
+    n = len(A)
+    if n == 0 or n != len(A[0]):
+        raise ValueError("Eigenvalues require a square matrix")
+
+    if n == 2 and not vectors:
+        values = list(eigenvalues_2x2(A))
+        return values, None, "closed_form"
+
+    if is_symmetric(A):
+        values, Z = _symmetric_eigen(A, vectors)
+        return values, Z, "symmetric_qr"
+
+    values, Z = _general_eigen(A, vectors)
+    return values, Z, "hessenberg_qr"
+
+
+# ---------- TOP-K EIGENVALUES ----------
+
+def _orthogonalize(w, V):
+    # Classical Gram-Schmidt, twice, keeps V orthogonal to working precision;
+    # returns (w without its components along V, those components)
+    h = [0.0] * len(V)
+    for _ in range(2):
+        for i, q in enumerate(V):
+            c = sum(map(mul, w, q))
+            h[i] += c
+            w = [a - c * b for a, b in zip(w, q)]
+    return w, h
+
+
+def _fresh_direction(V, n):
+    """
+    A unit vector orthogonal to the orthonormal columns V: the unit vector
+    e_i that V covers least (smallest sum of q_i^2), projected out of V
+    """
+    covered = [0.0] * n
+    for q in V:
+        covered = [c + x * x for c, x in zip(covered, q)]
+    i = min(range(n), key=covered.__getitem__)
+    w, _ = _orthogonalize([1.0 if j == i else 0.0 for j in range(n)], V)
+    norm = math.sqrt(sum(map(mul, w, w)))
+    return [x / norm for x in w]
+
+
+def _krylov(rows, V, H, steps):
+    """
+    Extends an Arnoldi factorization A V[:m] = V H to steps columns, with
+    full reorthogonalization (Lanczos when A is symmetric); H holds one
+    list per column, h[0..j+1]
+    When the Krylov space becomes invariant (its Ritz values are then
+    exact, but there may be fewer than k of them, or larger eigenvalues
+    outside it) the factorization restarts from a fresh direction
+    orthogonal to V, leaving a zero below the diagonal of H
+    """
+    n = len(rows)
+    while len(H) < steps:
+        j = len(H)
+        w, h = _orthogonalize([sum(map(mul, row, V[j])) for row in rows], V)
+        beta = math.sqrt(sum(map(mul, w, w)))
+        h.append(beta)
+        H.append(h)
+        if len(V) == n:
+            break
+        if beta <= EPS * n * max(abs(x) for x in h):
+            h[j + 1] = 0.0
+            V.append(_fresh_direction(V, n))
+        else:
+            V.append([x / beta for x in w])
+
+
+def _ritz(H, symmetric, k, vectors):
+    """
+    The k Ritz values of largest magnitude from the m x m Krylov matrix,
+    with either the full Ritz vectors (as columns, length m) or only their
+    last components, which is all the residual estimate needs
+    """
+    m = len(H)
+    if symmetric:
+        # Tridiagonal: rotations only need to track the rows asked for
+        d = [H[j][j] for j in range(m)]
+        e = [H[j + 1][j] for j in range(m - 1)]
+        Z = [[1.0 if i == j else 0.0 for i in range(m)] if vectors else [1.0 if j == m - 1 else 0.0] for j in range(m)]
+        _tridiagonal_qr(d, e, Z)
+        order = sorted(range(m), key=lambda i: -abs(d[i]))[:k]
+        return [d[i] for i in order], [Z[i] for i in order]
+
+    square = [[H[j][i] if i < len(H[j]) else 0.0 for j in range(m)] for i in range(m)]
+    values = _hessenberg_qr([row[:] for row in square])
+    values = [v.real if isinstance(v, complex) and v.imag == 0 else v for v in values]
+    order = sorted(range(m), key=lambda i: (-abs(values[i]), -_imag(values[i])))[:k]
+    values = [values[i] for i in order]
+    norm = sum(abs(v) for row in square for v in row)
+    Y = [_normalize(_inverse_iteration(square, value, norm, index)) for index, value in enumerate(values)]
+    return values, (Y if vectors else [[y[-1]] for y in Y])
+
+
+@dispatch
+def top_eigen(A, k, vectors=False, tolerance=1e-10):
+    """
+    The k eigenvalues of largest magnitude, by Lanczos (symmetric) or
+    Arnoldi iteration; only matrix-vector products touch A, so each
+    Krylov step costs O(n^2) instead of a full O(n^3) solve
+    The Krylov space doubles until every wanted Ritz pair has a residual
+    below tolerance x |value|
+    Returns (values, vectors as columns or None, method)
+    """
+    n = len(A)
+    if n == 0 or n != len(A[0]):
+        raise ValueError("Eigenvalues require a square matrix")
+    k = min(k, n)
+
+    symmetric = is_symmetric(A)
+    rows = [[float(v) for v in row] for row in A]
+    start = [1.0 + 0.1 * ((i * 7) % 11) for i in range(n)]
+    norm = math.sqrt(sum(map(mul, start, start)))
+    V, H = [[x / norm for x in start]], []
+    steps = min(n, max(2 * k + 1, 20))
+
+    while True:
+        _krylov(rows, V, H, steps)
+        m = len(H)
+        values, last = _ritz(H, symmetric, k, False)
+
+        # Residual of a Ritz pair: |h(m+1, m)| |last component of y|
+        beta = H[-1][-1]
+        if m == n or all(
+            abs(beta * y[-1]) <= tolerance * max(abs(value), EPS) for value, y in zip(values, last)
+        ):
+            break
+        steps = min(n, 2 * steps)
+
+    method = "lanczos" if symmetric else "arnoldi"
+    if not vectors:
+        return values, None, method
+
+    values, Y = _ritz(H, symmetric, k, True)
+    Z = []
+    for y in Y:
+        x = [0.0] * n
+        for coefficient, q in zip(y, V):
+            if coefficient:
+                x = [a + coefficient * b for a, b in zip(x, q)]
+        Z.append(_normalize(x))
+    return values, [list(row) for row in zip(*Z)], method
@@ -1,7 +1,21 @@
+import math
+
+from utils.advanced_ops import cholesky_decomposition
+from utils.advanced_ops import cholesky_solve
+from utils.advanced_ops import PIVOT_TOLERANCE
+from utils.advanced_ops import lu_factor
+from utils.advanced_ops import rank_tolerance
+from utils.advanced_ops import singular_values
+from utils.backend import dispatch
+from utils.utilities_ops import profile_matrix
+
+
+@dispatch
 def determinant_2x2(A):
     return A[0][0]*A[1][1] - A[0][1]*A[1][0]
 
 
+@dispatch
 def determinant_3x3(A):
     return (
         A[0][0]*(A[1][1]*A[2][2] - A[1][2]*A[2][1])
@@ -10,6 +24,7 @@ def determinant_3x3(A):
     )
 
 
+@dispatch
 def determinant(A):
     n = len(A)
 
@@ -17,13 +32,149 @@ def determinant(A):
     if n != len(A[0]):
         raise ValueError("Matrix must be square")
 
-    if n == 2:
+    if n == 1:
+        return A[0][0]
+    elif n == 2:
         return determinant_2x2(A)
     elif n == 3:
         return determinant_3x3(A)
-    else:
-        raise ValueError("Only 2x2 and 3x3 matrices are supported")
-    
+
+    # Triangular / diagonal: product of the diagonal, O(n) once profiled
+    profile = profile_matrix(A)
+    if profile.upper or profile.lower:
+        value = 1.0
+        for i in range(n):
+            value *= A[i][i]
+        return value
+
+    return lu_factor(A).determinant()
+
+
+@dispatch
+def log_determinant(A):
+    """
+    Returns (sign, log|det(A)|) so large matrices do not overflow
+    A singular matrix gives (0.0, -inf)
+    """
+    n = len(A)
+
+    if n != len(A[0]):
+        raise ValueError("Matrix must be square")
+
+    profile = profile_matrix(A)
+    if not (profile.upper or profile.lower):
+        return lu_factor(A).log_determinant()
+
+    sign = 1.0
+    log_abs = 0.0
+    for i in range(n):
+        value = A[i][i]
+        if value == 0:
+            return 0.0, -math.inf
+        if value < 0:
+            sign = -sign
+        log_abs += math.log(abs(value))
+
+    return sign, log_abs
+
+
+def _diagonal(A):
+    """
+    The diagonal of a diagonal matrix
+    Raises ValueError when an entry is zero to working precision
+    """
+    d = [float(A[i][i]) for i in range(len(A))]
+    threshold = PIVOT_TOLERANCE * max(map(abs, d))
+    if any(abs(v) <= threshold for v in d):
+        raise ValueError(f"Matrix is singular to working precision (pivot below {PIVOT_TOLERANCE:g} x max|a_ij|)")
+    return d
+
+
+@dispatch
+def inverse(A):
+    """
+    Inverts an n x n matrix through LU with partial pivoting
+    Raises ValueError when a pivot falls below the singularity tolerance
+    """
+    if len(A) != len(A[0]):
+        raise ValueError("Matrix must be square to compute an inverse")
+
+    if len(A) == 1:
+        if A[0][0] == 0:
+            raise ValueError("Matrix is singular, inverse does not exist")
+        return [[1 / A[0][0]]]
+
+    # Diagonal: reciprocals, O(n^2) to write out; triangular matrices skip
+    # the elimination inside lu_factor
+    if profile_matrix(A).diagonal:
+        d = _diagonal(A)
+        return [[1 / v if i == j else 0.0 for j in range(len(d))] for i, v in enumerate(d)]
+
+    return lu_factor(A).inverse()
+
+
+@dispatch
+def inverse_and_condition(A):
+    """
+    The inverse together with its 1-norm condition number, from a single
+    factorization: cond_1(A) = ||A||_1 * ||A^-1||_1 is exact once A^-1 is
+    known, O(n^2) on top of the inverse
+    Returns (inverse, cond)
+    """
+    X = inverse(A)
+    norm_1 = lambda M: max(sum(abs(row[j]) for row in M) for j in range(len(M)))
+    return X, norm_1(A) * norm_1(X)
+
+
+@dispatch
+def solve_linear_system(A, B):
+    """
+    Solves AX = B for an n-vector or n x k matrix of right-hand sides
+    Diagonal A divides, triangular A substitutes directly; otherwise A
+    is factored once (Cholesky when symmetric positive definite, LU with
+    partial pivoting otherwise), then substituted per column
+    Returns (X, method)
+    """
+    n = len(A)
+    if n != len(A[0]):
+        raise ValueError("Coefficient matrix must be square")
+    if len(B) != n:
+        raise ValueError("Right-hand side must have as many rows as the matrix")
+
+    profile = profile_matrix(A)
+    if profile.diagonal:
+        d = _diagonal(A)
+        if not hasattr(B[0], "__len__"):
+            return [b / v for b, v in zip(B, d)], "diagonal"
+        return [[b / v for b in row] for row, v in zip(B, d)], "diagonal"
+
+    if profile.upper or profile.lower:
+        # lu_factor takes a triangular A as it is: substitution only
+        return lu_factor(A).solve(B), "triangular"
+
+    if profile.symmetric:
+        try:
+            L = cholesky_decomposition(A)
+        except ValueError:
+            pass
+        else:
+            return cholesky_solve(L, B), "cholesky"
+
+    return lu_factor(A).solve(B), "lu"
+
+
+@dispatch
+def condition_number(A):
+    """
+    Estimated 1-norm condition number (inf for a singular matrix)
+    """
+    if len(A) != len(A[0]):
+        raise ValueError("Matrix must be square")
+
+    return lu_factor(A).condition_estimate()
+
+
+@dispatch
 def inverse_2x2(A):
     if len(A) != 2 or len(A[0]) != 2:
         raise ValueError("Inverse is implemented only for 2x2 matrices")
@@ -43,35 +194,19 @@ def inverse_2x2(A):
         [ -c * inv_det, a * inv_det ]
     ]
 
-def rank(matrix):
-    A = [row[:] for row in matrix]  # deep copy
-    rows = len(A)
-    cols = len(A[0])
-
-    rank = 0
-    row = 0
-
-    for col in range(cols):
-        pivot = row
-        while pivot < rows and A[pivot][col] == 0:
-            pivot += 1
-
-        if pivot < rows:
-            A[row], A[pivot] = A[pivot], A[row]
-
-            pivot_val = A[row][col]
-            for j in range(col, cols):
-                A[row][j] /= pivot_val
-
-            for i in range(rows):
-                if i != row and A[i][col] != 0:
-                    factor = A[i][col]
-                    for j in range(col, cols):
-                        A[i][j] -= factor * A[row][j]
+@dispatch
+def rank(matrix, tolerance=None):
+    """
+    Number of singular values above the tolerance (by default
+    max(m, n) * eps * largest singular value), so rounding noise in a
+    rank-deficient matrix does not count as an extra pivot
+    """
+    S = singular_values(matrix)
+    cutoff = rank_tolerance(S, (len(matrix), len(matrix[0])), tolerance)
+    return sum(1 for s in S if s > cutoff)
 
-            row += 1
-            rank += 1
 
+@dispatch
 def trace(A):
     n = len(A)
 
@@ -84,6 +219,7 @@ def trace(A):
 
     return trace_sum
 
+@dispatch
 def adjoint_2x2(A):
     if len(A) != 2 or len(A[0]) != 2:
         raise ValueError("Adjoint is implemented only for 2x2 matrices")
@@ -0,0 +1,100 @@
+# ============================================
+# COMPUTE BACKENDS
+# ============================================
+#
+# Every public function in utils/*_ops.py is wrapped with @dispatch. A call
+# looks up the active backend and, if that backend provides a function of
+# the same name, runs it instead of the pure-Python body. The pure-Python
+# code is the reference backend and the fallback for anything a backend
+# does not implement.
+
+import contextvars
+import functools
+import importlib
+import os
+from contextlib import contextmanager
+
+
+BACKENDS = {
+    "python": None,
+    "numpy": "utils.numpy_backend",
+}
+
+_default = os.environ.get("MATRIXLAB_BACKEND", "auto")
+_active = contextvars.ContextVar("matrixlab_backend", default=None)
+_modules = {}
+
+
+def _load(name):
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(BACKENDS[name])
+        except ImportError:
+            _modules[name] = None
+    return _modules[name]
+
+
+def available_backends():
+    """
+    Returns the names of the backends that can run in this process
+    """
+    return [name for name, path in BACKENDS.items() if path is None or _load(name) is not None]
+
+
+def resolve_backend(name=None):
+    """
+    Turns a requested backend name (or "auto" / None) into a usable one
+    "auto" prefers NumPy when it is installed
+    """
+    if name is None:
+        name = _active.get() or _default
+
+    if name == "auto":
+        return "numpy" if _load("numpy") is not None else "python"
+
+    # Names come straight from request payloads, so they may be any JSON value
+    if not isinstance(name, str) or name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Available: {', '.join(available_backends())}")
+
+    if BACKENDS[name] is not None and _load(name) is None:
+        raise ValueError(f"Backend '{name}' is not installed")
+
+    return name
+
+
+def set_default_backend(name):
+    global _default
+    resolve_backend(name)
+    _default = name
+
+
+def get_default_backend():
+    return _default
+
+
+@contextmanager
+def use_backend(name):
+    """
+    Runs the enclosed calls on the given backend (thread and request local)
+    """
+    token = _active.set(resolve_backend(name))
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def dispatch(func):
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        backend = resolve_backend()
+        if backend != "python":
+            impl = getattr(_load(backend), name, None)
+            if impl is not None:
+                return impl(*args, **kwargs)
+        return func(*args, **kwargs)
+
+    wrapper.reference = func
+    return wrapper
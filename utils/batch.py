@@ -0,0 +1,149 @@
+# ============================================
+# BATCH EXECUTION
+# ============================================
+#
+# Runs a list of /calculate-style operations in one request. Operands are
+# literal matrices, names of shared inputs ("B"), references to earlier
+# results ("$r1", "$r1.L" for one part of a dict result) or ids of stored
+# matrices, which pass through to /calculate. Items are grouped
+# into dependency levels; every item in a level only needs results from
+# earlier levels, so each level runs concurrently.
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Item keys that hold operands and are renamed to the /calculate payload
+OPERAND_KEYS = {"A": "matrixA", "B": "matrixB", "matrixA": "matrixA", "matrixB": "matrixB"}
+
+
+class BatchError(ValueError):
+    pass
+
+
+def _references(item):
+    refs = []
+    for key in OPERAND_KEYS:
+        value = item.get(key)
+        if isinstance(value, str) and value.startswith("$"):
+            refs.append(value[1:].split(".", 1)[0])
+    return refs
+
+
+def plan_batch(items):
+    """
+    Assigns every item an id and a dependency level
+    Returns (ids, levels, errors): levels is a list of lists of indices,
+    errors maps the index of every item that cannot run to a message
+    """
+    ids = []
+    level_of = {}
+    errors = {}
+    levels = []
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            ids.append(f"r{index + 1}")
+            errors[index] = "Each operation must be a JSON object"
+            continue
+
+        item_id = str(item.get("id") or item.get("name") or f"r{index + 1}")
+        if item_id in ids:
+            errors[index] = f"Duplicate id '{item_id}'"
+            ids.append(item_id)
+            continue
+        ids.append(item_id)
+
+        level = 0
+        for ref in _references(item):
+            if ref in ids and ref not in level_of:
+                errors[index] = f"Dependency '{ref}' failed"
+                break
+            if ref not in level_of:
+                errors[index] = f"Reference '${ref}' does not name an earlier operation"
+                break
+            level = max(level, level_of[ref] + 1)
+
+        if index in errors:
+            continue
+
+        level_of[item_id] = level
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(index)
+
+    return ids, levels, errors
+
+
+def _resolve(value, inputs, results):
+    if not isinstance(value, str):
+        return value
+
+    if value.startswith("$"):
+        ref, _, part = value[1:].partition(".")
+        outcome = results[ref]
+        if outcome.get("status") != "success":
+            raise BatchError(f"Dependency '{ref}' failed")
+        result = outcome.get("result")
+        if part:
+            if not isinstance(result, dict) or part not in result:
+                raise BatchError(f"Result '{ref}' has no part '{part}'")
+            result = result[part]
+        return result
+
+    # Anything else is left for the matrix store to resolve
+    return inputs.get(value, value)
+
+
+def _payload(item, inputs, results, defaults):
+    payload = dict(defaults)
+    for key, value in item.items():
+        if key in ("id", "name"):
+            continue
+        if key == "op":
+            payload["operation"] = value
+        elif key in OPERAND_KEYS:
+            payload[OPERAND_KEYS[key]] = _resolve(value, inputs, results)
+        else:
+            payload[key] = value
+    return payload
+
+
+def run_batch(items, execute, inputs=None, defaults=None, max_workers=4):
+    """
+    Executes items with execute(payload) -> response dict
+    One failing item never aborts the others; dependents of a failed item
+    fail with a dependency error
+    Returns the per-item responses in request order
+    """
+    inputs = inputs or {}
+    defaults = defaults or {}
+    ids, levels, errors = plan_batch(items)
+
+    outcomes = [None] * len(items)
+    results = {}
+
+    for index, message in errors.items():
+        outcomes[index] = {"id": ids[index], "status": "error", "message": message}
+
+    def run(index):
+        try:
+            payload = _payload(items[index], inputs, results, defaults)
+        except BatchError as e:
+            return {"status": "error", "message": str(e)}
+        try:
+            return execute(payload)
+        except Exception as e:
+            return {"status": "error", "message": f"Unexpected error: {str(e)}"}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for level in levels:
+            if len(level) == 1 or max_workers <= 1:
+                responses = [run(index) for index in level]
+            else:
+                responses = list(pool.map(run, level))
+
+            for index, response in zip(level, responses):
+                results[ids[index]] = response
+                outcomes[index] = {"id": ids[index], **response}
+
+    return outcomes
@@ -0,0 +1,140 @@
+# ============================================
+# FACTORIZATION CACHE
+# ============================================
+#
+# Process-wide LRU of LU / Cholesky factors keyed by a content hash of the
+# input matrix, so lu -> determinant -> inverse on the same matrix factors
+# it once. Hashing is O(n^2) against O(n^3) for the factorization.
+
+import contextvars
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from utils.matrix import Matrix
+
+
+def matrix_key(A, *extra):
+    """
+    blake2b digest of the matrix contents, shape and dtype
+    Integer and float inputs hash differently so cached results keep the
+    type the caller would have got without the cache
+    """
+    rows = len(A)
+    cols = len(A[0]) if rows else 0
+    digest = hashlib.blake2b(digest_size=16)
+
+    if isinstance(A, Matrix):
+        dtype = "f8"
+        if A.is_contiguous():
+            start = A._offset
+            digest.update(A._view[start:start + rows * cols].cast("B"))
+        else:
+            for row in A:
+                digest.update(array("d", row))
+    else:
+        try:
+            buffers = [array("q", row) for row in A]
+            dtype = "i8"
+        except (TypeError, OverflowError):
+            buffers = [array("d", row) for row in A]
+            dtype = "f8"
+        for buffer in buffers:
+            if len(buffer) != cols:
+                raise ValueError("All rows must have the same number of columns")
+            digest.update(buffer)
+
+    digest.update(f"|{rows}x{cols}|{dtype}|{extra!r}".encode())
+    return digest.hexdigest()
+
+
+class FactorizationCache:
+    """
+    Memory-bounded LRU cache with hit / miss / eviction counters
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, enabled=True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._bypass = contextvars.ContextVar("factorization_cache_bypass", default=False)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, kind, A, compute, *extra):
+        """
+        Returns the cached factor for (kind, A, extra) or computes and stores it
+        """
+        if not self.enabled or self._bypass.get():
+            return compute()
+
+        key = (kind, matrix_key(A, *extra))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+
+        # Rough footprint of n x n nested lists of floats: pointer + float object
+        size = 32 * len(A) * len(A[0])
+        if size <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = (value, size)
+                    self._bytes += size
+                    self._evict()
+
+        return value
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @contextmanager
+    def disabled(self):
+        """
+        Skips the cache for the enclosed calls (thread and request local)
+        """
+        token = self._bypass.set(True)
+        try:
+            yield
+        finally:
+            self._bypass.reset(token)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+factorization_cache = FactorizationCache(
+    max_bytes=int(os.environ.get("MATRIXLAB_FACTOR_CACHE_BYTES", 64 * 1024 * 1024)),
+    enabled=os.environ.get("MATRIXLAB_FACTOR_CACHE", "1") != "0",
+)
@@ -0,0 +1,442 @@
+# ============================================
+# MATRIX EXPRESSIONS
+# ============================================
+#
+# Evaluates expressions such as "2*(A+B) - C'" over named matrices.
+#
+#   1. parse   - recursive descent into a DAG; identical sub-expressions
+#                are hash-consed into one node (common subexpression
+#                elimination) and scalar arithmetic is folded
+#   2. plan    - the output and every operand of a matrix product become
+#                "roots"; every other elementwise node (add, subtract,
+#                negate, scale, transpose) is fused into the region of the
+#                root that uses it
+#   3. execute - each region becomes one row function built from closures
+#                that writes a single output row per input row, so a chain
+#                of elementwise ops allocates one result instead of one per
+#                operator
+
+import re
+from itertools import repeat
+from operator import add, mul, neg, sub
+
+from utils.basic_ops import multiply_matrices
+
+
+ELEMENTWISE = {"add", "sub", "neg", "scale", "transpose"}
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*)|(\.T\b|[-+*/@()']))")
+
+
+class Node:
+    __slots__ = ("op", "args", "value", "shape")
+
+    def __init__(self, op, args=(), value=None, shape=None):
+        self.op = op
+        self.args = args
+        self.value = value
+        self.shape = shape
+
+    @property
+    def is_scalar(self):
+        return self.shape is None
+
+
+# --------------------------------------------
+# PARSER / DAG BUILDER
+# --------------------------------------------
+
+class _Builder:
+
+    def __init__(self, text, shapes):
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+        self.shapes = shapes
+        self.memo = {}
+        self.shared = 0
+
+    @staticmethod
+    def _tokenize(text):
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Unexpected character '{text[pos:].strip()[:1]}' in expression")
+            number, name, symbol = match.groups()
+            if number is not None:
+                tokens.append(("num", float(number)))
+            elif name is not None:
+                tokens.append(("name", name))
+            else:
+                tokens.append(("sym", symbol))
+            pos = match.end()
+        return tokens
+
+    # ---------- NODE CONSTRUCTION (hash-consed) ----------
+
+    def node(self, op, args=(), value=None, shape=None):
+        key = (op, tuple(id(a) for a in args), value)
+        existing = self.memo.get(key)
+        if existing is not None:
+            if op not in ("input", "const"):
+                self.shared += 1
+            return existing
+        created = Node(op, args, value, shape)
+        self.memo[key] = created
+        return created
+
+    def const(self, value):
+        return self.node("const", value=value)
+
+    def binary(self, symbol, left, right):
+        if left.is_scalar and right.is_scalar:
+            a, b = left.value, right.value
+            if symbol == "+":
+                return self.const(a + b)
+            if symbol == "-":
+                return self.const(a - b)
+            if symbol in ("*", "@"):
+                return self.const(a * b)
+            if b == 0:
+                raise ValueError("Division by zero in expression")
+            return self.const(a / b)
+
+        if symbol in ("+", "-"):
+            if left.is_scalar or right.is_scalar:
+                raise ValueError(f"Cannot apply '{symbol}' between a scalar and a matrix")
+            if left.shape != right.shape:
+                raise ValueError(
+                    f"Shape mismatch for '{symbol}': {left.shape[0]}x{left.shape[1]} "
+                    f"and {right.shape[0]}x{right.shape[1]}"
+                )
+            op = "add" if symbol == "+" else "sub"
+            return self.node(op, (left, right), shape=left.shape)
+
+        if symbol == "/":
+            if not right.is_scalar:
+                raise ValueError("Can only divide a matrix by a scalar")
+            if right.value == 0:
+                raise ValueError("Division by zero in expression")
+            return self.scale(1.0 / right.value, left)
+
+        if left.is_scalar:
+            return self.scale(left.value, right)
+        if right.is_scalar:
+            return self.scale(right.value, left)
+
+        if left.shape[1] != right.shape[0]:
+            raise ValueError(
+                f"Cannot multiply {left.shape[0]}x{left.shape[1]} "
+                f"by {right.shape[0]}x{right.shape[1]}"
+            )
+        return self.node("matmul", (left, right), shape=(left.shape[0], right.shape[1]))
+
+    def scale(self, factor, operand):
+        if factor == 1:
+            return operand
+        if operand.op == "scale":
+            return self.scale(factor * operand.value, operand.args[0])
+        return self.node("scale", (operand,), value=factor, shape=operand.shape)
+
+    def negate(self, operand):
+        if operand.is_scalar:
+            return self.const(-operand.value)
+        if operand.op == "neg":
+            return operand.args[0]
+        return self.node("neg", (operand,), shape=operand.shape)
+
+    def transpose(self, operand):
+        if operand.is_scalar:
+            return operand
+        if operand.op == "transpose":
+            return operand.args[0]
+        return self.node("transpose", (operand,), shape=(operand.shape[1], operand.shape[0]))
+
+    # ---------- GRAMMAR ----------
+    #
+    #   expr    := term (('+' | '-') term)*
+    #   term    := unary (('*' | '@' | '/') unary)*
+    #   unary   := '-' unary | '+' unary | postfix
+    #   postfix := primary ("'" | '.T')*
+    #   primary := NUMBER | NAME | 'transpose' '(' expr ')' | '(' expr ')'
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, symbol):
+        kind, value = self.take()
+        if kind != "sym" or value != symbol:
+            raise ValueError(f"Expected '{symbol}' in expression")
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Expression is empty")
+        root = self.expr()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.peek()[1]}' in expression")
+        if root.is_scalar:
+            raise ValueError("Expression must involve at least one matrix")
+        return root
+
+    def expr(self):
+        node = self.term()
+        while self.peek() in (("sym", "+"), ("sym", "-")):
+            symbol = self.take()[1]
+            node = self.binary(symbol, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in (("sym", "*"), ("sym", "@"), ("sym", "/")):
+            symbol = self.take()[1]
+            right = self.unary()
+            if symbol == "@" and (node.is_scalar or right.is_scalar):
+                raise ValueError("'@' needs a matrix on both sides")
+            node = self.binary(symbol, node, right)
+        return node
+
+    def unary(self):
+        if self.peek() == ("sym", "-"):
+            self.take()
+            return self.negate(self.unary())
+        if self.peek() == ("sym", "+"):
+            self.take()
+            return self.unary()
+        return self.postfix()
+
+    def postfix(self):
+        node = self.primary()
+        while self.peek() in (("sym", "'"), ("sym", ".T")):
+            self.take()
+            node = self.transpose(node)
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+
+        if kind == "num":
+            return self.const(value)
+
+        if kind == "name":
+            if value == "transpose" and self.peek() == ("sym", "("):
+                self.take()
+                node = self.expr()
+                self.expect(")")
+                return self.transpose(node)
+            if value not in self.shapes:
+                raise ValueError(f"Unknown matrix '{value}' in expression")
+            return self.node("input", value=value, shape=self.shapes[value])
+
+        if (kind, value) == ("sym", "("):
+            node = self.expr()
+            self.expect(")")
+            return node
+
+        raise ValueError("Incomplete expression" if kind is None else f"Unexpected '{value}' in expression")
+
+
+# --------------------------------------------
+# PLANNING
+# --------------------------------------------
+
+def _walk(root):
+    order = []
+    seen = set()
+
+    def visit(node):
+        if id(node) in seen:
+            return
+        seen.add(id(node))
+        for arg in node.args:
+            visit(arg)
+        order.append(node)
+
+    visit(root)
+    return order
+
+
+def _plan_roots(root):
+    """
+    Picks the nodes that get materialized: the output, matmul operands and
+    elementwise nodes reached from more than one fused region
+    """
+    order = _walk(root)
+    roots = {id(root)}
+    for node in order:
+        if node.op == "matmul":
+            for arg in node.args:
+                if arg.op in ELEMENTWISE:
+                    roots.add(id(arg))
+
+    while True:
+        owners = {}
+        for node in reversed(order):
+            if node.op not in ELEMENTWISE and node.op != "matmul":
+                continue
+            if id(node) in roots or node.op == "matmul":
+                mine = {id(node)}
+            else:
+                mine = owners.get(id(node), set())
+            for arg in node.args:
+                if arg.op in ELEMENTWISE and id(arg) not in roots:
+                    owners.setdefault(id(arg), set()).update(mine)
+
+        shared = {key for key, regions in owners.items() if len(regions) > 1}
+        if not shared:
+            return order, roots
+        roots |= shared
+
+
+# --------------------------------------------
+# FUSED KERNELS
+# --------------------------------------------
+#
+# A region becomes one row function, row(i) -> output row i, composed of
+# closures over C-level maps: each operator lazily maps its operands'
+# rows, leaves read row i of a materialized value (of its transpose when
+# transposed), and nothing is built until the output row is listed.
+
+def _leaf_rows(matrix, transposed):
+    if transposed:
+        # Columns as tuples, one pass of zip instead of a gather per row
+        matrix = list(zip(*matrix))
+    return matrix.__getitem__
+
+
+def _unary_rows(func, rows):
+    return lambda i: map(func, rows(i))
+
+
+def _scaled_rows(factor, rows):
+    return lambda i: map(mul, repeat(factor), rows(i))
+
+
+def _binary_rows(func, left, right):
+    return lambda i: map(func, left(i), right(i))
+
+
+def _shared_rows(rows):
+    # Reused inside the region: row i is listed once for all its users
+    last = [None, None]
+
+    def shared(i):
+        if last[0] != i:
+            last[0], last[1] = i, list(rows(i))
+        return last[1]
+
+    return shared
+
+
+class _Region:
+    """
+    Builds the row function of one fused region
+    Leaves are materialized values, read row by row (column by column
+    when transposed)
+    """
+
+    def __init__(self, roots, materialize):
+        self.roots = roots
+        self.materialize = materialize
+        self.uses = {}
+        self.rows = {}
+
+    def count(self, node, transposed, top=False):
+        key = (id(node), transposed)
+        self.uses[key] = self.uses.get(key, 0) + 1
+        if self.uses[key] > 1:
+            return
+        if node.op in ELEMENTWISE and (top or id(node) not in self.roots):
+            for arg in node.args:
+                self.count(arg, transposed != (node.op == "transpose"))
+
+    def build(self, node, transposed, top=False):
+        key = (id(node), transposed)
+        if key in self.rows:
+            return self.rows[key]
+
+        if node.op not in ELEMENTWISE or (not top and id(node) in self.roots):
+            rows = _leaf_rows(self.materialize(node), transposed)
+        elif node.op == "transpose":
+            rows = self.build(node.args[0], not transposed)
+        elif node.op == "neg":
+            rows = _unary_rows(neg, self.build(node.args[0], transposed))
+        elif node.op == "scale":
+            rows = _scaled_rows(node.value, self.build(node.args[0], transposed))
+        else:
+            left = self.build(node.args[0], transposed)
+            right = self.build(node.args[1], transposed)
+            rows = _binary_rows(add if node.op == "add" else sub, left, right)
+
+        if self.uses.get(key, 0) > 1 and node.op in ("add", "sub", "neg", "scale"):
+            rows = _shared_rows(rows)
+        self.rows[key] = rows
+        return rows
+
+
+# --------------------------------------------
+# PUBLIC API
+# --------------------------------------------
+
+def evaluate_expression(expression, matrices):
+    """
+    Evaluates a matrix expression over the named matrices
+    Returns (result, plan) where plan summarises the DAG and fusion
+    """
+    if not isinstance(expression, str):
+        raise ValueError("Expression must be a string")
+
+    shapes = {}
+    for name, matrix in matrices.items():
+        if not matrix or not len(matrix[0]):
+            raise ValueError(f"Matrix '{name}' is empty")
+        shapes[name] = (len(matrix), len(matrix[0]))
+
+    builder = _Builder(expression, shapes)
+    root = builder.parse()
+    order, roots = _plan_roots(root)
+
+    values = {}
+    kernels = 0
+
+    def materialize(node):
+        key = id(node)
+        if key in values:
+            return values[key]
+
+        if node.op == "input":
+            value = matrices[node.value]
+        elif node.op == "matmul":
+            value = multiply_matrices(materialize(node.args[0]), materialize(node.args[1]))
+        else:
+            value = run_region(node)
+
+        values[key] = value
+        return value
+
+    def run_region(node):
+        nonlocal kernels
+        region = _Region(roots, materialize)
+        region.count(node, False, top=True)
+        rows = region.build(node, False, top=True)
+        kernels += 1
+        return [list(rows(i)) for i in range(node.shape[0])]
+
+    result = materialize(root)
+    if root.op == "input":
+        result = [list(row) for row in result]
+
+    plan = {
+        "nodes": len(order),
+        "shared_subexpressions": builder.shared,
+        "fused_kernels": kernels,
+        "matrix_products": sum(1 for node in order if node.op == "matmul"),
+        "materialized": sum(1 for node in order if node.op != "input" and id(node) in values),
+    }
+    return result, plan
@@ -0,0 +1,277 @@
+# ============================================
+# CSV INGESTION
+# ============================================
+#
+# Column statistics of CSV datasets too large to send as JSON. The body
+# is read as a generator pipeline: raw reads -> gunzip (when the data is
+# gzip) -> blocks of about CSV_CHUNK_BYTES cut at line ends -> one
+# Moments per block. Blocks are parsed and reduced either in-process or on
+# a pool of worker processes, and their Moments are merged in order with
+# the exact pairwise update, so memory is bounded by the block size and
+# the number of blocks in flight, never by the file size.
+
+import csv
+import math
+import threading
+import zlib
+
+from utils.stats_ops import Moments
+
+
+CSV_CHUNK_BYTES = 4 * 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class CSVError(ValueError):
+    pass
+
+
+# --------------------------------------------
+# PIPELINE STAGES
+# --------------------------------------------
+
+def read_chunks(stream, size):
+    """
+    Raw reads of up to size bytes until the stream ends
+    """
+    while True:
+        data = stream.read(size)
+        if not data:
+            return
+        yield data
+
+
+def gunzip(chunks, size):
+    """
+    Decompresses gzip data (several concatenated members allowed) without
+    ever inflating more than size bytes at once
+    """
+    decompressor = zlib.decompressobj(31)
+    inside = False
+    for data in chunks:
+        while data:
+            inside = True
+            try:
+                out = decompressor.decompress(data, size)
+            except zlib.error as e:
+                raise CSVError(f"Invalid gzip data: {e}")
+            if out:
+                yield out
+            if decompressor.eof:
+                # unused_data is the next member (unconsumed_tail repeats it)
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(31)
+                inside = False
+            else:
+                data = decompressor.unconsumed_tail
+
+    if inside:
+        raise CSVError("Truncated gzip data")
+
+
+def maybe_gunzip(chunks, size, compressed=None):
+    """
+    Passes chunks through gunzip when compressed is true, or when it is
+    None and the data starts with the gzip magic number
+    """
+    first = next(chunks, b"")
+    if compressed is None:
+        compressed = first.startswith(_GZIP_MAGIC)
+
+    def rest():
+        if first:
+            yield first
+        yield from chunks
+
+    return gunzip(rest(), size) if compressed else rest()
+
+
+def line_blocks(chunks, size):
+    """
+    Re-cuts byte chunks into blocks of at least size bytes that end at a
+    line end; yields (number of the block's first line, block)
+    """
+    pending = b""
+    line = 1
+    for data in chunks:
+        pending += data
+        if len(pending) < size:
+            continue
+        cut = pending.rfind(b"\n") + 1
+        if cut == 0:
+            if len(pending) > 16 * size:
+                raise CSVError(f"Line {line} is longer than {16 * size} bytes")
+            continue
+        block, pending = pending[:cut], pending[cut:]
+        yield line, block
+        line += block.count(b"\n")
+
+    if pending:
+        yield line, pending
+
+
+# --------------------------------------------
+# PARSING
+# --------------------------------------------
+
+def _fields(text, delimiter):
+    return next(csv.reader([text], delimiter=delimiter), [])
+
+
+def _numbers(fields, line):
+    try:
+        values = list(map(float, fields))
+    except ValueError:
+        for v in fields:
+            try:
+                float(v)
+            except ValueError:
+                raise CSVError(f"Line {line}: '{v}' is not a number")
+        raise
+
+    # float() also takes nan / inf / Infinity; one sum checks the whole row
+    # (it can overflow on finite values, hence the per-value look)
+    if not math.isfinite(sum(values)):
+        for v, x in zip(fields, values):
+            if not math.isfinite(x):
+                raise CSVError(f"Line {line}: '{v}' is not a finite number")
+    return values
+
+
+def block_moments(block, line, columns, delimiter=","):
+    """
+    Parses one block of CSV lines and returns its Moments; runs in worker
+    processes, so everything it needs comes in as arguments
+    """
+    text = block.decode("utf-8-sig")
+    lines = text.splitlines()
+    # Plain numeric CSV has no quoting, and str.split is much faster
+    reader = csv.reader(lines, delimiter=delimiter) if '"' in text else (line.split(delimiter) for line in lines)
+
+    rows = []
+    for offset, fields in enumerate(reader):
+        if len(fields) <= 1 and not "".join(fields).strip():
+            continue
+        if len(fields) != columns:
+            raise CSVError(f"Line {line + offset}: expected {columns} values, got {len(fields)}")
+        rows.append(_numbers(fields, line + offset))
+    return Moments.of_block(rows) if rows else Moments(columns)
+
+
+def _header(block, delimiter, header):
+    """
+    Splits the first block into column names and the remaining data
+    Returns (names, column count, data block, lines consumed)
+    """
+    text, _, rest = block.partition(b"\n")
+    first = text.decode("utf-8-sig").strip()
+    if not first:
+        raise CSVError("The CSV file is empty or starts with a blank line")
+
+    fields = _fields(first, delimiter)
+    if header is None:
+        # A first line that is not all numbers names the columns
+        try:
+            [float(v) for v in fields]
+            header = False
+        except ValueError:
+            header = True
+
+    if header:
+        return [name.strip() for name in fields], len(fields), rest, 1
+    return [f"column {i + 1}" for i in range(len(fields))], len(fields), block, 0
+
+
+# --------------------------------------------
+# WORKER POOL
+# --------------------------------------------
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _executor(workers):
+    global _pool, _pool_workers
+
+    with _pool_lock:
+        # A worker that died (killed, out of memory) breaks the whole pool
+        if _pool is not None and (_pool._broken or _pool_workers < workers):
+            _pool.shutdown(wait=False)
+            _pool = None
+
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: forking a multi-threaded server process is unsafe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+# --------------------------------------------
+# ENTRY POINT
+# --------------------------------------------
+
+def csv_statistics(stream, delimiter=",", header=None, compressed=None, ddof=0,
+                   workers=0, chunk_bytes=CSV_CHUNK_BYTES):
+    """
+    Count, means, variances, covariance and correlation matrices of the
+    columns of a CSV stream (optionally gzip), read once in blocks
+    header:      True / False, or None to detect it from the first line
+    compressed:  True / False, or None to detect gzip from its magic number
+    workers:     worker processes for parsing blocks, 0 to parse in-process
+    Raises CSVError for malformed input
+    """
+    blocks = line_blocks(maybe_gunzip(read_chunks(stream, chunk_bytes), chunk_bytes, compressed), chunk_bytes)
+
+    first = next(blocks, None)
+    if first is None:
+        raise CSVError("The CSV file is empty")
+    line, block = first
+    names, columns, block, skipped = _header(block, delimiter, header)
+
+    def data_blocks():
+        yield line + skipped, block
+        yield from blocks
+
+    total = Moments(columns)
+    count = 0
+    if workers:
+        # At most two blocks per worker in flight keeps memory bounded
+        pool = _executor(workers)
+        pending = []
+        for start, data in data_blocks():
+            pending.append(pool.submit(block_moments, data, start, columns, delimiter))
+            count += 1
+            if len(pending) >= 2 * workers:
+                total.merge(pending.pop(0).result())
+        for future in pending:
+            total.merge(future.result())
+    else:
+        for start, data in data_blocks():
+            total.merge(block_moments(data, start, columns, delimiter))
+            count += 1
+
+    if total.n == 0:
+        raise CSVError("The CSV file has no data rows")
+
+    covariance = total.covariance(ddof)
+    result = {
+        "rows": total.n,
+        "columns": names,
+        "mean": total.mean,
+        "variance": [covariance[i][i] for i in range(columns)],
+        "covariance": covariance,
+        "ddof": ddof,
+        "chunks": count,
+        "workers": workers,
+    }
+    try:
+        result["correlation"] = total.correlation()
+    except ValueError as e:
+        result["correlation"] = None
+        result["warning"] = f"Correlation is undefined: {e}"
+    return result
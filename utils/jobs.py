@@ -0,0 +1,205 @@
+# ============================================
+# ASYNCHRONOUS JOBS
+# ============================================
+#
+# Heavy /calculate payloads run on a bounded ProcessPoolExecutor so they
+# never hold a request thread. A job is submitted, polled by id and either
+# collected or cancelled. Workers are spawned lazily on the first job and
+# import only the operation modules their jobs need.
+
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError
+
+from utils.registry import execute
+
+
+class JobError(ValueError):
+    pass
+
+
+def _work(data, backend):
+    # Runs inside a worker process
+    started = time.perf_counter()
+    response = execute(data, backend)
+    return response, time.perf_counter() - started
+
+
+class Job:
+    """
+    One submitted payload and its future
+    """
+
+    __slots__ = (
+        "id", "operation", "cost", "future", "submitted", "finished",
+        "seconds", "cancelled"
+    )
+
+    def __init__(self, operation, cost, future):
+        self.id = uuid.uuid4().hex
+        self.operation = operation
+        self.cost = cost
+        self.future = future
+        self.submitted = time.time()
+        self.finished = None
+        self.seconds = None
+        self.cancelled = False
+
+    @property
+    def state(self):
+        if self.cancelled:
+            return "cancelled"
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        if self.future.exception() is not None:
+            return "failed"
+        response, _ = self.future.result()
+        return "done" if response.get("status") == "success" else "failed"
+
+
+class JobManager:
+    """
+    Bounded job queue in front of a process pool
+    max_workers:  worker processes
+    max_pending:  queued + running jobs accepted before submit() refuses
+    ttl:          seconds a finished job's result is kept for collection
+    """
+
+    def __init__(self, max_workers=2, max_pending=32, ttl=600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._jobs = {}
+        self._pool = None
+        self._lock = threading.Lock()
+        # Scalar operations per second, refined from finished jobs; only
+        # used to estimate progress
+        self._rate = 1e7
+
+    def _executor(self):
+        # A worker that died (killed, out of memory) breaks the whole pool
+        if self._pool is not None and self._pool._broken:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+        if self._pool is None:
+            # Imported here to keep them off the app's start-up path
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: forking a multi-threaded server process is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def submit(self, data, backend, cost=0):
+        """
+        Queues a payload and returns its Job
+        Raises JobError when max_pending jobs are already queued or running
+        """
+        with self._lock:
+            self._expire()
+            pending = sum(1 for job in self._jobs.values() if not job.future.done())
+            if pending >= self.max_pending:
+                raise JobError(f"Job queue is full ({self.max_pending} jobs pending), retry later")
+
+            future = self._executor().submit(_work, data, backend)
+            job = Job(data.get("operation"), cost, future)
+            self._jobs[job.id] = job
+
+        future.add_done_callback(lambda _: self._finished(job))
+        return job
+
+    def _finished(self, job):
+        job.finished = time.time()
+        if job.future.cancelled() or job.future.exception() is not None:
+            return
+        _, job.seconds = job.future.result()
+        if job.cost and job.seconds > 0:
+            self._rate = 0.8 * self._rate + 0.2 * (job.cost / job.seconds)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [i for i, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued job, or drops the result of a running one (the
+        worker finishes it, a process pool cannot interrupt a task)
+        Finished jobs are forgotten
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.future.done():
+                del self._jobs[job_id]
+            else:
+                job.cancelled = True
+                if job.future.cancel():
+                    job.finished = time.time()
+            return job
+
+    def progress(self, job):
+        """
+        0 while queued, 1 when finished; in between an estimate from the
+        job's cost and the throughput of earlier jobs
+        """
+        state = job.state
+        if state == "queued":
+            return 0.0
+        if state != "running":
+            return 1.0
+        expected = job.cost / self._rate if job.cost else 1.0
+        return round(min(0.99, (time.time() - job.submitted) / max(expected, 1e-3)), 3)
+
+    def describe(self, job):
+        """
+        JSON view of a job; finished jobs carry the /calculate response
+        """
+        state = job.state
+        info = {
+            "id": job.id,
+            "operation": job.operation,
+            "state": state,
+            "progress": self.progress(job),
+            "estimated_cost": job.cost,
+            "submitted": job.submitted,
+        }
+        if job.finished is not None:
+            info["finished"] = job.finished
+        if job.seconds is not None:
+            info["seconds"] = round(job.seconds, 6)
+
+        if state in ("done", "failed") and job.future.done():
+            try:
+                info["response"], _ = job.future.result()
+            except CancelledError:
+                pass
+            except Exception as e:
+                info["response"] = {"status": "error", "message": f"Job failed: {str(e)}"}
+
+        return info
+
+    def stats(self):
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            **{state: states.count(state) for state in ("queued", "running", "done", "failed", "cancelled")}
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,282 @@
+# ============================================
+# INCREMENTAL JSON
+# ============================================
+#
+# Large request bodies and large results never exist as one Python string.
+# parse_json_body reads the body in 64 KB chunks and packs matrixA /
+# matrixB straight into Matrix buffers one row at a time; iter_json writes
+# a response as a generator, envelope first, then the result a few rows
+# per chunk.
+
+import codecs
+import json
+from array import array
+
+from utils.matrix import Matrix
+
+
+CHUNK_SIZE = 64 * 1024
+ROWS_PER_CHUNK = 64
+
+# Payload keys parsed into Matrix buffers
+MATRIX_KEYS = ("matrixA", "matrixB")
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class _Mixed(Exception):
+    pass
+
+
+def _mixed(text):
+    raise _Mixed
+
+
+# Row decoders that stop at the first value of the other numeric type; the
+# hooks only run for that value, so rows of one type parse at full speed
+_INTS = json.JSONDecoder(parse_float=_mixed)
+_FLOATS = json.JSONDecoder(parse_int=_mixed)
+
+_NUMBER_TYPES = {int, float, bool}
+
+
+def _append_row(data, text, cols):
+    """
+    Adds one row (the text between its brackets) to data and returns data,
+    which is an int64 array while every value is an integer, a float64
+    array while every value is a float, and a plain list of rows once
+    they mix (or an integer overflows int64): each value keeps the type
+    json.loads gives it
+    Raises TypeError / ValueError for anything but numbers
+    """
+    text = f"[{text}]"
+    if isinstance(data, array):
+        decoder = _INTS if data.typecode == "q" else _FLOATS
+        try:
+            data.fromlist(decoder.decode(text))
+            return data
+        except _Mixed:
+            if data.typecode == "q" and not data:
+                return _append_row(array("d"), text[1:-1], cols)
+        except OverflowError:
+            pass
+        data = [data[i:i + cols].tolist() for i in range(0, len(data), cols)] if data else []
+
+    row = json.loads(text)
+    if not set(map(type, row)) <= _NUMBER_TYPES:
+        raise TypeError
+    data.append(row)
+    return data
+
+
+class _Reader:
+    """
+    Buffered text reader over a binary stream; the buffer only holds what
+    has not been consumed yet
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.stream.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self.decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON body")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON body: expected '{char}'")
+        self.pos += 1
+
+    def find(self, char):
+        # Index of the next char in buf, reading more as needed
+        searched = 0
+        while True:
+            index = self.buf.find(char, self.pos + searched)
+            if index >= 0:
+                return index
+            searched = len(self.buf) - self.pos
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON body")
+
+    def value(self):
+        """
+        Any JSON value, decoded by the C parser once the buffer holds all
+        of it; the buffer at least doubles between attempts
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"Invalid JSON body: {e.msg}")
+            else:
+                # A number that ends with the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+
+            target = 2 * (len(self.buf) - self.pos) + CHUNK_SIZE
+            while len(self.buf) - self.pos < target and self.fill():
+                pass
+
+    def matrix(self, key):
+        """
+        A list of numeric rows packed into a Matrix row by row; anything
+        else (a bare vector, an empty list) is decoded as a plain value
+        Only an all-float matrix becomes a Matrix. Integer and mixed ones
+        come back as lists, with the values json.loads would give, so a
+        result's types do not depend on the body size
+        """
+        start = self.pos
+        self.expect("[")
+        if self.peek() != "[":
+            self.pos = start
+            return self.value()
+
+        data = array("q")
+        rows = 0
+        cols = None
+
+        while True:
+            self.expect("[")
+            end = self.find("]")
+            text = self.buf[self.pos:end]
+            if "[" in text or "{" in text or '"' in text:
+                raise ValueError(f"{key} rows must contain numbers only")
+
+            try:
+                data = _append_row(data, text, cols)
+            except (json.JSONDecodeError, TypeError):
+                raise ValueError(f"{key} rows must contain numbers only")
+
+            size = len(data[-1]) if isinstance(data, list) else len(data) - (cols or 0) * rows
+            if cols is None:
+                cols = size
+            elif size != cols:
+                raise ValueError("All rows must have the same number of columns")
+            rows += 1
+            self.pos = end + 1
+
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                if isinstance(data, list):
+                    return data
+                if data.typecode == "q":
+                    return [data[i * cols:(i + 1) * cols].tolist() for i in range(rows)]
+                return Matrix(data, rows, cols)
+            if char != ",":
+                raise ValueError(f"Invalid JSON body: unexpected '{char}' in {key}")
+
+
+def parse_json_body(stream, matrix_keys=MATRIX_KEYS):
+    """
+    Parses a JSON object from a binary stream
+    Float matrices under matrix_keys become Matrix objects, so peak memory
+    is one row of text plus 8 bytes per element instead of the whole body
+    plus a list of float objects
+    """
+    reader = _Reader(stream)
+    reader.expect("{")
+    data = {}
+
+    if reader.peek() == "}":
+        return data
+
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("Invalid JSON body: object keys must be strings")
+        reader.expect(":")
+
+        if key in matrix_keys and reader.peek() == "[":
+            data[key] = reader.matrix(key)
+        else:
+            data[key] = reader.value()
+
+        char = reader.peek()
+        reader.pos += 1
+        if char == "}":
+            return data
+        if char != ",":
+            raise ValueError(f"Invalid JSON body: unexpected '{char}'")
+
+
+# --------------------------------------------
+# STREAMED RESPONSES
+# --------------------------------------------
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _is_table(value):
+    return isinstance(value, Matrix) or (
+        isinstance(value, list) and value and isinstance(value[0], (list, tuple))
+    )
+
+
+def result_size(value):
+    """
+    Number of elements in a result (a matrix, or a dict of matrices)
+    """
+    if isinstance(value, dict):
+        return sum(result_size(part) for part in value.values())
+    if _is_table(value):
+        return len(value) * len(value[0])
+    return 1
+
+
+def _iter_value(value, rows_per_chunk):
+    if isinstance(value, dict):
+        yield "{"
+        for index, (key, part) in enumerate(value.items()):
+            yield ("," if index else "") + _dumps(key) + ":"
+            yield from _iter_value(part, rows_per_chunk)
+        yield "}"
+    elif _is_table(value):
+        yield "["
+        for start in range(0, len(value), rows_per_chunk):
+            stop = min(start + rows_per_chunk, len(value))
+            rows = ",".join(_dumps(list(value[i])) for i in range(start, stop))
+            yield ("," if start else "") + rows
+        yield "]"
+    else:
+        yield _dumps(value)
+
+
+def iter_json(response, rows_per_chunk=ROWS_PER_CHUNK):
+    """
+    Yields a response dict as JSON text: every field except "result"
+    first, then the result a few rows per chunk
+    """
+    head = {key: value for key, value in response.items() if key != "result"}
+    if "result" not in response:
+        yield _dumps(head)
+        return
+
+    envelope = _dumps(head)[:-1]
+    yield envelope + ("," if head else "") + '"result":'
+    yield from _iter_value(response["result"], rows_per_chunk)
+    yield "}"
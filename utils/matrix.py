@@ -0,0 +1,198 @@
+# ============================================
+# COMPACT MATRIX TYPE
+# ============================================
+
+from array import array
+
+
+class Matrix:
+    """
+    Dense float64 matrix backed by one contiguous array('d')
+    Rows are zero-copy memoryview slices, so every op that reads A[i][j],
+    len(A) or iterates rows accepts a Matrix as well as a list of lists
+    profile caches the structure found by utilities_ops.profile_matrix;
+    __setitem__ clears it (writes through row views bypass that)
+    """
+
+    __slots__ = ("rows", "cols", "_data", "_view", "_offset", "_row_stride", "_col_stride", "profile")
+
+    def __init__(self, data, rows, cols, offset=0, row_stride=None, col_stride=1):
+        if row_stride is None:
+            row_stride = cols
+
+        view = memoryview(data)
+        if view.format != "d":
+            view = view.cast("B").cast("d")
+
+        self._data = data
+        self._view = view
+        self.rows = rows
+        self.cols = cols
+        self._offset = offset
+        self._row_stride = row_stride
+        self._col_stride = col_stride
+        self.profile = None
+
+    # ---------- CONSTRUCTORS ----------
+
+    @classmethod
+    def from_rows(cls, rows):
+        if isinstance(rows, Matrix):
+            return rows.copy()
+
+        n_rows = len(rows)
+        n_cols = len(rows[0]) if n_rows else 0
+
+        data = array("d")
+        for row in rows:
+            if len(row) != n_cols:
+                raise ValueError("All rows must have the same number of columns")
+            data.extend(row)
+
+        return cls(data, n_rows, n_cols)
+
+    @classmethod
+    def zeros(cls, rows, cols):
+        return cls(array("d", bytes(8 * rows * cols)), rows, cols)
+
+    # ---------- SHAPE / LAYOUT ----------
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    @property
+    def strides(self):
+        return self._row_stride, self._col_stride
+
+    @property
+    def nbytes(self):
+        return 8 * self.rows * self.cols
+
+    def is_contiguous(self):
+        return self._col_stride == 1 and (self._row_stride == self.cols or self.rows <= 1)
+
+    # ---------- ELEMENT / ROW ACCESS ----------
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            i, j = index
+            return self._view[self._index(i, j)]
+
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.rows)
+            count = len(range(start, stop, step))
+            return Matrix(
+                self._data, count, self.cols,
+                self._offset + start * self._row_stride,
+                self._row_stride * step, self._col_stride
+            )
+
+        return self.row(index)
+
+    def __setitem__(self, index, value):
+        self.profile = None
+        if isinstance(index, tuple):
+            i, j = index
+            self._view[self._index(i, j)] = value
+            return
+
+        row = self.row(index)
+        if len(value) != self.cols:
+            raise ValueError("Row length does not match the number of columns")
+        row[:] = array("d", value)
+
+    def _index(self, i, j):
+        if i < 0:
+            i += self.rows
+        if j < 0:
+            j += self.cols
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise IndexError("Matrix index out of range")
+        return self._offset + i * self._row_stride + j * self._col_stride
+
+    def row(self, i):
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError("Row index out of range")
+
+        start = self._offset + i * self._row_stride
+        return self._view[start:start + self.cols * self._col_stride:self._col_stride]
+
+    def col(self, j):
+        if j < 0:
+            j += self.cols
+        if not 0 <= j < self.cols:
+            raise IndexError("Column index out of range")
+
+        start = self._offset + j * self._col_stride
+        return self._view[start:start + self.rows * self._row_stride:self._row_stride]
+
+    # ---------- VIEWS ----------
+
+    @property
+    def T(self):
+        return Matrix(
+            self._data, self.cols, self.rows,
+            self._offset, self._col_stride, self._row_stride
+        )
+
+    def transpose(self):
+        return self.T
+
+    def submatrix(self, row_start, row_stop, col_start, col_stop):
+        row_start, row_stop, _ = slice(row_start, row_stop).indices(self.rows)
+        col_start, col_stop, _ = slice(col_start, col_stop).indices(self.cols)
+
+        return Matrix(
+            self._data,
+            max(0, row_stop - row_start), max(0, col_stop - col_start),
+            self._offset + row_start * self._row_stride + col_start * self._col_stride,
+            self._row_stride, self._col_stride
+        )
+
+    # ---------- CONVERSION ----------
+
+    def copy(self):
+        if self.is_contiguous():
+            start = self._offset
+            data = array("d")
+            data.frombytes(self._view[start:start + self.rows * self.cols].cast("B"))
+        else:
+            data = array("d")
+            for row in self:
+                data.extend(row)
+        return Matrix(data, self.rows, self.cols)
+
+    def tolist(self):
+        return [row.tolist() for row in self]
+
+    def __repr__(self):
+        return f"Matrix({self.rows}x{self.cols})"
+
+
+def as_matrix(A):
+    """
+    Returns A unchanged if it is already a Matrix, otherwise packs the
+    list of lists into a new compact Matrix
+    """
+    if isinstance(A, Matrix):
+        return A
+    return Matrix.from_rows(A)
+
+
+def to_list(A):
+    """
+    Converts a Matrix back to a list of lists at the JSON boundary
+    """
+    if isinstance(A, Matrix):
+        return A.tolist()
+    return A
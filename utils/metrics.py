@@ -0,0 +1,231 @@
+# ============================================
+# REQUEST METRICS
+# ============================================
+#
+# Process-wide counters and histograms for /calculate, /solve and
+# /expression, rendered in the Prometheus text format by GET /metrics.
+# Every request is split into three phases: decode (reading the body),
+# compute (validation and the operation itself) and serialize (encoding
+# the response). The same split goes out on each response as a
+# Server-Timing header, so a browser's network panel shows it too.
+#
+# Operation labels are limited to registered names; anything else is
+# counted as "unknown" so clients cannot grow the label set.
+
+import os
+import threading
+from bisect import bisect_left
+
+from utils.registry import get_operation
+
+
+# Seconds; a pure-Python request ranges from microseconds to minutes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Elements (rows x cols) of the first operand
+SIZE_BUCKETS = (1, 4, 16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+PHASES = ("decode", "compute", "serialize")
+
+
+# --------------------------------------------
+# INPUT SIZE
+# --------------------------------------------
+
+def input_elements(data):
+    """
+    rows x cols of the payload's matrixA (or first of its matrices), None
+    when there is none or it is a stored-matrix id
+    """
+    matrix = data.get("matrixA")
+    if matrix is None:
+        matrices = data.get("matrices")
+        if isinstance(matrices, dict):
+            matrices = list(matrices.values())
+        matrix = matrices[0] if isinstance(matrices, list) and matrices else None
+
+    try:
+        if hasattr(matrix, "shape"):
+            rows, cols = matrix.shape
+        elif isinstance(matrix, dict):
+            # COO / CSR payload
+            rows, cols = matrix["shape"]
+        elif isinstance(matrix, list) and matrix:
+            rows, cols = len(matrix), len(matrix[0]) if isinstance(matrix[0], list) else 1
+        else:
+            return None
+        return int(rows) * int(cols)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# --------------------------------------------
+# SERVER-TIMING
+# --------------------------------------------
+
+def server_timing(timings):
+    """
+    Server-Timing header value for {phase: seconds}, in milliseconds
+    """
+    parts = [f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in timings.items()]
+    parts.append(f"total;dur={sum(timings.values()) * 1000:.3f}")
+    return ", ".join(parts)
+
+
+# --------------------------------------------
+# COLLECTOR
+# --------------------------------------------
+
+class Histogram:
+    """
+    Per-bucket counts plus sum and count; cumulated only when rendered
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # bisect_left: a value equal to a bound belongs to that bucket (le)
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_label(value)}"' for name, value in zip(names, values))
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    Thread-safe request metrics: requests and errors per operation,
+    latency, phase and input-size histograms
+    """
+
+    def __init__(self, enabled=True, latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS):
+        self.enabled = enabled
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._requests = {}
+            self._errors = {}
+            self._latency = {}
+            self._phases = {}
+            self._sizes = {}
+
+    @staticmethod
+    def operation_label(data):
+        name = data.get("operation") if isinstance(data, dict) else None
+        return name if isinstance(name, str) and get_operation(name) is not None else "unknown"
+
+    def observe(self, operation, status, timings, elements=None):
+        """
+        Records one request: its status ("success" / "error"), the seconds
+        spent in each phase and the size of its input
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            key = (operation, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if status != "success":
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+
+            self._histogram(self._latency, operation, self.latency_buckets).observe(sum(timings.values()))
+            for phase, seconds in timings.items():
+                self._histogram(self._phases, (operation, phase), self.latency_buckets).observe(seconds)
+            if elements is not None:
+                self._histogram(self._sizes, operation, self.size_buckets).observe(elements)
+
+    @staticmethod
+    def _histogram(table, key, bounds):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(bounds)
+        return histogram
+
+    # ---------- EXPOSITION ----------
+
+    def render(self):
+        """
+        Everything collected, in the Prometheus text exposition format
+        """
+        with self._lock:
+            requests = sorted(self._requests.items())
+            errors = sorted(self._errors.items())
+            latency = sorted(self._snapshot(self._latency).items())
+            phases = sorted(self._snapshot(self._phases).items())
+            sizes = sorted(self._snapshot(self._sizes).items())
+
+        lines = [
+            "# HELP matrixlab_requests_total Requests per operation and status.",
+            "# TYPE matrixlab_requests_total counter",
+        ]
+        for (operation, status), count in requests:
+            lines.append(f"matrixlab_requests_total{{{_labels(('operation', 'status'), (operation, status))}}} {count}")
+
+        lines += [
+            "# HELP matrixlab_operation_errors_total Requests that returned an error, per operation.",
+            "# TYPE matrixlab_operation_errors_total counter",
+        ]
+        for operation, count in errors:
+            lines.append(f"matrixlab_operation_errors_total{{{_labels(('operation',), (operation,))}}} {count}")
+
+        self._render_histograms(
+            lines, "matrixlab_request_duration_seconds", "Request latency (decode + compute + serialize) per operation.",
+            ("operation",), [((operation,), histogram) for operation, histogram in latency]
+        )
+        self._render_histograms(
+            lines, "matrixlab_request_phase_seconds", "Time per request phase (decode, compute, serialize) per operation.",
+            ("operation", "phase"), phases
+        )
+        self._render_histograms(
+            lines, "matrixlab_input_elements", "Elements (rows x cols) of the first operand per operation.",
+            ("operation",), [((operation,), histogram) for operation, histogram in sizes]
+        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _snapshot(table):
+        # Copies taken under the lock so rendering does not hold it
+        copies = {}
+        for key, histogram in table.items():
+            copy = Histogram(histogram.bounds)
+            copy.counts = list(histogram.counts)
+            copy.sum, copy.count = histogram.sum, histogram.count
+            copies[key] = copy
+        return copies
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, label_names, series):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for values, histogram in series:
+            labels = _labels(label_names, values)
+            running = 0
+            for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                running += count
+                lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {running}')
+            lines.append(f"{name}_sum{{{labels}}} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+metrics = Metrics(enabled=os.environ.get("MATRIXLAB_METRICS", "1") != "0")
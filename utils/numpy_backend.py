@@ -0,0 +1,404 @@
+# ============================================
+# NUMPY BACKEND
+# ============================================
+#
+# Drop-in replacements for the pure-Python ops, picked up by
+# utils.backend.dispatch when NumPy is installed. Each function keeps the
+# reference signature, input checks and error messages, and converts its
+# result back to plain Python lists / floats for the JSON boundary.
+
+import numpy as np
+
+from utils.advanced_ops import PIVOT_TOLERANCE
+from utils.matrix import Matrix
+
+
+def _asarray(A):
+    if isinstance(A, Matrix):
+        row_stride, col_stride = A.strides
+        return np.ndarray(
+            shape=A.shape, dtype=np.float64, buffer=A._data,
+            offset=8 * A._offset, strides=(8 * row_stride, 8 * col_stride)
+        )
+    return np.asarray(A, dtype=np.float64)
+
+
+def _vector(A):
+    a = _asarray(A)
+    if a.shape[0] == 1:
+        return a[0]
+    elif a.shape[1] == 1:
+        return a[:, 0]
+    else:
+        raise ValueError("Input must be a vector (1xn or nx1)")
+
+
+# ---------- BASIC ----------
+
+def add_matrices(A, B):
+    a, b = _asarray(A), _asarray(B)
+    if a.shape != b.shape:
+        raise ValueError("Matrices must have the same dimensions")
+    return (a + b).tolist()
+
+
+def subtract_matrices(A, B):
+    a, b = _asarray(A), _asarray(B)
+    if a.shape != b.shape:
+        raise ValueError("Matrices must have the same dimensions")
+    return (a - b).tolist()
+
+
+def multiply_matrices(A, B, method="auto"):
+    a, b = _asarray(A), _asarray(B)
+    if a.shape[1] != b.shape[0]:
+        raise ValueError("Number of columns in A must equal number of rows in B")
+    return (a @ b).tolist()
+
+
+def chain_multiply(matrices):
+    arrays = [_asarray(M) for M in matrices]
+    for index in range(1, len(arrays)):
+        if arrays[index].shape[0] != arrays[index - 1].shape[1]:
+            raise ValueError(
+                f"Matrix {index + 1} has {arrays[index].shape[0]} rows but matrix {index} "
+                f"has {arrays[index - 1].shape[1]} columns"
+            )
+    if len(arrays) == 1:
+        return arrays[0].tolist()
+    return np.linalg.multi_dot(arrays).tolist()
+
+
+def transpose_matrix(A):
+    return _asarray(A).T.tolist()
+
+
+# ---------- SCALAR ----------
+
+def scalar_multiply(A, scalar):
+    return (_asarray(A) * scalar).tolist()
+
+
+def matrices_equal(A, B):
+    a, b = _asarray(A), _asarray(B)
+    return a.shape == b.shape and bool(np.array_equal(a, b))
+
+
+# ---------- ALGEBRA ----------
+
+def determinant(A):
+    a = _asarray(A)
+    n = a.shape[0]
+
+    if n != a.shape[1]:
+        raise ValueError("Matrix must be square")
+
+    return float(np.linalg.det(a))
+
+
+def log_determinant(A):
+    a = _asarray(A)
+    if a.shape[0] != a.shape[1]:
+        raise ValueError("Matrix must be square")
+
+    sign, log_abs = np.linalg.slogdet(a)
+    return float(sign), float(log_abs)
+
+
+# Rows substituted per step of _substitute; the diagonal blocks go to LAPACK
+SUBSTITUTION_BLOCK = 64
+
+
+def _substitute(T, b, lower):
+    """
+    Solves T x = b for triangular T by blocks: each diagonal block is a
+    small LAPACK solve, the rest one matrix product per block, O(n^2)
+    overall (numpy has no triangular solver of its own)
+    """
+    n = T.shape[0]
+    x = np.empty_like(b)
+    starts = range(0, n, SUBSTITUTION_BLOCK)
+    for i in (starts if lower else reversed(starts)):
+        j = min(i + SUBSTITUTION_BLOCK, n)
+        if lower:
+            rest = b[i:j] - T[i:j, :i] @ x[:i]
+        else:
+            rest = b[i:j] - T[i:j, j:] @ x[j:]
+        x[i:j] = np.linalg.solve(T[i:j, i:j], rest)
+    return x
+
+
+# Columns eliminated per panel of _lu; the rest of the matrix is updated
+# once per panel with a matrix product
+LU_BLOCK = 64
+
+
+def _lu(a):
+    """
+    PA = LU with partial pivoting, L and U packed in one array; returns
+    (LU, perm). Triangular A is taken as it is, as lu_factor does, so the
+    pivots the singularity rule looks at are the same on both backends
+    """
+    n = a.shape[0]
+    LU = np.array(a, dtype=np.float64)
+    perm = np.arange(n)
+    diagonal = np.diagonal(LU)
+
+    if np.array_equal(LU, np.triu(LU)):
+        return LU, perm
+    if np.array_equal(LU, np.tril(LU)) and np.all(diagonal != 0):
+        # Lower: A = (A D^-1) D with D its diagonal, so L = A D^-1, U = D
+        LU = np.tril(LU / diagonal, -1) + np.diag(diagonal)
+        return LU, perm
+
+    for start in range(0, n, LU_BLOCK):
+        end = min(start + LU_BLOCK, n)
+        for c in range(start, end):
+            p = c + int(np.argmax(np.abs(LU[c:, c])))
+            if p != c:
+                LU[[c, p]] = LU[[p, c]]
+                perm[[c, p]] = perm[[p, c]]
+            if LU[c, c] != 0:
+                LU[c + 1:, c] /= LU[c, c]
+            LU[c + 1:, c + 1:end] -= np.outer(LU[c + 1:, c], LU[c, c + 1:end])
+        if end < n:
+            L11 = np.tril(LU[start:end, start:end], -1) + np.eye(end - start)
+            LU[start:end, end:] = np.linalg.solve(L11, LU[start:end, end:])
+            LU[end:, end:] -= LU[end:, start:end] @ LU[start:end, end:]
+    return LU, perm
+
+
+def _inverse(a):
+    """
+    A^-1 and cond_1(A) = ||A||_1 ||A^-1||_1 from one LU factorization
+    Raises ValueError under the pure-Python rule: a pivot at or below
+    PIVOT_TOLERANCE x max|a_ij|
+    """
+    if a.shape[0] != a.shape[1]:
+        raise ValueError("Matrix must be square to compute an inverse")
+
+    LU, perm = _lu(a)
+    if np.any(np.abs(np.diagonal(LU)) <= PIVOT_TOLERANCE * np.abs(a).max()):
+        raise ValueError(f"Matrix is singular to working precision (pivot below {PIVOT_TOLERANCE:g} x max|a_ij|)")
+
+    n = a.shape[0]
+    L = np.tril(LU, -1) + np.eye(n)
+    X = _substitute(np.triu(LU), _substitute(L, np.eye(n)[perm], True), False)
+    norm_1 = lambda m: np.abs(m).sum(axis=0).max()
+    return X, float(norm_1(a) * norm_1(X))
+
+
+def inverse(A):
+    return _inverse(_asarray(A))[0].tolist()
+
+
+def inverse_and_condition(A):
+    X, cond = _inverse(_asarray(A))
+    return X.tolist(), cond
+
+
+def solve_linear_system(A, B):
+    a, b = _asarray(A), _asarray(B)
+    if a.shape[0] != a.shape[1]:
+        raise ValueError("Coefficient matrix must be square")
+    if b.shape[0] != a.shape[0]:
+        raise ValueError("Right-hand side must have as many rows as the matrix")
+
+    # Symmetric A: Cholesky (half the work of LU) when it is positive
+    # definite, then L y = b and Lᵀ x = y; LU otherwise
+    if np.array_equal(a, a.T):
+        try:
+            L = np.linalg.cholesky(a)
+        except np.linalg.LinAlgError:
+            pass
+        else:
+            return _substitute(L.T, _substitute(L, b, True), False).tolist(), "cholesky"
+
+    try:
+        return np.linalg.solve(a, b).tolist(), "lu"
+    except np.linalg.LinAlgError:
+        raise ValueError("Matrix is singular to working precision, system has no unique solution")
+
+
+def condition_number(A):
+    a = _asarray(A)
+    if a.shape[0] != a.shape[1]:
+        raise ValueError("Matrix must be square")
+    try:
+        return _inverse(a)[1]
+    except ValueError:
+        return float("inf")
+
+
+def inverse_2x2(A):
+    a = _asarray(A)
+    if a.shape != (2, 2):
+        raise ValueError("Inverse is implemented only for 2x2 matrices")
+    if a[0, 0] * a[1, 1] - a[0, 1] * a[1, 0] == 0:
+        raise ValueError("Matrix is singular, inverse does not exist")
+    return np.linalg.inv(a).tolist()
+
+
+def rank(matrix, tolerance=None):
+    return int(np.linalg.matrix_rank(_asarray(matrix), tol=tolerance))
+
+
+def trace(A):
+    a = _asarray(A)
+    if a.shape[0] != a.shape[1]:
+        raise ValueError("Matrix must be square to compute trace")
+    return float(np.trace(a))
+
+
+# ---------- DECOMPOSITIONS ----------
+
+def cholesky_decomposition(A):
+    try:
+        return np.linalg.cholesky(_asarray(A)).tolist()
+    except np.linalg.LinAlgError:
+        raise ValueError("Matrix is not positive definite")
+
+
+def qr_decomposition(A, mode="reduced"):
+    if mode not in ("reduced", "complete"):
+        raise ValueError(f"Unknown QR mode '{mode}', expected 'reduced' or 'complete'")
+    Q, R = np.linalg.qr(_asarray(A), mode=mode)
+    return Q.tolist(), R.tolist()
+
+
+def svd(A):
+    U, S, Vt = np.linalg.svd(_asarray(A), full_matrices=False)
+    return U.tolist(), S.tolist(), Vt.tolist()
+
+
+def singular_values(A):
+    return np.linalg.svd(_asarray(A), compute_uv=False).tolist()
+
+
+def pseudo_inverse(A, tolerance=None):
+    a = _asarray(A)
+    U, S, Vt = np.linalg.svd(a, full_matrices=False)
+    cutoff = tolerance if tolerance is not None else max(a.shape) * np.finfo(float).eps * (S[0] if S.size else 0.0)
+    keep = S > cutoff
+    return ((Vt[keep].T / S[keep]) @ U[:, keep].T).tolist()
+
+
+def least_squares(A, B, tolerance=None):
+    a, b = _asarray(A), _asarray(B)
+    if b.shape[0] != a.shape[0]:
+        raise ValueError("Right-hand side must have as many rows as the matrix")
+    # rcond is relative to the largest singular value
+    largest = np.linalg.norm(a, 2)
+    rcond = tolerance / largest if tolerance is not None and largest else None
+    X, _, rank_A, _ = np.linalg.lstsq(a, b, rcond=rcond)
+    info = {"method": "svd", "rank": int(rank_A), "residual": float(np.linalg.norm(a @ X - b))}
+    return X.tolist(), info
+
+
+def eigenvalues_2x2(A):
+    values = np.linalg.eigvals(_asarray(A)[:2, :2])
+    if np.iscomplexobj(values) and np.any(values.imag != 0):
+        return tuple(complex(v) for v in values)
+    return tuple(sorted((float(v) for v in values.real), reverse=True))
+
+
+def _eigen_lists(values, Z, order):
+    # Same ordering and types as the reference: floats unless complex
+    values = [complex(v) if v.imag != 0 else float(v.real) for v in values[order]]
+    if Z is None:
+        return values, None
+    Z = Z[:, order]
+    if not np.any(Z.imag):
+        Z = Z.real
+    return values, Z.tolist()
+
+
+def eigen(A, vectors=False):
+    a = _asarray(A)
+    if a.ndim != 2 or a.shape[0] == 0 or a.shape[0] != a.shape[1]:
+        raise ValueError("Eigenvalues require a square matrix")
+
+    if np.array_equal(a, a.T):
+        if vectors:
+            values, Z = np.linalg.eigh(a)
+        else:
+            values, Z = np.linalg.eigvalsh(a), None
+        return values[::-1].tolist(), (Z[:, ::-1].tolist() if vectors else None), "lapack_eigh"
+
+    if vectors:
+        values, Z = np.linalg.eig(a)
+    else:
+        values, Z = np.linalg.eigvals(a), None
+    values = values.astype(complex)
+    order = np.lexsort((-values.imag, -values.real))
+    values, Z = _eigen_lists(values, None if Z is None else Z.astype(complex), order)
+    return values, Z, "lapack_eig"
+
+
+def top_eigen(A, k, vectors=False, tolerance=1e-10):
+    # LAPACK's full solve beats a Python-driven Krylov loop at these sizes
+    a = _asarray(A)
+    if a.ndim != 2 or a.shape[0] == 0 or a.shape[0] != a.shape[1]:
+        raise ValueError("Eigenvalues require a square matrix")
+
+    symmetric = np.array_equal(a, a.T)
+    if symmetric:
+        values, Z = np.linalg.eigh(a) if vectors else (np.linalg.eigvalsh(a), None)
+    else:
+        values, Z = np.linalg.eig(a) if vectors else (np.linalg.eigvals(a), None)
+    values = values.astype(complex)
+    order = np.lexsort((-values.imag, -np.abs(values)))[:k]
+    values, Z = _eigen_lists(values, None if Z is None else Z.astype(complex), order)
+    return values, Z, "lapack_eigh" if symmetric else "lapack_eig"
+
+
+# ---------- STATISTICS ----------
+
+def covariance(A, B, ddof=0):
+    x, y = _vector(A), _vector(B)
+    if len(x) != len(y):
+        raise ValueError("Vectors must have the same length")
+    if len(x) - ddof <= 0:
+        raise ValueError(f"At least {ddof + 1} observation(s) are required")
+    return float(np.cov(x, y, ddof=ddof)[0, 1])
+
+
+def correlation(A, B):
+    x, y = _vector(A), _vector(B)
+    if len(x) != len(y):
+        raise ValueError("Vectors must have the same length")
+    if x.std() == 0 or y.std() == 0:
+        raise ValueError("Standard deviation cannot be zero")
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+def covariance_matrix(A, ddof=0):
+    a = _asarray(A)
+    if a.shape[0] - ddof <= 0:
+        raise ValueError(f"At least {ddof + 1} observation(s) are required")
+    return np.atleast_2d(np.cov(a, rowvar=False, ddof=ddof)).tolist()
+
+
+def correlation_matrix(A):
+    a = _asarray(A)
+    std = a.std(axis=0)
+    for i, value in enumerate(std):
+        if value == 0:
+            raise ValueError(f"Standard deviation of column {i + 1} cannot be zero")
+    return np.atleast_2d(np.corrcoef(a, rowvar=False)).tolist()
+
+
+# ---------- UTILITIES ----------
+
+def is_identity(matrix):
+    a = _asarray(matrix)
+    return a.shape[0] == a.shape[1] and bool(np.array_equal(a, np.eye(a.shape[0])))
+
+
+def is_zero(matrix):
+    return not bool(np.any(_asarray(matrix)))
+
+
+def is_symmetric(matrix):
+    a = _asarray(matrix)
+    return a.shape[0] == a.shape[1] and bool(np.array_equal(a, a.T))
@@ -0,0 +1,779 @@
+# ============================================
+# OPERATION DEFINITIONS
+# ============================================
+#
+# One register() call per /calculate operation. Targets are
+# "module:function" strings so nothing below imports the math modules;
+# each is imported the first time one of its operations runs.
+
+import math
+
+from utils.registry import OperationError
+from utils.registry import register
+from utils.registry import chain_cost
+from utils.registry import cubic_cost
+from utils.registry import elementwise_cost
+from utils.registry import expression_cost
+from utils.registry import gram_cost
+from utils.registry import matmul_cost
+from utils.registry import size_cost
+from utils.registry import solve_cost
+
+
+# Inverses with a condition number above this carry a warning
+ILL_CONDITIONED = 1e12
+
+
+def _yes_no(check):
+    return ["Yes"] if check else ["No"]
+
+
+def _run_sparse(operation, data):
+    """
+    Runner for operations with sparse kernels: picks the sparse or dense
+    path from the operand densities and reports which one ran
+    """
+    from utils.sparse_ops import KERNELS, choose_path, is_sparse
+
+    operands = [data[key] for key in operation.inputs]
+    path, operands, densities = choose_path(operation.name, operands, operation.inputs)
+    args = operands + [data[key] for key in operation.schema]
+
+    if path == "sparse":
+        value = KERNELS[operation.name](*args)
+    else:
+        value = operation.func(*args)
+
+    extras = {"path": path, "density": densities} if densities else {}
+    return (value.to_coo() if is_sparse(value) else value), extras
+
+
+# =================================================
+# BASIC OPERATIONS
+# =================================================
+
+register(
+    "add", "Matrix Addition",
+    inputs=("matrixA", "matrixB"),
+    target="utils.basic_ops:add_matrices",
+    run=_run_sparse,
+    sparse=True,
+    cost=elementwise_cost,
+    missing="Both matrices are required for addition",
+    error="Error adding matrices",
+    steps=[
+        {"title": "Check Dimensions", "description": "Both matrices must have the same dimensions for addition."},
+        {"title": "Add Elements", "description": "Add each element in Matrix A to the corresponding element in Matrix B."},
+        {"title": "Complete", "description": "Result matrix created by adding corresponding elements."}
+    ]
+)
+
+register(
+    "subtract", "Matrix Subtraction",
+    inputs=("matrixA", "matrixB"),
+    target="utils.basic_ops:subtract_matrices",
+    run=_run_sparse,
+    sparse=True,
+    cost=elementwise_cost,
+    missing="Both matrices are required for subtraction",
+    error="Error subtracting matrices",
+    steps=[
+        {"title": "Check Dimensions", "description": "Both matrices must have the same dimensions for subtraction."},
+        {"title": "Subtract Elements", "description": "Subtract each element in Matrix B from the corresponding element in Matrix A."},
+        {"title": "Complete", "description": "Result matrix created by subtracting corresponding elements."}
+    ]
+)
+
+register(
+    "multiply", "Matrix Multiplication",
+    inputs=("matrixA", "matrixB"),
+    target="utils.basic_ops:multiply_matrices",
+    run=_run_sparse,
+    sparse=True,
+    cost=matmul_cost,
+    missing="Both matrices are required for multiplication",
+    error="Error multiplying matrices",
+    steps=[
+        {"title": "Check Dimensions", "description": "Number of columns in A must equal number of rows in B."},
+        {"title": "Calculate Dot Products", "description": "For each element (i,j), multiply row i of A with column j of B and sum."},
+        {"title": "Complete", "description": "Result matrix created through matrix multiplication."}
+    ]
+)
+
+
+# ---------- MATRIX CHAIN ----------
+
+def _chain_matrices(data):
+    matrices = data.get("matrices")
+    if matrices is None and data.get("matrixA") is not None and data.get("matrixB") is not None:
+        matrices = [data["matrixA"], data["matrixB"]]
+    return matrices
+
+
+def _run_chain(operation, data):
+    from utils.basic_ops import chain_plan
+
+    matrices = _chain_matrices(data)
+    if not isinstance(matrices, list) or not matrices:
+        raise OperationError("A list of matrices is required for chain multiplication")
+
+    plan = chain_plan(matrices)
+    return operation.func(matrices), {"plan": plan}
+
+
+def _chain_steps(ctx):
+    plan = ctx.extras["plan"]
+    return [
+        {"title": "Dimensions", "description": " · ".join(plan["dimensions"])},
+        {"title": "Optimal Order", "description": f"Dynamic programming over split points picks {plan['order']}."},
+        {"title": "Cost", "description": f"{plan['cost']} scalar multiplications instead of {plan['naive_cost']} left to right."},
+        {"title": "Complete", "description": "Products executed in the planned order."}
+    ]
+
+
+register(
+    "chain_multiply", "Matrix Chain Multiplication",
+    target="utils.basic_ops:chain_multiply",
+    run=_run_chain,
+    steps=_chain_steps,
+    cost=lambda data: chain_cost({"matrices": _chain_matrices(data)}),
+    error="Error multiplying matrix chain"
+)
+
+
+# ---------- EXPRESSION ----------
+
+def _run_expression(operation, data):
+    matrices = dict(data.get("matrices") or {})
+
+    # matrixA / matrixB double as the inputs named A and B
+    if data.get("matrixA") is not None:
+        matrices.setdefault("A", data["matrixA"])
+    if data.get("matrixB") is not None:
+        matrices.setdefault("B", data["matrixB"])
+
+    result, plan = operation.func(data["expression"], matrices)
+    return result, {"plan": plan}
+
+
+def _expression_steps(ctx):
+    plan = ctx.extras["plan"]
+    return [
+        {"title": "Parse", "description": f"Parse '{ctx.data['expression']}' into a DAG of {plan['nodes']} nodes, merging {plan['shared_subexpressions']} repeated sub-expression(s)."},
+        {"title": "Fuse", "description": f"Combine chains of +, -, scalar × and transpose into {plan['fused_kernels']} single-pass kernel(s); {plan['matrix_products']} matrix product(s) run separately."},
+        {"title": "Complete", "description": f"{plan['materialized']} intermediate matrix/matrices materialized, including the result."}
+    ]
+
+
+register(
+    "expression", "Matrix Expression",
+    schema={"expression": "string"},
+    target="utils.expression_ops:evaluate_expression",
+    run=_run_expression,
+    steps=_expression_steps,
+    cost=expression_cost,
+    missing="An expression such as \"2*(A+B) - C\" is required",
+    error="Error evaluating expression"
+)
+
+
+register(
+    "transpose", "Matrix Transpose",
+    inputs=("matrixA",),
+    target="utils.basic_ops:transpose_matrix",
+    run=_run_sparse,
+    sparse=True,
+    cost=elementwise_cost,
+    missing="Matrix A is required for transpose",
+    steps=[
+        {"title": "Transpose", "description": "Swap rows and columns of the matrix."},
+        {"title": "Complete", "description": "Element at (i,j) is now at (j,i)."}
+    ]
+)
+
+
+# =================================================
+# SCALAR & PROPERTIES
+# =================================================
+
+register(
+    "scalar_multiply", "Scalar Multiplication",
+    inputs=("matrixA",),
+    schema={"scalar": "number"},
+    target="utils.scalar_ops:scalar_multiply",
+    run=_run_sparse,
+    sparse=True,
+    cost=elementwise_cost,
+    missing="Scalar value is required",
+    steps=lambda ctx: [
+        {"title": "Scalar Multiplication", "description": f"Multiply every element by {ctx.data['scalar']}."},
+        {"title": "Complete", "description": f"All elements multiplied by {ctx.data['scalar']}."}
+    ]
+)
+
+register(
+    "identity", "Identity Matrix",
+    schema={"size": "positive_int"},
+    target="utils.scalar_ops:identity_matrix",
+    run=lambda operation, data: (operation.func(data["size"]), {}),
+    cost=size_cost,
+    missing="Valid size is required for identity matrix",
+    steps=lambda ctx: [
+        {"title": "Identity Matrix", "description": f"Creating {ctx.data['size']}×{ctx.data['size']} identity matrix."},
+        {"title": "Diagonal", "description": "Set diagonal elements to 1, others to 0."}
+    ]
+)
+
+register(
+    "zero", "Zero Matrix",
+    schema={"rows": "positive_int", "cols": "positive_int"},
+    target="utils.scalar_ops:zero_matrix",
+    run=lambda operation, data: (operation.func(data["rows"], data["cols"]), {}),
+    cost=size_cost,
+    missing="Rows and columns are required for zero matrix",
+    steps=lambda ctx: [
+        {"title": "Zero Matrix", "description": f"Creating {ctx.data['rows']}×{ctx.data['cols']} zero matrix."},
+        {"title": "All Zeros", "description": "Every element set to 0."}
+    ]
+)
+
+register(
+    "equality", "Matrix Equality Check",
+    inputs=("matrixA", "matrixB"),
+    target="utils.scalar_ops:matrices_equal",
+    run=_run_sparse,
+    sparse=True,
+    format=lambda is_equal: [["Equal"]] if is_equal else [["Not Equal"]],
+    cost=elementwise_cost,
+    missing="Both matrices are required for the equality check",
+    steps=lambda ctx: [
+        {"title": "Check Dimensions", "description": "Verify both matrices have same dimensions."},
+        {"title": "Compare Elements", "description": "Compare each corresponding element."},
+        {"title": "Result", "description": f"Matrices are {'equal' if ctx.value else 'not equal'}."}
+    ]
+)
+
+
+# =================================================
+# LINEAR ALGEBRA
+# =================================================
+
+def _determinant_steps(ctx):
+    from utils.utilities_ops import profile_matrix
+
+    A = ctx.data["matrixA"]
+    if len(A) <= 3:
+        method = "Calculate determinant using the closed-form cofactor formula."
+    elif profile_matrix(A).upper or profile_matrix(A).lower:
+        method = "A is triangular: det(A) is the product of its diagonal, O(n)."
+    else:
+        method = "Reduce A to upper triangular U with partial pivoting; det(A) = ±(product of U's diagonal), sign flipped once per row swap."
+    return [
+        {"title": "Determinant", "description": method},
+        {"title": "Result", "description": f"det(A) = {ctx.value}"}
+    ]
+
+
+register(
+    "determinant", "Determinant",
+    inputs=("matrixA",),
+    target="utils.algebra_ops:determinant",
+    format=lambda value: [[value]],
+    steps=_determinant_steps,
+    cost=cubic_cost,
+    missing="Matrix A is required for the determinant"
+)
+
+def _format_log_determinant(value):
+    # A singular matrix has log|det| = -inf, which JSON cannot carry
+    sign, log_abs = value
+    return [[sign, log_abs if math.isfinite(log_abs) else None]]
+
+
+register(
+    "log_determinant", "Log Determinant",
+    inputs=("matrixA",),
+    target="utils.algebra_ops:log_determinant",
+    format=_format_log_determinant,
+    cost=cubic_cost,
+    missing="Matrix A is required for the log-determinant",
+    error="Error calculating log-determinant",
+    steps=lambda ctx: [
+        {"title": "LU Factorization", "description": "Factor PA = LU with partial pivoting."},
+        {"title": "Sum Logs", "description": "log|det(A)| = Σ log|uᵢᵢ|, sign from row swaps and negative pivots."},
+        {"title": "Result", "description": (
+            f"sign = {ctx.value[0]}, log|det(A)| = {ctx.value[1]}" if math.isfinite(ctx.value[1])
+            else "A zero pivot: the matrix is singular, det(A) = 0 and log|det(A)| = -∞ (returned as null)"
+        )}
+    ]
+)
+
+
+# ---------- INVERSE ----------
+
+def _run_inverse(operation, data):
+    result, cond = operation.func(data["matrixA"])
+
+    extras = {"condition_number": cond}
+    if cond > ILL_CONDITIONED:
+        extras["warning"] = f"Matrix is ill-conditioned (cond ≈ {cond:.3g}); the inverse may be inaccurate."
+    return result, extras
+
+
+register(
+    "inverse", "Inverse Matrix",
+    inputs=("matrixA",),
+    target="utils.algebra_ops:inverse_and_condition",
+    run=_run_inverse,
+    cost=cubic_cost,
+    missing="Matrix A is required for the inverse",
+    error="Error calculating inverse",
+    steps=lambda ctx: [
+        {"title": "LU Factorization", "description": "Factor PA = LU with partial pivoting. A pivot near 0 means the matrix is not invertible."},
+        {"title": "Solve Columns", "description": "Solve A·xⱼ = eⱼ for each column of the identity by forward and back substitution."},
+        {"title": "Condition Number", "description": f"cond₁(A) = ‖A‖₁ · ‖A⁻¹‖₁ = {ctx.extras['condition_number']:.6g}"}
+    ]
+)
+
+
+# ---------- LINEAR SYSTEM ----------
+
+def _run_solve(operation, data):
+    B = data["matrixB"]
+    result, method = operation.func(data["matrixA"], B)
+    rhs = len(B[0]) if hasattr(B[0], "__len__") else 1
+    return result, {"method": method, "rhs_count": rhs}
+
+
+def _solve_steps(ctx):
+    if ctx.extras["method"] == "diagonal":
+        return [
+            {"title": "Structure", "description": "A is diagonal: no factorization needed."},
+            {"title": "Divide", "description": "xᵢ = bᵢ / aᵢᵢ for every row, O(n) per right-hand side column."}
+        ]
+    if ctx.extras["method"] == "triangular":
+        return [
+            {"title": "Structure", "description": "A is triangular: it is its own LU factorization, no elimination needed."},
+            {"title": "Substitute", "description": f"Forward or back substitution for each of the {ctx.extras['rhs_count']} right-hand side column(s), O(n²) each."}
+        ]
+    if ctx.extras["method"] == "cholesky":
+        factor = "A is symmetric positive definite: factor A = L × Lᵀ (Cholesky)."
+    else:
+        factor = "Factor PA = LU with partial pivoting."
+    return [
+        {"title": "Factor Once", "description": factor},
+        {"title": "Substitute", "description": f"Forward and back substitution for each of the {ctx.extras['rhs_count']} right-hand side column(s), O(n²) each."},
+        {"title": "Complete", "description": "Column j of X solves A·xⱼ = bⱼ."}
+    ]
+
+
+register(
+    "solve", "Linear System Solve",
+    inputs=("matrixA", "matrixB"),
+    # B may also be a bare vector
+    schema={"matrixB": "operand"},
+    target="utils.algebra_ops:solve_linear_system",
+    run=_run_solve,
+    steps=_solve_steps,
+    cost=solve_cost,
+    missing="Coefficient matrix A and right-hand side B are required to solve AX = B",
+    error="Error solving linear system"
+)
+
+
+register(
+    "rank", "Matrix Rank",
+    inputs=("matrixA",),
+    schema={"tolerance": "number?"},
+    target="utils.algebra_ops:rank",
+    run=lambda operation, data: (operation.func(data["matrixA"], data.get("tolerance")), {}),
+    format=lambda value: [[int(value or 0)]],
+    cost=cubic_cost,
+    missing="Matrix A is required for the rank",
+    error="Error calculating rank",
+    steps=lambda ctx: [
+        {"title": "Singular Values", "description": "Compute the singular values of A."},
+        {"title": "Count", "description": "Count those above the tolerance (by default max(m, n) · ε · largest singular value)."},
+        {"title": "Result", "description": f"Rank = {ctx.result[0][0]}"}
+    ]
+)
+
+register(
+    "trace", "Trace",
+    inputs=("matrixA",),
+    target="utils.algebra_ops:trace",
+    format=lambda value: [[value]],
+    cost=elementwise_cost,
+    missing="Matrix A is required for the trace",
+    steps=lambda ctx: [
+        {"title": "Trace", "description": "Sum of diagonal elements."},
+        {"title": "Result", "description": f"tr(A) = {ctx.value}"}
+    ]
+)
+
+register(
+    "adjoint", "Adjoint Matrix",
+    inputs=("matrixA",),
+    target="utils.algebra_ops:adjoint_2x2",
+    missing="Matrix A is required for the adjoint",
+    steps=[
+        {"title": "Cofactors", "description": "Find cofactor for each element."},
+        {"title": "Transpose", "description": "Transpose the cofactor matrix."}
+    ]
+)
+
+
+# =================================================
+# DECOMPOSITIONS
+# =================================================
+
+register(
+    "lu", "LU Decomposition",
+    inputs=("matrixA",),
+    target="utils.advanced_ops:lu_decomposition",
+    format=lambda factors: {"L": factors[0], "U": factors[1]},
+    cost=cubic_cost,
+    missing="Matrix A is required for LU decomposition",
+    error="Error calculating LU decomposition",
+    steps=[
+        {"title": "LU Decomposition", "description": "Decompose A into L (lower) and U (upper)."},
+        {"title": "Verify", "description": "L × U = A"}
+    ]
+)
+
+register(
+    "cholesky", "Cholesky Decomposition",
+    inputs=("matrixA",),
+    target="utils.advanced_ops:cholesky_decomposition",
+    format=lambda L: {"L": L},
+    cost=cubic_cost,
+    missing="Matrix A is required for Cholesky decomposition",
+    error="Cholesky failed. Matrix must be symmetric and positive definite. Error",
+    steps=[
+        {"title": "Cholesky", "description": "Find L such that A = L × Lᵀ."},
+        {"title": "Requirements", "description": "Matrix must be symmetric and positive definite."}
+    ]
+)
+
+
+register(
+    "qr", "QR Decomposition",
+    inputs=("matrixA",),
+    schema={"mode": "string?"},
+    target="utils.advanced_ops:qr_decomposition",
+    run=lambda operation, data: (operation.func(data["matrixA"], data.get("mode") or "reduced"), {}),
+    format=lambda factors: {"Q": factors[0], "R": factors[1]},
+    cost=cubic_cost,
+    missing="Matrix A is required for QR decomposition",
+    error="Error calculating QR decomposition",
+    steps=lambda ctx: [
+        {"title": "Householder Reflections", "description": "For each column k, reflect the part on and below the diagonal onto a multiple of e₁, zeroing it below R's diagonal."},
+        {"title": "Accumulate Q", "description": f"Q is the product of the reflectors ({ctx.data.get('mode') or 'reduced'} mode: Q is {len(ctx.result['Q'])}×{len(ctx.result['Q'][0])})."},
+        {"title": "Verify", "description": "Q × R = A, with QᵀQ = I and R upper triangular."}
+    ]
+)
+
+
+def _svd_steps(ctx):
+    S = ctx.result["S"][0]
+    return [
+        {"title": "Bidiagonalize", "description": "Householder reflections from the left and right reduce A to an upper bidiagonal B = Uᵦᵀ A Vᵦ (Golub–Kahan)."},
+        {"title": "Diagonalize", "description": "Implicitly shifted QR sweeps on B drive its superdiagonal to zero; each rotation is folded into U and V."},
+        {"title": "Result", "description": f"A = U × diag(S) × Vᵀ with {len(S)} singular value(s), largest {S[0]:.6g}, smallest {S[-1]:.6g}."}
+    ]
+
+
+register(
+    "svd", "Singular Value Decomposition",
+    inputs=("matrixA",),
+    target="utils.advanced_ops:svd",
+    format=lambda factors: {"U": factors[0], "S": [factors[1]], "Vt": factors[2]},
+    steps=_svd_steps,
+    cost=cubic_cost,
+    missing="Matrix A is required for SVD",
+    error="Error calculating SVD"
+)
+
+register(
+    "pseudo_inverse", "Pseudoinverse",
+    inputs=("matrixA",),
+    schema={"tolerance": "number?"},
+    target="utils.advanced_ops:pseudo_inverse",
+    run=lambda operation, data: (operation.func(data["matrixA"], data.get("tolerance")), {}),
+    cost=cubic_cost,
+    missing="Matrix A is required for the pseudoinverse",
+    error="Error calculating pseudoinverse",
+    steps=[
+        {"title": "SVD", "description": "Factor A = U × diag(S) × Vᵀ."},
+        {"title": "Invert Singular Values", "description": "Replace each singular value above the tolerance by its reciprocal; treat the rest as zero."},
+        {"title": "Complete", "description": "A⁺ = V × diag(1/S) × Uᵀ."}
+    ]
+)
+
+
+def _run_least_squares(operation, data):
+    # The solver's info (method, rank, residual) becomes response fields
+    return operation.func(data["matrixA"], data["matrixB"], data.get("tolerance"))
+
+
+def _least_squares_steps(ctx):
+    if ctx.extras["method"] == "qr":
+        method = "A has full column rank: factor A = QR (Householder), then solve R·X = QᵀB by back substitution."
+    else:
+        method = "Take the minimum-norm solution X = V × diag(1/S) × UᵀB from the SVD, which also covers rank-deficient and wide A."
+    return [
+        {"title": "Method", "description": method},
+        {"title": "Rank", "description": f"rank(A) = {ctx.extras['rank']}"},
+        {"title": "Residual", "description": f"‖AX − B‖ = {ctx.extras['residual']:.6g}"}
+    ]
+
+
+register(
+    "least_squares", "Least Squares",
+    inputs=("matrixA", "matrixB"),
+    # B may also be a bare vector
+    schema={"matrixB": "operand", "tolerance": "number?"},
+    target="utils.advanced_ops:least_squares",
+    run=_run_least_squares,
+    steps=_least_squares_steps,
+    cost=cubic_cost,
+    missing="Matrix A and right-hand side B are required for least squares",
+    error="Error solving least squares"
+)
+
+
+def _run_eigen(operation, data):
+    A = data["matrixA"]
+    if len(A) != len(A[0]):
+        raise OperationError("Eigenvalues require a square matrix")
+
+    vectors = bool(data.get("vectors"))
+    if data.get("k") is not None:
+        from utils.advanced_ops import top_eigen
+        values, Z, method = top_eigen(A, data["k"], vectors)
+    else:
+        values, Z, method = operation.func(A, vectors)
+
+    complex_values = any(isinstance(v, complex) for v in values)
+    extras = {"method": method, "complex": complex_values}
+    if Z is not None:
+        if any(isinstance(v, complex) for row in Z for v in row):
+            extras["eigenvectors"] = {
+                "real": [[complex(v).real for v in row] for row in Z],
+                "imag": [[complex(v).imag for v in row] for row in Z]
+            }
+        else:
+            extras["eigenvectors"] = Z
+    return values, extras
+
+
+def _format_eigen(values):
+    # One row per eigenvalue: [λ], or [re, im] once any of them is complex
+    if any(isinstance(v, complex) for v in values):
+        return [[complex(v).real, complex(v).imag] for v in values]
+    return [[float(v)] for v in values]
+
+
+def _eigen_cost(data):
+    n = len(data["matrixA"])
+    if data.get("k") is not None:
+        # One O(n^2) product per Krylov step
+        return n * n * max(2 * data["k"] + 1, 20)
+    return cubic_cost(data)
+
+
+_EIGEN_METHODS = {
+    "closed_form": "Solve the characteristic equation det(A − λI) = λ² − tr(A)·λ + det(A) = 0.",
+    "symmetric_qr": "A is symmetric: Householder reflections reduce it to tridiagonal form, then implicit Wilkinson-shifted QR sweeps converge to its (real) eigenvalues.",
+    "hessenberg_qr": "Householder reflections reduce A to upper Hessenberg form, then Francis double-shift QR sweeps converge to its real Schur form; 1×1 and 2×2 diagonal blocks give the eigenvalues.",
+    "lanczos": "A is symmetric: Lanczos iteration builds an orthonormal Krylov basis using only products A·v; the tridiagonal projection's largest eigenvalues (Ritz values) converge to A's.",
+    "arnoldi": "Arnoldi iteration builds an orthonormal Krylov basis using only products A·v; the Hessenberg projection's largest eigenvalues (Ritz values) converge to A's.",
+    "lapack_eigh": "A is symmetric: LAPACK's symmetric eigensolver (tridiagonal reduction, then QR / divide and conquer) computes the full spectrum; the eigenvalues are real.",
+    "lapack_eig": "LAPACK's general eigensolver (Hessenberg reduction, then shifted QR) computes the full spectrum; complex eigenvalues come as conjugate pairs.",
+}
+
+
+def _eigen_steps(ctx):
+    values = ", ".join(f"λ{i + 1} = {v:.6g}" for i, v in enumerate(ctx.value))
+    steps = [
+        {"title": "Method", "description": _EIGEN_METHODS[ctx.extras["method"]]},
+        {"title": "Eigenvalues", "description": values}
+    ]
+    if "eigenvectors" in ctx.extras:
+        steps.append({"title": "Eigenvectors", "description": "Column i of eigenvectors satisfies A·v = λᵢ·v, normalized to unit length."})
+    return steps
+
+
+register(
+    "eigen", "Eigenvalues",
+    inputs=("matrixA",),
+    schema={"vectors": "boolean?", "k": "positive_int?"},
+    target="utils.advanced_ops:eigen",
+    run=_run_eigen,
+    format=_format_eigen,
+    cost=_eigen_cost,
+    missing="Matrix A is required for eigenvalues",
+    error="Error calculating eigenvalues",
+    steps=_eigen_steps
+)
+
+
+# =================================================
+# DATA SCIENCE
+# =================================================
+
+def _divisor(ctx):
+    ddof = ctx.data.get("ddof") or 0
+    return f"n - {ddof}" if ddof else "n"
+
+
+register(
+    "covariance", "Covariance",
+    inputs=("matrixA", "matrixB"),
+    # ddof 0 (default): population, 1: sample
+    schema={"ddof": "count?"},
+    target="utils.stats_ops:covariance",
+    run=lambda operation, data: (operation.func(data["matrixA"], data["matrixB"], data.get("ddof") or 0), {}),
+    format=float,
+    cost=elementwise_cost,
+    missing="Both matrices are required for covariance",
+    steps=lambda ctx: [
+        {"title": "Single Pass", "description": "Accumulate the count, both means and the co-moment Σ(x - μₓ)(y - μᵧ) in one pass over the pairs."},
+        {"title": "Calculate", "description": f"Cov(X,Y) = Σ[(x - μₓ)(y - μᵧ)] / ({_divisor(ctx)})"},
+        {"title": "Result", "description": f"Covariance = {ctx.value:.6f}"}
+    ]
+)
+
+register(
+    "correlation", "Correlation",
+    inputs=("matrixA", "matrixB"),
+    target="utils.stats_ops:correlation",
+    format=float,
+    cost=elementwise_cost,
+    missing="Both matrices are required for correlation",
+    steps=lambda ctx: [
+        {"title": "Single Pass", "description": "Accumulate the co-moment and both sums of squared deviations in one pass over the pairs."},
+        {"title": "Normalize", "description": "r = Σ(x - μₓ)(y - μᵧ) / √(Σ(x - μₓ)² · Σ(y - μᵧ)²)"},
+        {"title": "Result", "description": f"Correlation = {ctx.value:.6f}"}
+    ]
+)
+
+register(
+    "covariance_matrix", "Covariance Matrix",
+    inputs=("matrixA",),
+    schema={"ddof": "count?"},
+    target="utils.stats_ops:covariance_matrix",
+    run=lambda operation, data: (operation.func(data["matrixA"], data.get("ddof") or 0), {}),
+    cost=gram_cost,
+    missing="A data matrix (rows are observations) is required for the covariance matrix",
+    error="Error calculating covariance matrix",
+    steps=lambda ctx: [
+        {"title": "Single Pass", "description": f"Read the {len(ctx.data['matrixA'])} rows once, in blocks; each block's means and co-moments are merged into running totals (Welford / Chan et al.)."},
+        {"title": "Calculate", "description": f"Σᵢⱼ = Σ[(xᵢ - μᵢ)(xⱼ - μⱼ)] / ({_divisor(ctx)}) for every column pair"},
+        {"title": "Result", "description": f"{len(ctx.result)}×{len(ctx.result)} covariance matrix"}
+    ]
+)
+
+register(
+    "correlation_matrix", "Correlation Matrix",
+    inputs=("matrixA",),
+    target="utils.stats_ops:correlation_matrix",
+    cost=gram_cost,
+    missing="A data matrix (rows are observations) is required for the correlation matrix",
+    error="Error calculating correlation matrix",
+    steps=lambda ctx: [
+        {"title": "Single Pass", "description": f"Read the {len(ctx.data['matrixA'])} rows once, in blocks; each block's means and co-moments are merged into running totals (Welford / Chan et al.)."},
+        {"title": "Normalize", "description": "Rᵢⱼ = Cᵢⱼ / √(Cᵢᵢ · Cⱼⱼ), so the diagonal is 1"},
+        {"title": "Result", "description": f"{len(ctx.result)}×{len(ctx.result)} correlation matrix"}
+    ]
+)
+
+
+# =================================================
+# UTILITIES
+# =================================================
+
+register(
+    "is_square", "Check Square Matrix",
+    inputs=("matrixA",),
+    target="utils.utilities_ops:is_square",
+    format=_yes_no,
+    missing="Matrix A is required",
+    steps=lambda ctx: [
+        {"title": "Check", "description": "rows == columns?"},
+        {"title": "Result", "description": f"{'Square' if ctx.value else 'Not square'}"}
+    ]
+)
+
+register(
+    "dimensions", "Matrix Dimensions",
+    inputs=("matrixA",),
+    target="utils.utilities_ops:dimensions",
+    format=lambda shape: [f"{shape[0]} × {shape[1]}"],
+    missing="Matrix A is required",
+    steps=lambda ctx: [
+        {"title": "Count", "description": f"{ctx.value[0]} rows, {ctx.value[1]} columns"}
+    ]
+)
+
+register(
+    "is_identity", "Check Identity Matrix",
+    inputs=("matrixA",),
+    target="utils.utilities_ops:is_identity",
+    format=_yes_no,
+    cost=elementwise_cost,
+    missing="Matrix A is required",
+    steps=lambda ctx: [
+        {"title": "Check", "description": "Diagonal = 1, others = 0?"},
+        {"title": "Result", "description": f"{'Identity' if ctx.value else 'Not identity'}"}
+    ]
+)
+
+register(
+    "is_zero", "Check Zero Matrix",
+    inputs=("matrixA",),
+    target="utils.utilities_ops:is_zero",
+    run=_run_sparse,
+    sparse=True,
+    format=_yes_no,
+    cost=elementwise_cost,
+    missing="Matrix A is required",
+    steps=lambda ctx: [
+        {"title": "Check", "description": "All elements = 0?"},
+        {"title": "Result", "description": f"{'Zero matrix' if ctx.value else 'Not zero matrix'}"}
+    ]
+)
+
+register(
+    "is_symmetric", "Check Symmetric Matrix",
+    inputs=("matrixA",),
+    target="utils.utilities_ops:is_symmetric",
+    format=_yes_no,
+    cost=elementwise_cost,
+    missing="Matrix A is required",
+    steps=lambda ctx: [
+        {"title": "Check", "description": "A = Aᵀ?"},
+        {"title": "Result", "description": f"{'Symmetric' if ctx.value else 'Not symmetric'}"}
+    ]
+)
+
+
+def _run_profile(operation, data):
+    profile = operation.func(data["matrixA"])
+    return profile, {"profile": profile.as_dict()}
+
+
+register(
+    "profile", "Matrix Structure",
+    inputs=("matrixA",),
+    target="utils.utilities_ops:profile_matrix",
+    run=_run_profile,
+    format=lambda profile: [[profile.kind()]],
+    cost=elementwise_cost,
+    missing="Matrix A is required",
+    steps=lambda ctx: [
+        {"title": "Single Pass", "description": "Scan each row once for its nonzero count and its first and last nonzero; compare the part right of the diagonal with the matching column."},
+        {"title": "Bandwidth", "description": f"Nonzeros reach {ctx.value.lower_bandwidth} below and {ctx.value.upper_bandwidth} above the diagonal; density {ctx.value.density:.3g}."},
+        {"title": "Result", "description": f"Structure: {ctx.value.kind().replace('_', ' ')}{', symmetric' if ctx.value.symmetric else ''}"}
+    ]
+)
@@ -0,0 +1,286 @@
+# ============================================
+# PROFILING
+# ============================================
+#
+# Two ways to see where request time goes inside the operation code:
+#
+# - On demand: one request runs under cProfile and gets a report of its
+#   top functions by cumulative time. Reports are kept in a small
+#   in-memory store so binary responses (and later looks) can fetch them
+#   by id. cProfile slows the profiled request down several times, so it
+#   is opt-in per request and off unless the server enables it.
+#
+# - Sampling: a daemon thread wakes SAMPLING_INTERVAL times a second,
+#   reads every other thread's current stack (sys._current_frames) and
+#   counts the functions on it. Nothing is hooked into the code being run,
+#   so the overhead stays a few percent at 100 Hz; the aggregate is dumped
+#   to a JSON file every dump interval.
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+PROFILE_TOP = 25
+PROFILE_KEEP = 32
+
+SAMPLING_INTERVAL = 0.01
+SAMPLING_DUMP_SECONDS = 60
+SAMPLING_TOP = 50
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+# Stacks the sampler keeps: those running code from the utils package
+SAMPLING_SCOPE = os.path.join(_ROOT, "utils") + os.sep
+
+
+def _function_name(filename, line, name):
+    # Paths relative to the project where possible, builtins as-is
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    return f"{filename}:{line}({name})" if line else name
+
+
+# --------------------------------------------
+# ON-DEMAND (cProfile)
+# --------------------------------------------
+
+# cProfile hooks the interpreter's global profiling slot, so only one
+# request is profiled at a time; others run normally
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def profile_call(func, top=PROFILE_TOP):
+    """
+    Runs func() under cProfile, returns (value, report)
+    report: seconds of wall time plus the top functions by cumulative time
+    Raises ProfilerBusy when another call is being profiled
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("Another request is being profiled")
+
+    try:
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            value = func()
+        finally:
+            profiler.disable()
+        seconds = time.perf_counter() - started
+    finally:
+        _profile_lock.release()
+
+    return value, stats_report(pstats.Stats(profiler), seconds, top)
+
+
+def stats_report(stats, seconds, top=PROFILE_TOP):
+    """
+    The top functions of a pstats.Stats, by cumulative time
+    """
+    rows = []
+    for (filename, line, name), (primitive, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": _function_name(filename, line, name),
+            "calls": calls,
+            "primitive_calls": primitive,
+            "own_seconds": own,
+            "cumulative_seconds": cumulative,
+        })
+    rows.sort(key=lambda row: (-row["cumulative_seconds"], -row["own_seconds"]))
+
+    return {
+        "seconds": seconds,
+        "function_calls": stats.total_calls,
+        "functions": rows[:top],
+    }
+
+
+class ProfileStore:
+    """
+    The last `keep` on-demand reports, by id
+    """
+
+    def __init__(self, keep=PROFILE_KEEP):
+        self.keep = keep
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, report, **details):
+        profile_id = uuid.uuid4().hex
+        entry = {"id": profile_id, "created": time.time(), **details, **report}
+        with self._lock:
+            self._reports[profile_id] = entry
+            while len(self._reports) > self.keep:
+                self._reports.popitem(last=False)
+        return entry
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._reports.get(profile_id)
+
+    def summary(self):
+        # Newest first, without the function tables
+        with self._lock:
+            entries = list(self._reports.values())
+        return [
+            {key: value for key, value in entry.items() if key != "functions"}
+            for entry in reversed(entries)
+        ]
+
+
+# --------------------------------------------
+# SAMPLING
+# --------------------------------------------
+
+class SamplingProfiler:
+    """
+    Aggregates the stacks of all other threads every `interval` seconds
+    Only stacks with a frame under `scope` count (None keeps all), so idle
+    server threads waiting on sockets do not drown the report
+    own:        samples where the function was running (top of the stack)
+    cumulative: samples where it was anywhere on the stack (counted once
+                per sample, so recursion does not inflate it)
+    With a path, the report is written there every dump_seconds
+    """
+
+    def __init__(self, interval=SAMPLING_INTERVAL, path=None, dump_seconds=SAMPLING_DUMP_SECONDS,
+                 top=SAMPLING_TOP, scope=SAMPLING_SCOPE):
+        self.interval = interval
+        self.path = path
+        self.dump_seconds = dump_seconds
+        self.top = top
+        self.scope = scope
+        self._own = {}
+        self._cumulative = {}
+        self._samples = 0
+        self._ticks = 0
+        self._started = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.path:
+            self.dump()
+
+    def reset(self):
+        with self._lock:
+            self._own.clear()
+            self._cumulative.clear()
+            self._samples = 0
+            self._ticks = 0
+            self._started = time.time()
+
+    def _loop(self):
+        me = threading.get_ident()
+        next_dump = time.monotonic() + self.dump_seconds
+        while not self._stop.wait(self.interval):
+            self.sample(exclude=me)
+            if self.path and time.monotonic() >= next_dump:
+                next_dump = time.monotonic() + self.dump_seconds
+                try:
+                    self.dump()
+                except OSError:
+                    pass
+
+    def sample(self, exclude=None):
+        """
+        Takes one sample of every thread but `exclude`
+        """
+        frames = sys._current_frames()
+        # Code objects identify functions; names are built at report time
+        stacks = []
+        for ident, frame in frames.items():
+            if ident == exclude:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if self.scope is None or any(code.co_filename.startswith(self.scope) for code in stack):
+                stacks.append(stack)
+        del frames
+
+        with self._lock:
+            self._ticks += 1
+            for stack in stacks:
+                self._samples += 1
+                leaf = stack[0]
+                self._own[leaf] = self._own.get(leaf, 0) + 1
+                for code in set(stack):
+                    self._cumulative[code] = self._cumulative.get(code, 0) + 1
+
+    def report(self, top=None):
+        """
+        The hottest functions: most often running first (the hot loops),
+        then most often on the stack; shares are of all samples
+        """
+        top = top or self.top
+        with self._lock:
+            samples, ticks = self._samples, self._ticks
+            own = dict(self._own)
+            cumulative = dict(self._cumulative)
+
+        hottest = sorted(cumulative.items(), key=lambda item: (-own.get(item[0], 0), -item[1]))[:top]
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "since": self._started,
+            "ticks": ticks,
+            "samples": samples,
+            "functions": [
+                {
+                    "function": _function_name(code.co_filename, code.co_firstlineno, code.co_name),
+                    "own_samples": own.get(code, 0),
+                    "cumulative_samples": count,
+                    "own_share": own.get(code, 0) / samples if samples else 0.0,
+                    "cumulative_share": count / samples if samples else 0.0,
+                }
+                for code, count in hottest
+            ],
+        }
+
+    def dump(self, path=None):
+        # Written to a temporary file and renamed, so readers never see
+        # half a report
+        path = path or self.path
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(dict(self.report(), dumped=time.time()), f, indent=1)
+        os.replace(temporary, path)
+        return path
+
+
+sampling_profiler = SamplingProfiler(
+    interval=1 / float(os.environ.get("MATRIXLAB_SAMPLING_HZ", 100)),
+    path=os.environ.get("MATRIXLAB_SAMPLING_PATH") or None,
+    dump_seconds=float(os.environ.get("MATRIXLAB_SAMPLING_DUMP_SECONDS", SAMPLING_DUMP_SECONDS)),
+)
@@ -0,0 +1,424 @@
+# ============================================
+# OPERATION REGISTRY
+# ============================================
+#
+# Every /calculate operation is an Operation entry: its name, label,
+# required inputs, field schema, the "module:function" it runs, a step
+# template and a cost model. Dispatch is one dict lookup, and the module
+# behind an operation is imported the first time that operation runs, so a
+# worker that only serves "add" never imports the decomposition code.
+#
+# Definitions live in utils/operations.py. More modules can register
+# operations without touching app.py by listing them in
+# MATRIXLAB_OPERATION_MODULES (comma separated).
+
+import importlib
+import os
+import time
+from contextlib import nullcontext
+
+from utils.backend import use_backend
+from utils.cache import factorization_cache
+
+
+_REGISTRY = {}
+_import_times = {}
+_definition_modules = ["utils.operations"]
+_definitions_loaded = False
+
+
+class Operation:
+    """
+    One registered operation
+    inputs:  payload keys that must be present (matrixA, matrixB, ...)
+    schema:  {field: kind} checks for other fields ("number", "positive_int", ...)
+    target:  "module:function" imported lazily on first use
+    run:     optional custom runner run(op, data) -> (result, extras)
+    format:  optional result formatter format(value) -> JSON result
+    steps:   list of {"title", "description"} or steps(ctx) -> list
+    cost:    optional cost(data) -> estimated scalar operations
+    sparse:  True when the runner accepts sparse operands; others get
+             them converted to dense first
+    missing: message for absent or invalid inputs
+    error:   prefix for exceptions raised while running
+    """
+
+    __slots__ = (
+        "name", "label", "inputs", "schema", "target", "run", "format",
+        "steps", "cost", "sparse", "missing", "error", "_func"
+    )
+
+    def __init__(self, name, label, inputs=(), schema=None, target=None, run=None,
+                 format=None, steps=None, cost=None, sparse=False, missing=None, error=None):
+        self.name = name
+        self.label = label
+        self.inputs = tuple(inputs)
+        self.schema = schema or {}
+        self.target = target
+        self.run = run
+        self.format = format
+        self.steps = steps
+        self.cost = cost
+        self.sparse = sparse
+        self.missing = missing or f"Missing input for {label}"
+        self.error = error or f"Error calculating {label.lower()}"
+        self._func = None
+
+    @property
+    def arity(self):
+        return len(self.inputs)
+
+    @property
+    def func(self):
+        if self._func is None:
+            self._func = resolve(self.target)
+        return self._func
+
+    @property
+    def loaded(self):
+        return self._func is not None or self.target is None
+
+    def estimate_cost(self, data):
+        if self.cost is None:
+            return 0
+        try:
+            return self.cost(data)
+        except Exception:
+            return 0
+
+
+class OperationError(ValueError):
+    """
+    Raised by a runner for messages returned without the error prefix
+    """
+
+
+class Context:
+    """
+    What a step template sees: the payload, the raw value, the formatted
+    result and any extra response fields
+    """
+
+    __slots__ = ("data", "value", "result", "extras")
+
+    def __init__(self, data, value, result, extras):
+        self.data = data
+        self.value = value
+        self.result = result
+        self.extras = extras
+
+
+def register(name, label, **options):
+    operation = Operation(name, label, **options)
+    _REGISTRY[name] = operation
+    return operation
+
+
+def resolve(target):
+    """
+    Imports "package.module:function" and returns the function,
+    recording how long the module import took the first time
+    """
+    module_name, _, attribute = target.partition(":")
+    if module_name not in _import_times:
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _import_times[module_name] = (time.perf_counter() - started) * 1000
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, attribute)
+
+
+def load_definitions(extra_modules=()):
+    global _definitions_loaded
+    if _definitions_loaded:
+        return
+
+    modules = list(_definition_modules)
+    modules += [m.strip() for m in os.environ.get("MATRIXLAB_OPERATION_MODULES", "").split(",") if m.strip()]
+    modules += list(extra_modules)
+
+    for module_name in modules:
+        started = time.perf_counter()
+        importlib.import_module(module_name)
+        _import_times[module_name] = (time.perf_counter() - started) * 1000
+
+    _definitions_loaded = True
+
+
+def get_operation(name):
+    # Payload values of any JSON type end up here; only strings name one
+    if not isinstance(name, str):
+        return None
+    load_definitions()
+    return _REGISTRY.get(name)
+
+
+def operations():
+    load_definitions()
+    return list(_REGISTRY.values())
+
+
+def preload():
+    """
+    Imports every operation's module now instead of on first use, for
+    pre-forking servers that want the modules shared between workers
+    """
+    for operation in operations():
+        if operation.target is not None:
+            operation.func
+
+
+def import_report():
+    """
+    Milliseconds spent importing each module, in first-use order
+    """
+    return {name: round(ms, 3) for name, ms in _import_times.items()}
+
+
+# --------------------------------------------
+# INPUT VALIDATION
+# --------------------------------------------
+
+def _is_matrix(value):
+    if hasattr(value, "shape") and hasattr(value, "row"):
+        return True
+    if not isinstance(value, list) or not value or not isinstance(value[0], list):
+        return False
+    cols = len(value[0])
+    return cols > 0 and all(isinstance(row, list) and len(row) == cols for row in value)
+
+
+def _check_field(kind, value):
+    if value is None:
+        return False
+    if kind == "matrix":
+        return _is_matrix(value)
+    if kind == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind == "positive_int":
+        return isinstance(value, int) and not isinstance(value, bool) and value > 0
+    if kind == "count":
+        return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+    if kind == "string":
+        return isinstance(value, str) and value != ""
+    if kind == "boolean":
+        return isinstance(value, bool)
+    if kind == "list":
+        return isinstance(value, list) and len(value) > 0
+    if kind == "operand":
+        # A matrix, or a bare vector
+        return _is_matrix(value) or (isinstance(value, list) and len(value) > 0)
+    if kind == "dict":
+        return isinstance(value, dict)
+    return True
+
+
+def validate(operation, data):
+    """
+    Returns an error message, or None when the payload is usable
+    """
+    for key in operation.inputs:
+        if data.get(key) is None:
+            return operation.missing
+
+    # Matrix inputs must be rectangular unless the schema says otherwise
+    for key in operation.inputs:
+        if key.startswith("matrix") and key not in operation.schema and not _is_matrix(data[key]):
+            return f"{key} must be a non-empty rectangular matrix"
+
+    for key, kind in operation.schema.items():
+        if kind.endswith("?"):
+            kind = kind[:-1]
+            if data.get(key) is None:
+                continue
+        if not _check_field(kind, data.get(key)):
+            return operation.missing
+
+    return None
+
+
+# --------------------------------------------
+# DISPATCH
+# --------------------------------------------
+
+def _densify(data, keys):
+    # Sparse operands (anything with to_matrix) for dense-only operations
+    if not any(hasattr(data.get(key), "to_matrix") for key in keys):
+        return data
+    data = dict(data)
+    for key in keys:
+        if hasattr(data[key], "to_matrix"):
+            data[key] = data[key].to_matrix()
+    return data
+
+
+def run_operation(data):
+    """
+    Executes one /calculate payload and returns the response dict
+    """
+    name = data.get("operation")
+    operation = get_operation(name)
+
+    if operation is None:
+        return {
+            "status": "error",
+            "message": f"Operation '{name}' not implemented or not recognized"
+        }
+
+    problem = validate(operation, data)
+    if problem is not None:
+        return {
+            "status": "error",
+            "message": problem
+        }
+
+    try:
+        if not operation.sparse:
+            data = _densify(data, operation.inputs)
+
+        if operation.run is not None:
+            value, extras = operation.run(operation, data)
+        else:
+            value = operation.func(*[data[key] for key in operation.inputs])
+            extras = {}
+        result = operation.format(value) if operation.format else value
+    except OperationError as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"{operation.error}: {str(e)}"
+        }
+
+    response = {
+        "status": "success",
+        "operation": operation.label,
+        "result": result
+    }
+    response.update(extras)
+
+    if data.get("stepByStep", False) and operation.steps is not None:
+        if callable(operation.steps):
+            response["steps"] = operation.steps(Context(data, value, result, extras))
+        else:
+            response["steps"] = list(operation.steps)
+
+    return response
+
+
+def prepare(data):
+    """
+    Replaces stored-matrix ids with the mapped matrices and COO / CSR
+    objects with sparse matrices
+    Raises ValueError for an unknown id or a malformed sparse matrix
+    """
+    # Imported here: most payloads never touch the store or sparse input
+    from utils.store import matrix_store, resolve_references
+
+    data = resolve_references(data, matrix_store)
+    if any(isinstance(data.get(key), dict) for key in ("matrixA", "matrixB")):
+        from utils.sparse_ops import decode_operands
+        data = decode_operands(data)
+    return data
+
+
+def execute(data, backend=None):
+    """
+    run_operation under the given compute backend
+    String operands are ids of stored matrices, object operands are sparse
+    matrices in COO or CSR form; "cache": false skips the
+    factorization cache; "saveResult": true stores a matrix result and
+    returns its id instead
+    """
+    from utils.store import matrix_store, save_result
+
+    try:
+        data = prepare(data)
+    except ValueError as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+    bypass = factorization_cache.disabled() if data.get("cache") is False else nullcontext()
+
+    with use_backend(backend), bypass:
+        response = run_operation(data)
+
+    if data.get("saveResult"):
+        response = save_result(response, matrix_store)
+    return response
+
+
+# --------------------------------------------
+# COST MODELS
+# --------------------------------------------
+
+def _shape(matrix):
+    if hasattr(matrix, "shape"):
+        return matrix.shape
+    return len(matrix), len(matrix[0])
+
+
+def elementwise_cost(data):
+    A = data["matrixA"]
+    if hasattr(A, "nnz"):
+        return A.nnz
+    rows, cols = _shape(A)
+    return rows * cols
+
+
+def matmul_cost(data):
+    A, B = data["matrixA"], data["matrixB"]
+    if hasattr(A, "nnz") and hasattr(B, "nnz"):
+        # Each stored value of A meets the stored values of one row of B
+        return A.nnz * max(1, B.nnz // max(1, len(B)))
+    if hasattr(A, "nnz"):
+        # Each stored value of A meets one row of B
+        return A.nnz * _shape(B)[1]
+    if hasattr(B, "nnz"):
+        return B.nnz * _shape(A)[0]
+    rows, inner = _shape(A)
+    return rows * inner * _shape(B)[1]
+
+
+def cubic_cost(data):
+    rows, cols = _shape(data["matrixA"])
+    n = max(rows, cols)
+    return n * n * n
+
+
+def gram_cost(data):
+    # Every column pair of an n x p matrix meets once per row
+    rows, cols = _shape(data["matrixA"])
+    return rows * cols * cols
+
+
+def solve_cost(data):
+    n = len(data["matrixA"])
+    B = data["matrixB"]
+    k = _shape(B)[1] if hasattr(B[0], "__len__") else 1
+    return n * n * n + k * n * n
+
+
+def chain_cost(data):
+    from utils.basic_ops import chain_plan
+    return chain_plan(data["matrices"])["cost"]
+
+
+def expression_cost(data):
+    # Pessimistic: every expression is priced as if it held a product
+    matrices = list((data.get("matrices") or {}).values())
+    matrices += [data[key] for key in ("matrixA", "matrixB") if data.get(key) is not None]
+    rows, cols = max((_shape(M) for M in matrices), key=lambda shape: shape[0] * shape[1])
+    return rows * cols * cols
+
+
+def size_cost(data):
+    if data.get("size") is not None:
+        return data["size"] * data["size"]
+    return data["rows"] * data["cols"]
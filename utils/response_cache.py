@@ -0,0 +1,199 @@
+# ============================================
+# RESPONSE CACHE
+# ============================================
+#
+# Whole /calculate responses, encoded and ready to send, keyed by a
+# canonical hash of the request: the payload with every matrix replaced
+# by its content digest, keys sorted, transport-only fields dropped,
+# plus the backend and the negotiated response type. Identical payloads
+# therefore skip decoding-to-result, computing and serializing.
+#
+# Each entry carries an ETag (a digest of its body), so a client sending
+# it back in If-None-Match gets 304 Not Modified without the body.
+# Entries are evicted least recently used beyond max_bytes, and expire
+# after ttl seconds when one is set.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils.cache import matrix_key
+from utils.matrix import Matrix
+
+
+# Fields that change how a response travels, not what it says
+# ("cache": false never gets this far, it bypasses the response cache)
+TRANSPORT_KEYS = ("cache", "stream", "async")
+
+
+# --------------------------------------------
+# CANONICAL REQUEST HASH
+# --------------------------------------------
+
+def _canonical(value):
+    # Matrices (nested numeric lists or Matrix) become their content
+    # digest; everything else keeps its JSON form, dicts sorted on dump
+    if isinstance(value, Matrix):
+        return {"$matrix": matrix_key(value)}
+    if isinstance(value, list):
+        if value and all(isinstance(row, list) and row for row in value):
+            try:
+                return {"$matrix": matrix_key(value)}
+            except (TypeError, ValueError, OverflowError):
+                # Ragged, non-numeric or beyond float range: hashed as JSON
+                pass
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    return value
+
+
+def request_key(data, *extra):
+    """
+    Hex digest of the normalized payload and any extra context (backend,
+    response type); equal payloads hash equal however they were written
+    """
+    payload = {key: value for key, value in data.items() if key not in TRANSPORT_KEYS and value is not None}
+    if not payload.get("stepByStep"):
+        payload.pop("stepByStep", None)
+
+    text = json.dumps([_canonical(payload), extra], sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def body_etag(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+# --------------------------------------------
+# CACHE
+# --------------------------------------------
+
+class CachedResponse:
+    """
+    An encoded response: body bytes, mimetype, headers and ETag
+    """
+
+    __slots__ = ("body", "mimetype", "headers", "etag", "size", "expires")
+
+    def __init__(self, body, mimetype, headers, etag, expires=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = headers
+        self.etag = etag
+        # Body plus a rough allowance for the headers and bookkeeping
+        self.size = len(body) + 256
+        self.expires = expires
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU of encoded responses with optional TTL and counters
+    max_bytes:        total size kept before least recently used go
+    max_entry_bytes:  larger responses are not cached at all
+    ttl:              seconds an entry stays valid, None for no expiry
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=None, enabled=True, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.not_modified = 0
+        self.too_large = 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype, headers, etag=None):
+        """
+        Stores an encoded response; returns the entry, or None when the
+        cache is off or the body is over max_entry_bytes
+        """
+        if not self.enabled:
+            return None
+
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        entry = CachedResponse(body, mimetype, headers, etag or body_etag(body), expires)
+
+        with self._lock:
+            if entry.size > self.max_entry_bytes:
+                self.too_large += 1
+                return None
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "too_large": self.too_large,
+                "not_modified": self.not_modified,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache(
+    max_bytes=int(os.environ.get("MATRIXLAB_RESPONSE_CACHE_BYTES", 64 * 1024 * 1024)),
+    ttl=float(os.environ.get("MATRIXLAB_RESPONSE_CACHE_TTL", 0)) or None,
+    enabled=os.environ.get("MATRIXLAB_RESPONSE_CACHE", "1") != "0",
+)
@@ -1,14 +1,13 @@
-def scalar_multiply(A, scalar):
-    result = []
+from operator import ne
 
-    for row in A:
-        new_row = []
-        for value in row:
-            new_row.append(value * scalar)
-        result.append(new_row)
+from utils.backend import dispatch
 
-    return result
 
+@dispatch
+def scalar_multiply(A, scalar):
+    return [[value * scalar for value in row] for row in A]
+
+@dispatch
 def identity_matrix(n):
     result = []
 
@@ -20,6 +19,7 @@ def identity_matrix(n):
 
     return result
 
+@dispatch
 def zero_matrix(rows, cols):
     result = []
 
@@ -28,13 +28,13 @@ def zero_matrix(rows, cols):
 
     return result
 
+@dispatch
 def matrices_equal(A, B):
     if len(A) != len(B) or len(A[0]) != len(B[0]):
         return False
 
-    for i in range(len(A)):
-        for j in range(len(A[0])):
-            if A[i][j] != B[i][j]:
-                return False
+    for row_A, row_B in zip(A, B):
+        if any(map(ne, row_A, row_B)):
+            return False
 
     return True
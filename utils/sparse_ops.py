@@ -0,0 +1,446 @@
+# ============================================
+# SPARSE MATRICES
+# ============================================
+#
+# Compressed sparse row (CSR) matrices and kernels whose cost scales with
+# the number of nonzeros instead of rows x cols. /calculate takes them in
+# coordinate (COO) form:
+#
+#   {"format": "coo", "shape": [rows, cols], "row": [...], "col": [...], "data": [...]}
+#
+# or CSR form ({"format": "csr", "shape", "indptr", "indices", "data"}).
+# choose_path decides per request whether the sparse or the dense kernel
+# runs, from the operand densities.
+
+from array import array
+from operator import add, sub
+
+from utils.backend import resolve_backend
+from utils.matrix import Matrix
+
+
+# Above these fractions of nonzeros the dense kernels are faster (measured
+# on the pure-Python kernels at 200x200 and 300x300, densifying included)
+SPARSE_MAX_DENSITY = 0.3
+SPARSE_MAX_PRODUCT_DENSITY = 0.4
+
+# Dense x dense products at least this large (rows x inner x cols) are
+# checked for mostly-zero operands
+DENSITY_CHECK_MIN_WORK = 100_000
+
+# A few bytes of COO can declare any shape; converting to dense is refused
+# above this many elements (128 MB of float64), and neither dimension may
+# exceed it, which bounds the CSR row pointer as well
+SPARSE_MAX_DENSE_ELEMENTS = 16 * 1024 * 1024
+
+
+class SparseMatrix:
+    """
+    CSR matrix: row i holds indices[indptr[i]:indptr[i+1]] (sorted column
+    numbers) and the matching data; explicit zeros are never stored
+    """
+
+    __slots__ = ("rows", "cols", "indptr", "indices", "data")
+
+    def __init__(self, rows, cols, indptr, indices, data):
+        self.rows = rows
+        self.cols = cols
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    # ---------- CONSTRUCTORS ----------
+
+    @classmethod
+    def from_coo(cls, rows, cols, row, col, data):
+        if not len(row) == len(col) == len(data):
+            raise ValueError("COO 'row', 'col' and 'data' must have the same length")
+
+        # Bucket entries by row, summing duplicates
+        buckets = [None] * rows
+        for i, j, value in zip(row, col, data):
+            if not (0 <= i < rows and 0 <= j < cols):
+                raise ValueError(f"COO entry ({i}, {j}) is outside the {rows}x{cols} shape")
+            bucket = buckets[i]
+            if bucket is None:
+                buckets[i] = {j: value}
+            else:
+                bucket[j] = bucket.get(j, 0) + value
+
+        return cls._from_buckets(rows, cols, buckets)
+
+    @classmethod
+    def from_csr(cls, rows, cols, indptr, indices, data):
+        if len(indptr) != rows + 1 or indptr[0] != 0 or indptr[-1] != len(indices) or len(indices) != len(data):
+            raise ValueError("CSR 'indptr' must have rows + 1 entries from 0 to len(indices), and len(indices) == len(data)")
+
+        buckets = [None] * rows
+        for i in range(rows):
+            start, stop = indptr[i], indptr[i + 1]
+            if stop < start:
+                raise ValueError("CSR 'indptr' must be non-decreasing")
+            if any(not 0 <= j < cols for j in indices[start:stop]):
+                raise ValueError(f"CSR row {i} has a column index outside 0..{cols - 1}")
+            if stop > start:
+                buckets[i] = dict(zip(indices[start:stop], data[start:stop]))
+
+        return cls._from_buckets(rows, cols, buckets)
+
+    @classmethod
+    def from_dense(cls, A):
+        indptr = array("q", [0])
+        indices = array("q")
+        data = array("d")
+        for row in A:
+            for j, value in enumerate(row):
+                if value:
+                    indices.append(j)
+                    data.append(value)
+            indptr.append(len(indices))
+        return cls(len(A), len(A[0]) if len(A) else 0, indptr, indices, data)
+
+    @classmethod
+    def _from_buckets(cls, rows, cols, buckets):
+        # buckets[i] is None or {column: value}
+        indptr = array("q", [0])
+        indices = array("q")
+        data = array("d")
+        for bucket in buckets:
+            if bucket:
+                for j in sorted(bucket):
+                    value = bucket[j]
+                    if value:
+                        indices.append(j)
+                        data.append(value)
+            indptr.append(len(indices))
+        return cls(rows, cols, indptr, indices, data)
+
+    # ---------- SHAPE ----------
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    @property
+    def density(self):
+        size = self.rows * self.cols
+        return self.nnz / size if size else 0.0
+
+    def __len__(self):
+        return self.rows
+
+    # ---------- ACCESS / CONVERSION ----------
+
+    def row_items(self, i):
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:stop], self.data[start:stop]
+
+    def row(self, i):
+        dense = [0.0] * self.cols
+        for j, value in zip(*self.row_items(i)):
+            dense[j] = value
+        return dense
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def _check_dense_size(self):
+        if self.rows * self.cols > SPARSE_MAX_DENSE_ELEMENTS:
+            raise ValueError(
+                f"A {self.rows}x{self.cols} sparse matrix is too large to convert to dense "
+                f"(at most {SPARSE_MAX_DENSE_ELEMENTS} elements)"
+            )
+
+    def tolist(self):
+        self._check_dense_size()
+        return [self.row(i) for i in range(self.rows)]
+
+    def to_matrix(self):
+        self._check_dense_size()
+        M = Matrix.zeros(self.rows, self.cols)
+        view = M._view
+        indices, data = self.indices, self.data
+        for i in range(self.rows):
+            base = i * self.cols
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                view[base + indices[k]] = data[k]
+        return M
+
+    def to_coo(self):
+        row = []
+        for i in range(self.rows):
+            row.extend([i] * (self.indptr[i + 1] - self.indptr[i]))
+        return {
+            "format": "coo",
+            "shape": [self.rows, self.cols],
+            "row": row,
+            "col": self.indices.tolist(),
+            "data": self.data.tolist(),
+        }
+
+    @property
+    def T(self):
+        return transpose_sparse(self)
+
+
+def is_sparse(value):
+    return isinstance(value, SparseMatrix)
+
+
+def densify(value):
+    return value.to_matrix() if isinstance(value, SparseMatrix) else value
+
+
+def from_json(value):
+    """
+    Builds a SparseMatrix from its COO or CSR JSON form
+    """
+    try:
+        shape = [int(n) for n in value["shape"]]
+        if len(shape) != 2 or min(shape) <= 0:
+            raise ValueError("Sparse matrix 'shape' must be [rows, cols]")
+        if max(shape) > SPARSE_MAX_DENSE_ELEMENTS:
+            raise ValueError(f"Sparse matrix dimensions may be at most {SPARSE_MAX_DENSE_ELEMENTS}")
+        rows, cols = shape
+        kind = value.get("format", "coo")
+        if not isinstance(kind, str):
+            raise ValueError("Sparse matrix 'format' must be 'coo' or 'csr'")
+        kind = kind.lower()
+        if kind == "coo":
+            return SparseMatrix.from_coo(rows, cols, value["row"], value["col"], value["data"])
+        if kind == "csr":
+            return SparseMatrix.from_csr(rows, cols, value["indptr"], value["indices"], value["data"])
+    except KeyError as e:
+        raise ValueError(f"Sparse matrix is missing '{e.args[0]}'")
+    except TypeError:
+        raise ValueError("Sparse matrix fields must be lists of numbers")
+    raise ValueError(f"Unknown sparse format '{kind}', expected 'coo' or 'csr'")
+
+
+def decode_operands(data, keys=("matrixA", "matrixB")):
+    """
+    Replaces COO / CSR objects under keys with SparseMatrix operands
+    Raises ValueError for a malformed one
+    """
+    data = dict(data)
+    for key in keys:
+        if isinstance(data.get(key), dict):
+            try:
+                data[key] = from_json(data[key])
+            except ValueError as e:
+                raise ValueError(f"{key}: {e}")
+    return data
+
+
+def density(A):
+    """
+    Fraction of nonzero entries
+    """
+    if isinstance(A, SparseMatrix):
+        return A.density
+    rows, cols = len(A), len(A[0])
+    if isinstance(A, Matrix):
+        zeros = sum(row.tolist().count(0) for row in A)
+    else:
+        zeros = sum(row.count(0) for row in A)
+    return 1 - zeros / (rows * cols)
+
+
+# --------------------------------------------
+# KERNELS
+# --------------------------------------------
+
+def _shape(A):
+    return A.shape if isinstance(A, (SparseMatrix, Matrix)) else (len(A), len(A[0]))
+
+
+def _combine(A, B, op):
+    if _shape(A) != _shape(B):
+        raise ValueError("Matrices must have the same dimensions")
+
+    if is_sparse(A) and is_sparse(B):
+        buckets = []
+        for i in range(A.rows):
+            bucket = dict(zip(*A.row_items(i)))
+            for j, value in zip(*B.row_items(i)):
+                bucket[j] = op(bucket.get(j, 0.0), value)
+            buckets.append(bucket)
+        return SparseMatrix._from_buckets(A.rows, A.cols, buckets)
+
+    # One dense operand: the result is dense; copy it and scatter the nonzeros
+    if is_sparse(A):
+        result = [[op(0.0, value) for value in row] for row in B]
+        for i in range(A.rows):
+            out = result[i]
+            for j, value in zip(*A.row_items(i)):
+                # a op b with a the sparse entry: undo op(0, b) first
+                out[j] = op(value, B[i][j])
+        return result
+
+    result = [list(row) for row in A]
+    for i in range(B.rows):
+        out = result[i]
+        for j, value in zip(*B.row_items(i)):
+            out[j] = op(out[j], value)
+    return result
+
+
+def add_sparse(A, B):
+    return _combine(A, B, add)
+
+
+def subtract_sparse(A, B):
+    return _combine(A, B, sub)
+
+
+def scalar_multiply_sparse(A, scalar):
+    if not scalar:
+        return SparseMatrix(A.rows, A.cols, array("q", [0] * (A.rows + 1)), array("q"), array("d"))
+    return SparseMatrix(
+        A.rows, A.cols, array("q", A.indptr), array("q", A.indices),
+        array("d", [value * scalar for value in A.data])
+    )
+
+
+def transpose_sparse(A):
+    """
+    CSR of A^T by counting sort over the column indices, O(nnz + cols)
+    """
+    counts = [0] * (A.cols + 1)
+    for j in A.indices:
+        counts[j + 1] += 1
+    for j in range(A.cols):
+        counts[j + 1] += counts[j]
+
+    indptr = array("q", counts)
+    indices = array("q", bytes(8 * A.nnz))
+    data = array("d", bytes(8 * A.nnz))
+    position = counts[:-1]
+
+    for i in range(A.rows):
+        for k in range(A.indptr[i], A.indptr[i + 1]):
+            j = A.indices[k]
+            slot = position[j]
+            indices[slot] = i
+            data[slot] = A.data[k]
+            position[j] = slot + 1
+
+    return SparseMatrix(A.cols, A.rows, indptr, indices, data)
+
+
+def multiply_sparse(A, B):
+    """
+    Sparse x sparse (Gustavson, sparse result), sparse x dense or dense x
+    sparse (dense result); cost follows the nonzeros of the sparse side
+    """
+    rows_A, cols_A = _shape(A)
+    rows_B, cols_B = _shape(B)
+    if cols_A != rows_B:
+        raise ValueError("Number of columns in A must equal number of rows in B")
+
+    if is_sparse(A) and is_sparse(B):
+        buckets = []
+        for i in range(rows_A):
+            bucket = {}
+            for k, a in zip(*A.row_items(i)):
+                for j, b in zip(*B.row_items(k)):
+                    bucket[j] = bucket.get(j, 0.0) + a * b
+            buckets.append(bucket)
+        return SparseMatrix._from_buckets(rows_A, cols_B, buckets)
+
+    if is_sparse(A):
+        # Row i of the result is the nonzero-weighted sum of rows of B
+        result = []
+        for i in range(rows_A):
+            out = [0.0] * cols_B
+            for k, a in zip(*A.row_items(i)):
+                out = [o + a * b for o, b in zip(out, B[k])]
+            result.append(out)
+        return result
+
+    result = []
+    for row in A:
+        out = [0.0] * cols_B
+        for k, a in enumerate(row):
+            if a:
+                for j, b in zip(*B.row_items(k)):
+                    out[j] += a * b
+        result.append(out)
+    return result
+
+
+def is_zero_sparse(A):
+    return not any(A.data)
+
+
+def matrices_equal_sparse(A, B):
+    if _shape(A) != _shape(B):
+        return False
+    if is_sparse(A) and is_sparse(B):
+        return A.indptr == B.indptr and A.indices == B.indices and A.data == B.data
+    return densify(A).tolist() == densify(B).tolist()
+
+
+KERNELS = {
+    "add": add_sparse,
+    "subtract": subtract_sparse,
+    "multiply": multiply_sparse,
+    "transpose": transpose_sparse,
+    "scalar_multiply": scalar_multiply_sparse,
+    "is_zero": is_zero_sparse,
+    "equality": matrices_equal_sparse,
+}
+
+
+# --------------------------------------------
+# PATH SELECTION
+# --------------------------------------------
+
+def choose_path(kind, operands, names=("matrixA", "matrixB")):
+    """
+    Returns (path, operands, densities): path is "sparse" or "dense", the
+    operands converted to suit it, and {name: density} for the operands
+    that were measured
+    Sparse operands above the density threshold are densified; dense
+    operands of a large product are measured and converted to CSR when
+    mostly zero
+    """
+    densities = {name: round(M.density, 6) for name, M in zip(names, operands) if is_sparse(M)}
+    threshold = SPARSE_MAX_PRODUCT_DENSITY if kind == "multiply" else SPARSE_MAX_DENSITY
+
+    if not densities:
+        if kind != "multiply" or resolve_backend() != "python":
+            # Compiled backends beat the sparse kernels at any density
+            # worth checking for
+            return "dense", operands, densities
+
+        rows, inner = _shape(operands[0])
+        if rows * inner * _shape(operands[1])[1] < DENSITY_CHECK_MIN_WORK:
+            return "dense", operands, densities
+
+        for index, name in enumerate(names):
+            densities[name] = round(density(operands[index]), 6)
+            if densities[name] <= threshold:
+                converted = list(operands)
+                converted[index] = SparseMatrix.from_dense(operands[index])
+                return "sparse", converted, densities
+        return "dense", operands, densities
+
+    # Single-operand kernels and sparse +/- dense touch each stored value
+    # once, never more work than densifying first
+    if len(operands) == 1 or (kind != "multiply" and len(densities) < len(operands)):
+        return "sparse", operands, densities
+
+    if max(densities.values()) <= threshold:
+        return "sparse", operands, densities
+
+    return "dense", [densify(M) for M in operands], densities
+
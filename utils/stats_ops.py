@@ -1,4 +1,14 @@
 import math
+from itertools import islice
+from operator import mul
+
+from utils.backend import dispatch
+
+
+# Rows gathered before each merge into the running moments; bounds the
+# working memory at STATS_BLOCK_ROWS x p values
+STATS_BLOCK_ROWS = 1024
+
 
 def _to_vector(A):
     # Convert 1xn or nx1 matrix to vector
@@ -10,37 +20,165 @@ def _to_vector(A):
         raise ValueError("Input must be a vector (1xn or nx1)")
 
 
-def covariance(A, B):
+# ---------- RUNNING MOMENTS ----------
+
+class Moments:
+    """
+    Count, column means and co-moments C[i][j] = Σ (xᵢ - μᵢ)(xⱼ - μⱼ) of a
+    stream of rows with p columns, in O(p²) memory whatever the row count
+    Each block of rows is centered on its own mean, then merged in with
+    Chan et al.'s pairwise update (Welford's update for a one-row block)
+    """
+
+    __slots__ = ("n", "mean", "C")
+
+    def __init__(self, p):
+        self.n = 0
+        self.mean = [0.0] * p
+        self.C = [[0.0] * p for _ in range(p)]
+
+    @property
+    def p(self):
+        return len(self.mean)
+
+    @classmethod
+    def of_block(cls, rows):
+        """
+        Moments of a list of equal-length rows, one dot product per
+        column pair
+        """
+        columns = [[float(v) for v in column] for column in zip(*rows)]
+        moments = cls(len(columns))
+        if not columns or not columns[0]:
+            return moments
+
+        n = len(columns[0])
+        moments.n = n
+        moments.mean = [math.fsum(column) / n for column in columns]
+        centered = [[v - mu for v in column] for column, mu in zip(columns, moments.mean)]
+
+        C = moments.C
+        for i, x in enumerate(centered):
+            for j in range(i, len(centered)):
+                C[i][j] = C[j][i] = sum(map(mul, x, centered[j]))
+        return moments
+
+    def update(self, rows):
+        """
+        Adds a block of rows
+        """
+        rows = list(rows)
+        for row in rows:
+            if len(row) != self.p:
+                raise ValueError(f"Every row must have {self.p} values")
+        return self.merge(Moments.of_block(rows))
+
+    def merge(self, other):
+        """
+        Folds another Moments over the same columns into this one
+        """
+        if other.p != self.p:
+            raise ValueError("Cannot merge moments over different columns")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.C = other.n, list(other.mean), [list(row) for row in other.C]
+            return self
+
+        n = self.n + other.n
+        delta = [b - a for a, b in zip(self.mean, other.mean)]
+        weight = self.n * other.n / n
+
+        self.mean = [a + d * other.n / n for a, d in zip(self.mean, delta)]
+        self.C = [
+            [c + o + di * dj * weight for c, o, dj in zip(row, other_row, delta)]
+            for row, other_row, di in zip(self.C, other.C, delta)
+        ]
+        self.n = n
+        return self
+
+    def covariance(self, ddof=0):
+        """
+        Covariance matrix, dividing by n - ddof (0: population, 1: sample)
+        """
+        if self.n - ddof <= 0:
+            raise ValueError(f"At least {ddof + 1} observation(s) are required")
+        divisor = self.n - ddof
+        return [[c / divisor for c in row] for row in self.C]
+
+    def correlation(self):
+        """
+        Pearson correlation matrix (the n - ddof divisor cancels)
+        """
+        if self.n == 0:
+            raise ValueError("At least 1 observation is required")
+        scale = []
+        for i, row in enumerate(self.C):
+            if row[i] <= 0:
+                raise ValueError(f"Standard deviation of column {i + 1} cannot be zero")
+            scale.append(1 / math.sqrt(row[i]))
+
+        # Clipped like NumPy's corrcoef: rounding can step just past ±1
+        R = [[max(-1.0, min(1.0, c * si * sj)) for c, sj in zip(row, scale)] for row, si in zip(self.C, scale)]
+        for i in range(len(R)):
+            R[i][i] = 1.0
+        return R
+
+
+def moments(rows, p, block=STATS_BLOCK_ROWS):
+    """
+    Moments of an iterable of rows, read once in blocks of block rows
+    """
+    result = Moments(p)
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, block))
+        if not chunk:
+            return result
+        result.update(chunk)
+
+
+# ---------- PAIRS OF VECTORS ----------
+
+@dispatch
+def covariance(A, B, ddof=0):
     X = _to_vector(A)
     Y = _to_vector(B)
 
     if len(X) != len(Y):
         raise ValueError("Vectors must have the same length")
 
-    n = len(X)
-    mean_x = sum(X) / n
-    mean_y = sum(Y) / n
-
-    cov = 0
-    for i in range(n):
-        cov += (X[i] - mean_x) * (Y[i] - mean_y)
-
-    return cov / n
+    return moments(zip(X, Y), 2).covariance(ddof)[0][1]
 
 
+@dispatch
 def correlation(A, B):
     X = _to_vector(A)
     Y = _to_vector(B)
 
-    cov = covariance(A, B)
+    if len(X) != len(Y):
+        raise ValueError("Vectors must have the same length")
+
+    C = moments(zip(X, Y), 2).C
+    if C[0][0] <= 0 or C[1][1] <= 0:
+        raise ValueError("Standard deviation cannot be zero")
 
-    mean_x = sum(X) / len(X)
-    mean_y = sum(Y) / len(Y)
+    return max(-1.0, min(1.0, C[0][1] / math.sqrt(C[0][0] * C[1][1])))
 
-    std_x = math.sqrt(sum((x - mean_x) ** 2 for x in X) / len(X))
-    std_y = math.sqrt(sum((y - mean_y) ** 2 for y in Y) / len(Y))
 
-    if std_x == 0 or std_y == 0:
-        raise ValueError("Standard deviation cannot be zero")
+# ---------- DATA MATRICES ----------
+
+@dispatch
+def covariance_matrix(A, ddof=0):
+    """
+    p x p covariance of an n x p data matrix (rows are observations)
+    """
+    return moments(A, len(A[0])).covariance(ddof)
+
 
-    return cov / (std_x * std_y)
+@dispatch
+def correlation_matrix(A):
+    """
+    p x p Pearson correlation of an n x p data matrix (rows are observations)
+    """
+    return moments(A, len(A[0])).correlation()
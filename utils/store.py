@@ -0,0 +1,271 @@
+# ============================================
+# MATRIX STORE
+# ============================================
+#
+# Matrices uploaded once and referenced by id afterwards. Each one is a
+# .npy file in one directory, opened with mmap, so every worker process
+# reading the same matrix shares the same page-cache pages and nothing
+# is parsed or copied. The directory is the only shared state: a file's
+# mtime is its last use, which drives both TTL expiry and size-based
+# (least recently used) eviction.
+
+import mmap
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from utils.matrix import Matrix
+from utils.wire import npy_header
+from utils.wire import read_npy
+from utils.wire import write_npy
+
+
+_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def is_matrix_id(value):
+    return isinstance(value, str) and _ID.match(value) is not None
+
+
+class MatrixStore:
+    """
+    Directory of memory-mapped .npy files with TTL and byte-budget eviction
+    directory:  where the files live (shared by all workers)
+    max_bytes:  total size kept before least recently used files go
+    ttl:        seconds since last use after which a matrix expires
+    """
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, ttl=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _path(self, matrix_id):
+        return os.path.join(self.directory, f"{matrix_id}.npy")
+
+    def _files(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        files = []
+        for name in names:
+            if not name.endswith(".npy") or not is_matrix_id(name[:-4]):
+                continue
+            try:
+                info = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            files.append((info.st_mtime, info.st_size, name[:-4]))
+        return files
+
+    # ---------- WRITE ----------
+
+    def put(self, matrix):
+        """
+        Stores a matrix (Matrix or list of lists) and returns its metadata
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        body = write_npy(matrix)
+        matrix_id = uuid.uuid4().hex
+
+        # Write then rename, so readers never map a half-written file
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(temp, self._path(matrix_id))
+        except BaseException:
+            if os.path.exists(temp):
+                os.unlink(temp)
+            raise
+
+        self.evict()
+        return self.describe(matrix_id)
+
+    # ---------- READ ----------
+
+    def get(self, matrix_id):
+        """
+        Returns the stored matrix as a read-only Matrix over the mapped
+        file, or None when the id is unknown, expired or evicted
+        """
+        if not is_matrix_id(matrix_id):
+            return None
+
+        path = self._path(matrix_id)
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._maps.pop(matrix_id, None)
+            return None
+
+        if info.st_mtime < time.time() - self.ttl:
+            self.delete(matrix_id)
+            return None
+
+        # Mark as used for TTL and LRU eviction
+        os.utime(path)
+
+        with self._lock:
+            matrix = self._maps.get(matrix_id)
+            if matrix is None:
+                matrix = self._map(path)
+                self._maps[matrix_id] = matrix
+        return matrix
+
+    def _map(self, path):
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        order, typecode, fortran_order, shape, offset = npy_header(mapped)
+        if typecode != "d" or order != ("<" if sys.byteorder == "little" else ">"):
+            # Not our own layout: decode a private copy instead
+            return read_npy(mapped)
+
+        rows, cols = shape if len(shape) == 2 else (shape[0], 1)
+        data = memoryview(mapped)[offset:offset + 8 * rows * cols]
+        if fortran_order:
+            return Matrix(data, rows, cols, row_stride=1, col_stride=rows)
+        return Matrix(data, rows, cols)
+
+    def path(self, matrix_id):
+        """
+        File path of a live stored matrix, for sending it as-is
+        """
+        return self._path(matrix_id) if self.get(matrix_id) is not None else None
+
+    def describe(self, matrix_id):
+        matrix = self.get(matrix_id)
+        if matrix is None:
+            return None
+        info = os.stat(self._path(matrix_id))
+        return {
+            "id": matrix_id,
+            "shape": list(matrix.shape),
+            "bytes": info.st_size,
+            "expires_in": max(0, round(info.st_mtime + self.ttl - time.time())),
+        }
+
+    # ---------- EVICTION ----------
+
+    def delete(self, matrix_id):
+        """
+        Removes a matrix; views already handed out stay valid until dropped
+        """
+        with self._lock:
+            self._maps.pop(matrix_id, None)
+        if not is_matrix_id(matrix_id):
+            return False
+        try:
+            os.unlink(self._path(matrix_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def evict(self):
+        """
+        Drops expired matrices, then the least recently used ones until
+        the store fits in max_bytes
+        Returns the number of matrices removed
+        """
+        files = sorted(self._files())
+        cutoff = time.time() - self.ttl
+        total = sum(size for _, size, _ in files)
+        removed = 0
+
+        for mtime, size, matrix_id in files:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            if self.delete(matrix_id):
+                removed += 1
+            total -= size
+
+        return removed
+
+    def stats(self):
+        files = self._files()
+        return {
+            "directory": self.directory,
+            "matrices": len(files),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "mapped_here": len(self._maps),
+        }
+
+
+# --------------------------------------------
+# PAYLOAD HELPERS
+# --------------------------------------------
+
+def resolve_references(data, store, keys=("matrixA", "matrixB")):
+    """
+    Replaces stored-matrix ids under keys (and in a "matrices" list or
+    dict) with the mapped matrices
+    Raises ValueError for an id that is not in the store
+    """
+    def load(value):
+        if not isinstance(value, str):
+            return value
+        matrix = store.get(value)
+        if matrix is None:
+            raise ValueError(f"Unknown matrix '{value}': not a stored matrix id, or it has expired")
+        return matrix
+
+    data = dict(data)
+    for key in keys:
+        if isinstance(data.get(key), str):
+            data[key] = load(data[key])
+
+    matrices = data.get("matrices")
+    if isinstance(matrices, list):
+        data["matrices"] = [load(value) for value in matrices]
+    elif isinstance(matrices, dict):
+        data["matrices"] = {name: load(value) for name, value in matrices.items()}
+
+    return data
+
+
+def save_result(response, store):
+    """
+    Moves a successful matrix result (or dict of matrices, like LU's L and
+    U) into the store, leaving its metadata under "stored"
+    """
+    if response.get("status") != "success":
+        return response
+
+    result = response.get("result")
+    if isinstance(result, dict) and result.get("format") == "coo":
+        # A sparse result is stored dense
+        from utils.sparse_ops import from_json
+        result = from_json(result).to_matrix()
+
+    try:
+        if isinstance(result, dict):
+            stored = {name: store.put(part) for name, part in result.items()}
+        else:
+            stored = store.put(result)
+    except TypeError:
+        response["warning"] = "Result is not a matrix and was not stored"
+        return response
+
+    response = dict(response)
+    del response["result"]
+    response["stored"] = stored
+    return response
+
+
+matrix_store = MatrixStore(
+    os.environ.get("MATRIXLAB_STORE_DIR", os.path.join(tempfile.gettempdir(), "matrixlab-store")),
+    max_bytes=int(os.environ.get("MATRIXLAB_STORE_BYTES", 1024 * 1024 * 1024)),
+    ttl=int(os.environ.get("MATRIXLAB_STORE_TTL", 3600)),
+)
@@ -1,34 +1,194 @@
 # utils/utilities_ops.py
 
+import math
+
+from utils.backend import dispatch
+from utils.matrix import Matrix
+
+
+# ---------- STRUCTURE PROFILE ----------
+
+class Profile:
+    """
+    Structure of a matrix from one traversal: nonzero count, lower and
+    upper bandwidth (how far below / above the diagonal nonzeros reach),
+    symmetry and whether the diagonal is all ones, plus whether every
+    entry is finite and whether every entry is an integer
+    Everything else (zero, identity, diagonal, triangular, banded,
+    density) follows from those
+    """
+
+    __slots__ = (
+        "rows", "cols", "nnz", "lower_bandwidth", "upper_bandwidth", "symmetric", "unit_diagonal",
+        "finite", "integral",
+    )
+
+    def __init__(self, rows, cols, nnz, lower_bandwidth, upper_bandwidth, symmetric, unit_diagonal,
+                 finite=True, integral=False):
+        self.rows = rows
+        self.cols = cols
+        self.nnz = nnz
+        self.lower_bandwidth = lower_bandwidth
+        self.upper_bandwidth = upper_bandwidth
+        self.symmetric = symmetric
+        self.unit_diagonal = unit_diagonal
+        self.finite = finite
+        self.integral = integral
+
+    @property
+    def square(self):
+        return self.rows == self.cols
+
+    @property
+    def zero(self):
+        return self.nnz == 0
+
+    @property
+    def diagonal(self):
+        return self.square and self.lower_bandwidth == 0 and self.upper_bandwidth == 0
+
+    @property
+    def identity(self):
+        return self.diagonal and self.unit_diagonal
+
+    @property
+    def upper(self):
+        return self.square and self.lower_bandwidth == 0
+
+    @property
+    def lower(self):
+        return self.square and self.upper_bandwidth == 0
+
+    @property
+    def banded(self):
+        # Narrower than half the matrix on both sides of the diagonal
+        return 2 * max(self.lower_bandwidth, self.upper_bandwidth) < min(self.rows, self.cols)
+
+    @property
+    def density(self):
+        return self.nnz / (self.rows * self.cols) if self.rows and self.cols else 0.0
+
+    def kind(self):
+        """
+        The most specific structure name
+        """
+        if self.zero:
+            return "zero"
+        if self.identity:
+            return "identity"
+        if self.diagonal:
+            return "diagonal"
+        if self.upper:
+            return "upper_triangular"
+        if self.lower:
+            return "lower_triangular"
+        if self.banded:
+            return "banded"
+        return "general"
+
+    def as_dict(self):
+        return {
+            "kind": self.kind(),
+            "shape": [self.rows, self.cols],
+            "square": self.square,
+            "zero": self.zero,
+            "identity": self.identity,
+            "diagonal": self.diagonal,
+            "upper_triangular": self.upper,
+            "lower_triangular": self.lower,
+            "symmetric": self.symmetric,
+            "banded": self.banded,
+            "lower_bandwidth": self.lower_bandwidth,
+            "upper_bandwidth": self.upper_bandwidth,
+            "nnz": self.nnz,
+            "density": self.density,
+            "sparsity": 1.0 - self.density,
+        }
+
+
+def profile_matrix(matrix):
+    """
+    Classifies a matrix in one pass over its rows; the row scans run in C
+    (map / count / index / tuple comparison)
+    A Matrix keeps its profile, so later calls on it are free
+    """
+    cached = getattr(matrix, "profile", None)
+    if cached is not None:
+        return cached
+
+    rows, cols = len(matrix), len(matrix[0])
+    symmetric = rows == cols
+    # Column i is produced as row i is reached; each off-diagonal pair is
+    # compared once, from the row above the diagonal
+    columns = zip(*matrix) if symmetric else None
+
+    nnz = lower = upper = 0
+    unit = finite = integral = True
+    for i, row in enumerate(matrix):
+        # One sum per row: an int only when every entry is, and s - s is
+        # nan once an inf or nan is in it (or the sum overflows, which
+        # only costs a shortcut)
+        try:
+            total = sum(row)
+        except OverflowError:
+            total = math.inf
+        integral = integral and type(total) is int
+        finite = finite and total - total == 0
+        flags = list(map(bool, row))
+        count = flags.count(True)
+        if count:
+            nnz += count
+            lower = max(lower, i - flags.index(True))
+            upper = max(upper, cols - 1 - flags[::-1].index(True) - i)
+        if unit and i < cols and row[i] != 1:
+            unit = False
+        if symmetric:
+            symmetric = tuple(row[i + 1:]) == next(columns)[i + 1:]
+
+    profile = Profile(rows, cols, nnz, lower, upper, symmetric, unit, finite, integral)
+    if isinstance(matrix, Matrix):
+        matrix.profile = profile
+    return profile
+
+
+# ---------- CHECKS ----------
+#
+# Each answers from a cached profile when there is one, otherwise with a
+# single early-exit pass.
+
+@dispatch
 def is_square(matrix):
     return len(matrix) == len(matrix[0])
 
+@dispatch
 def dimensions(matrix):
     return len(matrix), len(matrix[0])
 
+@dispatch
 def is_identity(matrix):
+    if getattr(matrix, "profile", None) is not None:
+        return matrix.profile.identity
     if not is_square(matrix):
         return False
-    n = len(matrix)
-    for i in range(n):
-        for j in range(n):
-            if (i == j and matrix[i][j] != 1) or (i != j and matrix[i][j] != 0):
-                return False
+    for i, row in enumerate(matrix):
+        if row[i] != 1 or any(row[:i]) or any(row[i + 1:]):
+            return False
     return True
 
+@dispatch
 def is_zero(matrix):
-    for row in matrix:
-        for val in row:
-            if val != 0:
-                return False
-    return True
+    if getattr(matrix, "profile", None) is not None:
+        return matrix.profile.zero
+    return not any(any(row) for row in matrix)
 
+@dispatch
 def is_symmetric(matrix):
+    if getattr(matrix, "profile", None) is not None:
+        return matrix.profile.symmetric
     if not is_square(matrix):
         return False
-    n = len(matrix)
-    for i in range(n):
-        for j in range(n):
-            if matrix[i][j] != matrix[j][i]:
-                return False
+    # Row i right of the diagonal against column i below it: each pair once
+    for i, (row, column) in enumerate(zip(matrix, zip(*matrix))):
+        if tuple(row[i + 1:]) != column[i + 1:]:
+            return False
     return True
@@ -0,0 +1,277 @@
+# ============================================
+# BINARY WIRE FORMAT
+# ============================================
+#
+# Matrices can travel as NumPy .npy files or as raw little-endian float64
+# with an "X-Matrix-Shape: rows,cols" header instead of JSON. Both decode
+# with one memcpy into a Matrix buffer and encode straight from it, so no
+# per-element float objects or text formatting are involved. NumPy itself
+# is not needed.
+
+import ast
+import json
+import struct
+import sys
+from array import array
+
+from utils.matrix import Matrix
+
+
+NPY = "application/x-npy"
+RAW = "application/octet-stream"
+BINARY_TYPES = (NPY, RAW)
+
+_NPY_MAGIC = b"\x93NUMPY"
+
+# .npy dtypes accepted on input, by array typecode
+_DTYPES = {"f8": "d", "f4": "f", "i8": "q", "i4": "i"}
+
+
+class WireError(ValueError):
+    pass
+
+
+def _swap_if_needed(data, little_endian):
+    if little_endian != (sys.byteorder == "little"):
+        data.byteswap()
+
+
+def to_matrix(data, shape, fortran_order=False):
+    if len(shape) == 1:
+        # A 1-D array is a column vector
+        shape = (shape[0], 1)
+    if len(shape) != 2:
+        raise WireError(f"Expected a 1-D or 2-D array, got shape {tuple(shape)}")
+
+    rows, cols = shape
+    if len(data) != rows * cols:
+        raise WireError(f"Buffer holds {len(data)} values, shape {rows}x{cols} needs {rows * cols}")
+
+    if data.typecode != "d":
+        data = array("d", data)
+
+    if fortran_order:
+        # Column-major data is a transposed view, no copy needed
+        return Matrix(data, rows, cols, row_stride=1, col_stride=rows)
+    return Matrix(data, rows, cols)
+
+
+# --------------------------------------------
+# DECODING
+# --------------------------------------------
+
+def parse_shape(text):
+    """
+    "3,4", "3x4" or "3 × 4" -> (3, 4)
+    """
+    parts = [p for p in text.replace("×", ",").replace("x", ",").split(",") if p.strip()]
+    try:
+        shape = tuple(int(p) for p in parts)
+    except ValueError:
+        shape = ()
+    if len(shape) not in (1, 2) or any(n <= 0 for n in shape):
+        raise WireError(f"Invalid matrix shape '{text}', expected rows,cols")
+    return shape
+
+
+def read_raw(body, shape):
+    """
+    Raw little-endian float64 values in row-major order
+    """
+    if len(body) % 8:
+        raise WireError("Raw float64 body length must be a multiple of 8 bytes")
+    data = array("d")
+    data.frombytes(body)
+    _swap_if_needed(data, True)
+    return to_matrix(data, shape)
+
+
+def npy_header(body):
+    """
+    Parses a .npy header (format versions 1-3)
+    Returns (byte order "<" or ">", array typecode, fortran_order, shape,
+    data offset)
+    """
+    body = memoryview(body)
+    if bytes(body[:6]) != _NPY_MAGIC:
+        raise WireError("Not a .npy file (bad magic string)")
+
+    major = body[6]
+    if major == 1:
+        (header_len,) = struct.unpack("<H", body[8:10])
+        start = 10
+    elif major in (2, 3):
+        (header_len,) = struct.unpack("<I", body[8:12])
+        start = 12
+    else:
+        raise WireError(f"Unsupported .npy format version {major}")
+
+    try:
+        header = ast.literal_eval(bytes(body[start:start + header_len]).decode("latin1"))
+        descr = header["descr"]
+        fortran_order = header["fortran_order"]
+        shape = tuple(header["shape"])
+    except (SyntaxError, ValueError, KeyError, TypeError):
+        raise WireError("Invalid .npy header")
+
+    order, kind = descr[0], descr[1:]
+    if order == "|" or kind not in _DTYPES:
+        raise WireError(f"Unsupported .npy dtype '{descr}', expected float64, float32, int64 or int32")
+    if order == "=":
+        order = "<" if sys.byteorder == "little" else ">"
+
+    return order, _DTYPES[kind], fortran_order, shape, start + header_len
+
+
+def read_npy(body):
+    """
+    Decodes a .npy file of float64, float32, int64 or int32 values,
+    either byte order, C or Fortran layout
+    """
+    order, typecode, fortran_order, shape, offset = npy_header(body)
+
+    data = array(typecode)
+    payload = memoryview(body)[offset:]
+    if len(payload) % data.itemsize:
+        raise WireError(".npy data is truncated")
+    data.frombytes(payload)
+    _swap_if_needed(data, order == "<")
+
+    return to_matrix(data, shape, fortran_order)
+
+
+def read_matrix(body, content_type, shape_header=None):
+    if content_type == NPY:
+        return read_npy(body)
+    if shape_header is None:
+        raise WireError("Raw float64 matrices need an X-Matrix-Shape: rows,cols header")
+    return read_raw(body, parse_shape(shape_header))
+
+
+def _field(value):
+    # Form and query values are JSON when they parse as JSON, else strings
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def payload_from_request(request):
+    """
+    Builds a /calculate payload from a binary request
+    - application/x-npy or application/octet-stream body: matrixA, with
+      the other fields in the query string (?operation=transpose)
+    - multipart/form-data: file parts named matrixA / matrixB, either
+      format (a raw part gives its shape in an X-Matrix-Shape part header
+      or a matrixAShape / matrixBShape field), other fields as form
+      fields or a JSON "payload" field
+    """
+    data = {key: _field(value) for key, value in request.args.items()}
+
+    if request.mimetype in BINARY_TYPES:
+        data["matrixA"] = read_matrix(
+            request.get_data(cache=False), request.mimetype, request.headers.get("X-Matrix-Shape")
+        )
+        return data
+
+    if "payload" in request.form:
+        payload = _field(request.form["payload"])
+        if not isinstance(payload, dict):
+            raise WireError("The 'payload' field must be a JSON object")
+        data.update(payload)
+
+    for key, value in request.form.items():
+        if key != "payload":
+            data[key] = _field(value)
+
+    for key, part in request.files.items():
+        body = part.read()
+        # Browsers and curl label file parts loosely, so sniff for .npy
+        content_type = NPY if body.startswith(_NPY_MAGIC) else RAW
+        shape = part.headers.get("X-Matrix-Shape") or request.form.get(f"{key}Shape")
+        data[key] = read_matrix(body, content_type, shape)
+
+    return data
+
+
+# --------------------------------------------
+# ENCODING
+# --------------------------------------------
+
+def _buffer(value):
+    """
+    Returns (array('d'), shape, fortran_order) for a result matrix
+    Raises TypeError for anything that is not a rectangular numeric matrix
+    """
+    if isinstance(value, Matrix):
+        rows, cols = value.shape
+        row_stride, col_stride = value.strides
+        fortran_order = not value.is_contiguous() and row_stride == 1 and col_stride == rows
+        if value.is_contiguous() or fortran_order:
+            start = value._offset
+            data = array("d")
+            data.frombytes(value._view[start:start + rows * cols].cast("B"))
+            return data, (rows, cols), fortran_order
+        value = value.tolist()
+
+    if not isinstance(value, list) or not value or not isinstance(value[0], (list, tuple)):
+        raise TypeError("Result is not a matrix")
+
+    cols = len(value[0])
+    data = array("d")
+    for row in value:
+        if len(row) != cols:
+            raise TypeError("Result rows differ in length")
+        data.extend(row)
+    return data, (len(value), cols), False
+
+
+def write_npy(value):
+    data, shape, fortran_order = _buffer(value)
+    _swap_if_needed(data, True)
+
+    header = repr({"descr": "<f8", "fortran_order": fortran_order, "shape": shape})
+    # Version 1.0 header, padded so the data starts on a 64-byte boundary
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+
+    return _NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(header)) + header + data.tobytes()
+
+
+def write_raw(value):
+    data, shape, fortran_order = _buffer(value)
+    if fortran_order:
+        # Raw bodies are always row-major
+        rows, cols = shape
+        data = array("d", (data[i + j * rows] for i in range(rows) for j in range(cols)))
+    _swap_if_needed(data, True)
+    return data.tobytes(), shape
+
+
+def encode_response(response, content_type):
+    """
+    Returns (body, headers) for a successful matrix result in the binary
+    content_type, or None when the response has to stay JSON
+    The rest of the response travels as JSON in an X-Matrix-Meta header
+    """
+    if response.get("status") != "success":
+        return None
+
+    result = response["result"]
+    try:
+        if content_type == NPY:
+            body = write_npy(result)
+        else:
+            body, _ = write_raw(result)
+    except TypeError:
+        # Scalars, Yes / No answers, dicts of factors
+        return None
+
+    rows, cols = len(result), len(result[0])
+    meta = {key: value for key, value in response.items() if key not in ("result", "steps")}
+
+    headers = {
+        "X-Matrix-Shape": f"{rows},{cols}",
+        "X-Matrix-Meta": json.dumps(meta),
+    }
+    return body, headers